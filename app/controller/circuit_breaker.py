@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from typing import Hashable
+from app.schema.circuit_state import CircuitState
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Circuit Breaker")
+class CircuitBreaker:
+    """ A class to stop probing targets that keep failing, answering with their failure until a trial probe succeeds.
+
+    A target's circuit opens after HEALTH_CHECK_CIRCUIT_BREAKER_THRESHOLD consecutive failures. While it is open no probe
+    runs. Once the reset time has passed a single trial probe runs (half-open). Success closes the circuit. Failure
+    opens it again for twice as long, up to HEALTH_CHECK_CIRCUIT_BREAKER_MAX_RESET_SECONDS.
+    """
+    CLOSED='closed'
+    OPEN='open'
+    HALF_OPEN='half_open'
+    _lock=threading.Lock()
+    # Target mapped to its state, targets whose last probe succeeded have no state
+    _states:dict[Hashable,CircuitState]={}
+
+    @staticmethod
+    def is_enabled()->bool:
+        """ Check whether probes go through the circuit breaker.
+
+        Returns:
+            bool: True if HEALTH_CHECK_CIRCUIT_BREAKER_ENABLED environment variable is set to true, 1 or yes.
+        """
+        return os.getenv('HEALTH_CHECK_CIRCUIT_BREAKER_ENABLED', 'false').lower() in ['true', '1', 'yes']
+
+    @staticmethod
+    def get_threshold()->int:
+        """ Get the number of consecutive failures that open the circuit of a target.
+
+        Returns:
+            int: HEALTH_CHECK_CIRCUIT_BREAKER_THRESHOLD environment variable or 3, at least 1.
+        """
+        return max(1, int(os.getenv('HEALTH_CHECK_CIRCUIT_BREAKER_THRESHOLD', '3')))
+
+    @staticmethod
+    def get_reset_seconds()->float:
+        """ Get how long a circuit stays open before the first trial probe.
+
+        Returns:
+            float: HEALTH_CHECK_CIRCUIT_BREAKER_RESET_SECONDS environment variable or 5.
+        """
+        return float(os.getenv('HEALTH_CHECK_CIRCUIT_BREAKER_RESET_SECONDS', '5'))
+
+    @staticmethod
+    def get_max_reset_seconds()->float:
+        """ Get the longest time a circuit stays open between two trial probes.
+
+        Returns:
+            float: HEALTH_CHECK_CIRCUIT_BREAKER_MAX_RESET_SECONDS environment variable or 300.
+        """
+        return float(os.getenv('HEALTH_CHECK_CIRCUIT_BREAKER_MAX_RESET_SECONDS', '300'))
+
+    @staticmethod
+    def allow(target:Hashable,now:float=None)->bool:
+        """ Check whether a target may be probed, claiming the trial probe when its circuit is ready for one.
+
+        Args:
+            target (Hashable): Identifies the probe target, e.g. the hostname and port.
+            now (float, optional): The current monotonic time.
+
+        Returns:
+            bool: False while the circuit of the target is open, the caller reports the failure without probing.
+        """
+        now=time.monotonic() if now is None else now
+        with CircuitBreaker._lock:
+            state=CircuitBreaker._states.get(target)
+            if state is None or state.opened_until==0:
+                return True
+            if state.is_trial_running or now<state.opened_until:
+                return False
+            state.is_trial_running=True
+            return True
+
+    @staticmethod
+    def record(target:Hashable,is_success:bool,now:float=None):
+        """ Record the outcome of a probe of a target.
+
+        Args:
+            target (Hashable): Identifies the probe target.
+            is_success (bool): Whether the probe succeeded.
+            now (float, optional): The current monotonic time.
+        """
+        now=time.monotonic() if now is None else now
+        with CircuitBreaker._lock:
+            if is_success:
+                if CircuitBreaker._states.pop(target, None) is not None:
+                    logger.info(f"Circuit of {target} closed")
+                return
+            state=CircuitBreaker._states.setdefault(target, CircuitState())
+            state.failures+=1
+            if state.is_trial_running:
+                # The trial probe failed, stay open for longer
+                state.is_trial_running=False
+                state.reset_seconds=min(CircuitBreaker.get_max_reset_seconds(), state.reset_seconds*2)
+            elif state.opened_until==0 and state.failures>=CircuitBreaker.get_threshold():
+                state.reset_seconds=CircuitBreaker.get_reset_seconds()
+                logger.warning(f"Circuit of {target} opened after {state.failures} consecutive failures")
+            else:
+                return
+            state.opened_until=now+state.reset_seconds
+
+    @staticmethod
+    def get_state(target:Hashable,now:float=None)->str:
+        """ Get the circuit state of a target.
+
+        Args:
+            target (Hashable): Identifies the probe target.
+            now (float, optional): The current monotonic time.
+
+        Returns:
+            str: 'closed', 'open', or 'half_open' when the next probe or a running one is a trial probe.
+        """
+        now=time.monotonic() if now is None else now
+        with CircuitBreaker._lock:
+            state=CircuitBreaker._states.get(target)
+            if state is None or state.opened_until==0:
+                return CircuitBreaker.CLOSED
+            if state.is_trial_running or now>=state.opened_until:
+                return CircuitBreaker.HALF_OPEN
+            return CircuitBreaker.OPEN
+
+    @staticmethod
+    def clear():
+        """ Close the circuit of every target.
+        """
+        with CircuitBreaker._lock:
+            CircuitBreaker._states.clear()
@@ -0,0 +1,187 @@
+import ipaddress
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck DNS")
+
+@dataclass
+class DnsCacheEntry:
+    """
+    Class to represent a cached name resolution, either resolved addresses or the resolution error.
+    """
+    addresses: list[tuple]
+    error: str
+    expires_at: float
+    is_refreshing: bool = False
+
+class DnsResolverCache:
+    """ A class to cache hostname resolutions of probe targets with TTLs, negative caching and asynchronous refresh.
+
+    Expired positive entries are still served while a background thread resolves the hostname again,
+    so probes never wait on the resolver for a target that resolved before.
+    """
+    _lock=threading.Lock()
+    # Entries in the order they were last resolved, the least recently resolved first
+    _entries:dict[tuple[str,int],DnsCacheEntry]={}
+
+    @staticmethod
+    def get_max_entries()->int:
+        """ Get the number of cached resolutions kept.
+
+        Returns:
+            int: HEALTH_CHECK_DNS_CACHE_SIZE environment variable or 1024, at least 1.
+        """
+        return max(1, int(os.getenv('HEALTH_CHECK_DNS_CACHE_SIZE', '1024')))
+
+    @staticmethod
+    def get_ttl()->float:
+        """ Get how long a successful resolution is considered fresh.
+
+        Returns:
+            float: Seconds from HEALTH_CHECK_DNS_TTL environment variable or 60.
+        """
+        return float(os.getenv('HEALTH_CHECK_DNS_TTL', '60'))
+
+    @staticmethod
+    def get_negative_ttl()->float:
+        """ Get how long a failed resolution is cached.
+
+        Returns:
+            float: Seconds from HEALTH_CHECK_DNS_NEGATIVE_TTL environment variable or 10.
+        """
+        return float(os.getenv('HEALTH_CHECK_DNS_NEGATIVE_TTL', '10'))
+
+    @staticmethod
+    def _is_ip_address(hostname:str)->bool:
+        """ Check if the hostname is an IP address literal that does not need resolution.
+
+        Args:
+            hostname (str): The hostname to check.
+
+        Returns:
+            bool: True if the hostname is an IPv4 or IPv6 address, False otherwise.
+        """
+        try:
+            ipaddress.ip_address(hostname)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _lookup(hostname:str,port:int)->DnsCacheEntry:
+        """ Resolve the hostname with the system resolver and build a cache entry from the outcome.
+
+        Args:
+            hostname (str): The hostname to resolve.
+            port (int): The port number of the target.
+
+        Returns:
+            DnsCacheEntry: The resolved addresses or the resolution error.
+        """
+        try:
+            addresses=[address_info[4] for address_info in socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)]
+            return DnsCacheEntry(addresses=addresses, error=None, expires_at=time.monotonic()+DnsResolverCache.get_ttl())
+        except OSError as e:
+            return DnsCacheEntry(addresses=[], error=str(e), expires_at=time.monotonic()+DnsResolverCache.get_negative_ttl())
+
+    @staticmethod
+    def _store(key:tuple[str,int],entry:DnsCacheEntry):
+        """ Store a resolution, dropping the least recently resolved entries beyond the cache size.
+
+        Configured targets are resolved again on every TTL, so the entries dropped first are those of removed targets.
+        The caller holds the lock.
+
+        Args:
+            key (tuple[str,int]): The hostname and port of the target.
+            entry (DnsCacheEntry): The resolution.
+        """
+        DnsResolverCache._entries.pop(key, None)
+        DnsResolverCache._entries[key]=entry
+        max_entries=DnsResolverCache.get_max_entries()
+        while len(DnsResolverCache._entries)>max_entries:
+            del DnsResolverCache._entries[next(iter(DnsResolverCache._entries))]
+
+    @staticmethod
+    def _refresh(hostname:str,port:int):
+        """ Resolve the hostname again in the background and replace the cached entry.
+
+        A failed resolution keeps the stale addresses, which are retried after the negative TTL.
+
+        Args:
+            hostname (str): The hostname to resolve.
+            port (int): The port number of the target.
+        """
+        entry=DnsResolverCache._lookup(hostname, port)
+        with DnsResolverCache._lock:
+            stale_entry=DnsResolverCache._entries.get((hostname, port))
+            if entry.error and stale_entry is not None and not stale_entry.error:
+                # A transient resolver error must not turn a target that resolved before into a DNS failure
+                logger.warning(f"Background resolution of {hostname} failed caused by {entry.error}, serving the previous addresses")
+                entry=DnsCacheEntry(addresses=stale_entry.addresses, error=None, expires_at=entry.expires_at)
+            elif entry.error:
+                logger.warning(f"Background resolution of {hostname} failed caused by {entry.error}")
+            DnsResolverCache._store((hostname, port), entry)
+
+    @staticmethod
+    def get_cached(hostname:str,port:int)->list[tuple]:
+        """ Get the cached addresses without ever blocking on the resolver.
+
+        Args:
+            hostname (str): The hostname to resolve.
+            port (int): The port number of the target.
+
+        Returns:
+            list[tuple]: The socket addresses of the target, None when the target has no usable cache entry.
+        """
+        if DnsResolverCache._is_ip_address(hostname):
+            return [(hostname, port)]
+        entry=DnsResolverCache._entries.get((hostname, port))
+        if entry is None or entry.error or entry.expires_at<=time.monotonic():
+            return None
+        return entry.addresses
+
+    @staticmethod
+    def resolve(hostname:str,port:int)->list[tuple]:
+        """ Resolve the hostname using the cache.
+
+        Args:
+            hostname (str): The hostname to resolve.
+            port (int): The port number of the target.
+
+        Raises:
+            socket.gaierror: When the hostname cannot be resolved, including cached failures.
+
+        Returns:
+            list[tuple]: The socket addresses of the target.
+        """
+        # IP address literals never go through the resolver
+        if DnsResolverCache._is_ip_address(hostname):
+            return [(hostname, port)]
+        key=(hostname, port)
+        now=time.monotonic()
+        with DnsResolverCache._lock:
+            entry=DnsResolverCache._entries.get(key)
+            # Serve a stale positive entry and refresh it in the background
+            if entry is not None and not entry.error and entry.expires_at<=now and not entry.is_refreshing:
+                entry.is_refreshing=True
+                threading.Thread(target=DnsResolverCache._refresh, args=(hostname, port), daemon=True,
+                                 name=f"dns-refresh-{hostname}").start()
+        if entry is None or (entry.error and entry.expires_at<=now):
+            # Nothing usable cached so resolve in the calling thread
+            entry=DnsResolverCache._lookup(hostname, port)
+            with DnsResolverCache._lock:
+                DnsResolverCache._store(key, entry)
+        if entry.error:
+            raise socket.gaierror(entry.error)
+        return entry.addresses
+
+    @staticmethod
+    def clear():
+        """ Drop all cached resolutions.
+        """
+        with DnsResolverCache._lock:
+            DnsResolverCache._entries={}
@@ -0,0 +1,113 @@
+import os
+import threading
+from app.controller.healthcheck_config_compiler import HealthcheckConfigCompiler
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.schema.healthcheck_config import AllHealthcheckConfig
+from app.schema.healthcheck_config_report import HealthcheckConfigReport
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Config Cache")
+class HealthcheckConfigCache:
+    """ A class to keep the parsed health check configuration in memory and reload it only when the file changes.
+    """
+    _lock=threading.Lock()
+    _config_file:str=None
+    _file_signature:tuple=None
+    _config:AllHealthcheckConfig=None
+    _report:HealthcheckConfigReport=None
+    # Number of skipped entries logged one by one, the rest is only counted
+    _LOGGED_ISSUES=10
+
+    @staticmethod
+    def _get_file_signature(config_file:str)->tuple:
+        """ Get a signature of the configuration file that changes whenever the file is edited or replaced.
+
+        Args:
+            config_file (str): The path to the configuration file.
+
+        Returns:
+            tuple: The modification time in nanoseconds, size and inode of the file, None if the file does not exist.
+        """
+        try:
+            file_stat=os.stat(config_file)
+        except OSError:
+            return None
+        return (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+
+    @staticmethod
+    def get_config(config_file:str,read_config)->AllHealthcheckConfig:
+        """ Get the parsed configuration, reloading it only when the configuration file changed.
+
+        The file is compiled by HealthcheckConfigCompiler. When the file exists but is empty, cannot be parsed,
+        has malformed entries or has no valid entry the last good configuration is kept.
+
+        Args:
+            config_file (str): The path to the configuration file.
+            read_config (callable): Function that reads the configuration file and returns a list of dictionaries.
+
+        Returns:
+            AllHealthcheckConfig: The parsed health check configuration.
+        """
+        file_signature=HealthcheckConfigCache._get_file_signature(config_file)
+        # Fast path when the file did not change since it was last parsed
+        if (HealthcheckConfigCache._config is not None and config_file==HealthcheckConfigCache._config_file
+                and file_signature==HealthcheckConfigCache._file_signature):
+            return HealthcheckConfigCache._config
+        with HealthcheckConfigCache._lock:
+            # Another thread may have reloaded the file while waiting for the lock
+            if (HealthcheckConfigCache._config is not None and config_file==HealthcheckConfigCache._config_file
+                    and file_signature==HealthcheckConfigCache._file_signature):
+                return HealthcheckConfigCache._config
+            try:
+                healthcheck_config, report=HealthcheckConfigCompiler.compile_file(config_file, read_config)
+            except Exception as e:
+                logger.error(f"Failed to read health check config {config_file} caused by {e}")
+                healthcheck_config, report=AllHealthcheckConfig(), HealthcheckConfigReport()
+            HealthcheckConfigCache._log_report(config_file, report)
+            has_last_good_config=HealthcheckConfigCache._config is not None and config_file==HealthcheckConfigCache._config_file
+            # A file that exists but yields no valid configuration is treated as a bad edit
+            if report.is_rejected and file_signature is not None and has_last_good_config:
+                logger.warning(f"Health check config {config_file} is not valid, keeping the last good configuration")
+                HealthcheckConfigCache._file_signature=file_signature
+                return HealthcheckConfigCache._config
+            HealthcheckConfigCache._config=healthcheck_config
+            HealthcheckConfigCache._report=report
+            HealthcheckConfigCache._config_file=config_file
+            HealthcheckConfigCache._file_signature=file_signature
+            # Removed checks and targets would otherwise be exported with their last values forever
+            HealthcheckMetrics.retain_configured(healthcheck_config)
+            logger.info(f"Loaded health check config {config_file} with {report.compiled_entries} checks")
+            return HealthcheckConfigCache._config
+
+    @staticmethod
+    def _log_report(config_file:str,report:HealthcheckConfigReport):
+        """ Log the entries of the configuration file that were not compiled.
+
+        Args:
+            config_file (str): The path to the configuration file.
+            report (HealthcheckConfigReport): The report of the compilation.
+        """
+        issues=report.issues
+        for issue in issues[:HealthcheckConfigCache._LOGGED_ISSUES]:
+            logger.warning(f"Health check config {config_file} entry {issue.index} ({issue.check_type} {issue.synonym!r}) skipped: {issue.reason}")
+        if len(issues)>HealthcheckConfigCache._LOGGED_ISSUES:
+            logger.warning(f"Health check config {config_file} has {len(issues)-HealthcheckConfigCache._LOGGED_ISSUES} more skipped entries")
+
+    @staticmethod
+    def get_report()->HealthcheckConfigReport:
+        """ Get the report of the compilation the current configuration came from.
+
+        Returns:
+            HealthcheckConfigReport: The report, None if no configuration was loaded yet.
+        """
+        return HealthcheckConfigCache._report
+
+    @staticmethod
+    def clear():
+        """ Drop the cached configuration so it is parsed again on the next call.
+        """
+        with HealthcheckConfigCache._lock:
+            HealthcheckConfigCache._config=None
+            HealthcheckConfigCache._report=None
+            HealthcheckConfigCache._config_file=None
+            HealthcheckConfigCache._file_signature=None
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, fields
+from typing import Optional
+from app.controller.healthcheck_foundation import HealthCheckFoundation
+from app.schema.healthcheck_config import AllHealthcheckConfig
+from app.schema.healthcheck_config_report import HealthcheckConfigIssue, HealthcheckConfigReport
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Config Compiler")
+class HealthcheckConfigCompiler:
+    """ A class to validate, deduplicate and build the health check configuration in a single pass over its entries.
+    """
+    # Bumped whenever the layout of the compiled config cache file or the compilation changes, it is part of the digest
+    CACHE_FORMAT_VERSION=2
+
+    @staticmethod
+    def get_cache_file()->Optional[str]:
+        """ Get the location of the compiled config cache file.
+
+        Returns:
+            Optional[str]: HEALTH_CHECK_CONFIG_COMPILED_CACHE environment variable, None when the cache is disabled.
+        """
+        return os.getenv('HEALTH_CHECK_CONFIG_COMPILED_CACHE') or None
+
+    @staticmethod
+    def _find_malformation(item)->Optional[str]:
+        """ Find why an entry does not have the structure of a health check.
+
+        Args:
+            item: The configuration entry.
+
+        Returns:
+            Optional[str]: The reason, None when the entry is well formed.
+        """
+        # Fast path for the common well formed entry, a single subset test on the detail keys
+        if isinstance(item, dict) and isinstance(item.get('details'), dict) and isinstance(item.get('check_type'), str):
+            required_keys=HealthCheckFoundation.REQUIRED_DETAIL_KEYS.get(item['check_type'])
+            if required_keys is not None and item['details'].keys()>=required_keys:
+                return None
+        if not HealthCheckFoundation.health_check_element_is_a_dictionary(item):
+            return "Entry is not an object"
+        if 'check_type' not in item or 'details' not in item:
+            return "Entry needs both 'check_type' and 'details'"
+        if not HealthCheckFoundation.is_valid_health_check_type(item['check_type']):
+            return f"Unknown check type: {item['check_type']}"
+        if not isinstance(item['details'], dict):
+            return "'details' is not an object"
+        missing_keys=HealthCheckFoundation.REQUIRED_DETAIL_KEYS[item['check_type'].lower()]-item['details'].keys()
+        if missing_keys:
+            return f"'details' misses the required keys {sorted(missing_keys)}"
+        return None
+
+    @staticmethod
+    def compile(config_content:list)->tuple[AllHealthcheckConfig,HealthcheckConfigReport]:
+        """ Validate, deduplicate and build all health check configs in a single pass.
+
+        Entries are checked for their structure, built into their config class, which validates their fields,
+        and deduplicated on their check type and synonym, keeping the first entry.
+
+        Args:
+            config_content (list): The entries of the configuration file.
+
+        Returns:
+            tuple[AllHealthcheckConfig,HealthcheckConfigReport]: The compiled configuration and the report of the entries that were not compiled.
+            The configuration is empty when the report is rejected.
+        """
+        healthcheck_config=AllHealthcheckConfig()
+        if not HealthCheckFoundation.config_schmema_is_not_empty(config_content):
+            return healthcheck_config, HealthcheckConfigReport()
+        report=HealthcheckConfigReport(total_entries=len(config_content))
+        seen=set()
+        for index, item in enumerate(config_content):
+            reason=HealthcheckConfigCompiler._find_malformation(item)
+            if reason is not None:
+                details=item.get('details') if isinstance(item, dict) else None
+                report.malformed_entries.append(HealthcheckConfigIssue(
+                    index=index,
+                    check_type=item.get('check_type') if isinstance(item, dict) else None,
+                    synonym=details.get('synonym') if isinstance(details, dict) else None,
+                    reason=reason))
+                continue
+            # Malformed entries reject the whole configuration, so the remaining entries are only checked for their structure
+            if report.malformed_entries:
+                continue
+            check_type, synonym=item['check_type'], item['details']['synonym']
+            try:
+                key=(check_type, synonym)
+                if key in seen:
+                    report.duplicate_entries.append(HealthcheckConfigIssue(index=index, check_type=check_type, synonym=synonym,
+                                                                           reason=f"Duplicate of an earlier {check_type} check with the same synonym"))
+                    continue
+                healthcheck_config.add_check(check_type, item['details'])
+            except Exception as e:
+                # Unhashable synonyms, missing or unknown fields and values that do not pass validation
+                report.invalid_entries.append(HealthcheckConfigIssue(index=index, check_type=check_type, synonym=synonym, reason=str(e)))
+                continue
+            seen.add(key)
+            report.compiled_entries+=1
+        if report.malformed_entries:
+            return AllHealthcheckConfig(), report
+        return healthcheck_config, report
+
+    @staticmethod
+    def _get_schema_signature()->bytes:
+        """ Describe the cache format version and the fields of every config class.
+
+        Returns:
+            bytes: The signature, it changes whenever a cache written before would no longer match the config classes.
+        """
+        schema={check_type: [config_field.name for config_field in fields(config_class)]
+                for check_type, (_, config_class) in sorted(AllHealthcheckConfig.CHECK_TYPES.items())}
+        return json.dumps([HealthcheckConfigCompiler.CACHE_FORMAT_VERSION, schema]).encode()
+
+    @staticmethod
+    def _get_file_digest(config_file:str)->Optional[str]:
+        """ Hash the content of the configuration file together with the schema signature.
+
+        Args:
+            config_file (str): The path to the configuration file.
+
+        Returns:
+            Optional[str]: The hex digest, None if the file cannot be read.
+        """
+        signature=HealthcheckConfigCompiler._get_schema_signature()
+        try:
+            with open(config_file, 'rb') as file:
+                return hashlib.file_digest(file, lambda: hashlib.blake2b(signature)).hexdigest()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _load_cache(cache_file:str,digest:str)->Optional[tuple[AllHealthcheckConfig,HealthcheckConfigReport]]:
+        """ Load the compiled configuration from the cache file if it was compiled from the same file content.
+
+        The cached checks are built through their config classes again, so a cache file that was tampered with
+        cannot hold a check the configuration file could not.
+
+        Args:
+            cache_file (str): The path to the compiled config cache file.
+            digest (str): The digest of the current configuration file content.
+
+        Returns:
+            Optional[tuple[AllHealthcheckConfig,HealthcheckConfigReport]]: The compiled configuration and its report, None on a cache miss.
+        """
+        try:
+            with open(cache_file, 'rb') as file:
+                cached=json.load(file)
+            if (not isinstance(cached, dict) or cached.get('format_version')!=HealthcheckConfigCompiler.CACHE_FORMAT_VERSION
+                    or cached.get('digest')!=digest):
+                return None
+            healthcheck_config=AllHealthcheckConfig()
+            for check in cached['checks']:
+                healthcheck_config.add_check(check['check_type'], check['details'])
+            report=cached['report']
+            return healthcheck_config, HealthcheckConfigReport(
+                total_entries=report['total_entries'],
+                compiled_entries=report['compiled_entries'],
+                malformed_entries=[HealthcheckConfigIssue(**issue) for issue in report['malformed_entries']],
+                invalid_entries=[HealthcheckConfigIssue(**issue) for issue in report['invalid_entries']],
+                duplicate_entries=[HealthcheckConfigIssue(**issue) for issue in report['duplicate_entries']],
+                from_cache=True)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Unreadable files, unexpected layouts and checks that no longer pass validation
+            logger.warning(f"Ignoring compiled config cache {cache_file} caused by {e!r}")
+            return None
+
+    @staticmethod
+    def _save_cache(cache_file:str,digest:str,healthcheck_config:AllHealthcheckConfig,report:HealthcheckConfigReport):
+        """ Save the compiled configuration to the cache file as JSON, replacing the file atomically.
+
+        Args:
+            cache_file (str): The path to the compiled config cache file.
+            digest (str): The digest of the configuration file content it was compiled from.
+            healthcheck_config (AllHealthcheckConfig): The compiled configuration.
+            report (HealthcheckConfigReport): The report of the compilation.
+        """
+        # Only the deduplicated and validated entries are stored, in the layout of the configuration file
+        checks=[{'check_type': check_type, 'details': asdict(check)}
+                for check_type, (category, _) in AllHealthcheckConfig.CHECK_TYPES.items()
+                for check in getattr(healthcheck_config, category)]
+        cached={'format_version': HealthcheckConfigCompiler.CACHE_FORMAT_VERSION, 'digest': digest,
+                'checks': checks, 'report': asdict(report)}
+        temporary_file=None
+        try:
+            # Write next to the cache file so the rename does not cross file systems
+            file_descriptor, temporary_file=tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_file)), suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w') as file:
+                json.dump(cached, file)
+            os.replace(temporary_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to write compiled config cache {cache_file} caused by {e}")
+            if temporary_file is not None and os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+    @staticmethod
+    def compile_file(config_file:str,read_config)->tuple[AllHealthcheckConfig,HealthcheckConfigReport]:
+        """ Compile the configuration file, reusing the compiled config cache file when it matches the file content.
+
+        Args:
+            config_file (str): The path to the configuration file.
+            read_config (callable): Function that reads the configuration file and returns its entries.
+
+        Returns:
+            tuple[AllHealthcheckConfig,HealthcheckConfigReport]: The compiled configuration and its report.
+        """
+        cache_file=HealthcheckConfigCompiler.get_cache_file()
+        digest=HealthcheckConfigCompiler._get_file_digest(config_file) if cache_file else None
+        if digest is not None:
+            cached=HealthcheckConfigCompiler._load_cache(cache_file, digest)
+            if cached is not None:
+                logger.info(f"Loaded compiled health check config from {cache_file}")
+                return cached
+        healthcheck_config, report=HealthcheckConfigCompiler.compile(read_config())
+        # Only cache what was compiled from the content the digest was taken from
+        if (digest is not None and not report.is_rejected
+                and HealthcheckConfigCompiler._get_file_digest(config_file)==digest):
+            HealthcheckConfigCompiler._save_cache(cache_file, digest, healthcheck_config, report)
+        return healthcheck_config, report
@@ -3,6 +3,13 @@ import os
 class HealthCheckFoundation:
     """ A class to handle basic health check tasks such as verifying configuration templates and checking system properties.
     """
+    # Required detail keys of each health check type
+    REQUIRED_DETAIL_KEYS={
+        'mount_point': frozenset(['synonym', 'mount_point', 'threshold_percentage']),
+        'webservice': frozenset(['synonym', 'hostname', 'port', 'protocol']),
+        'database': frozenset(['synonym', 'hostname', 'port', 'database_type']),
+        'requirements': frozenset(['synonym', 'requirements_file_path'])
+    }
     
     @staticmethod
     def is_config_template_checktype_valid(checkconfig:list[dict])->bool:
@@ -42,7 +49,7 @@ class HealthCheckFoundation:
         if not isinstance(mount_point, dict):
             return False
         # Check if the mount point dictionary has the required keys
-        return all(key in mount_point for key in ['synonym','mount_point', 'threshold_percentage'])
+        return all(key in mount_point for key in HealthCheckFoundation.REQUIRED_DETAIL_KEYS['mount_point'])
             
     @staticmethod
     def webservice_template_verification(webservice:dict)->bool:
@@ -55,7 +62,7 @@ class HealthCheckFoundation:
             bool: True if the webservice dictionary has the required keys, False otherwise.
         """
         # Check if the webservice dictionary has the required keys
-        return all(key in webservice for key in ['synonym','hostname','port','protocol'])
+        return all(key in webservice for key in HealthCheckFoundation.REQUIRED_DETAIL_KEYS['webservice'])
 
     @staticmethod
     def database_template_verification(database:dict)->bool:
@@ -68,7 +75,7 @@ class HealthCheckFoundation:
             bool: True if the database dictionary has the required keys, False otherwise.
         """
         # Check if the database dictionary has the required keys
-        return all(key in database for key in ['synonym','hostname','port','database_type'])
+        return all(key in database for key in HealthCheckFoundation.REQUIRED_DETAIL_KEYS['database'])
 
     @staticmethod
     def requirements_template_verification(requirements:list[str])->bool:
@@ -81,7 +88,7 @@ class HealthCheckFoundation:
             bool: True if the requirements list has the required format, False otherwise.
         """
         # Check if the requirements dictionary has the required keys
-        return all(key in requirements for key in ['synonym','requirements_file_path'])
+        return all(key in requirements for key in HealthCheckFoundation.REQUIRED_DETAIL_KEYS['requirements'])
 
     @staticmethod
     def config_schmema_is_not_empty(config_schema)->bool:
@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Optional
+from app.controller.healthcheck_history_database import HealthcheckHistoryDatabase
+from app.schema.healthcheck_history import HealthcheckHistoryPoint, HealthcheckHistorySeries
+
+class HealthcheckHistoryBuffer:
+    """ A fixed size ring buffer of the results of a single health check, stored in typed arrays.
+    """
+    # Bytes used by a single result: timestamp, latency, status code and usage percentage
+    BYTES_PER_RESULT=array('d').itemsize+array('f').itemsize+2*array('b').itemsize
+
+    def __init__(self,capacity:int):
+        """ Allocate the buffer, its memory use does not change afterwards.
+
+        Args:
+            capacity (int): Number of results kept, the oldest result is overwritten once it is full.
+        """
+        self.capacity=capacity
+        self.timestamps=array('d', [0.0])*capacity
+        self.latencies_ms=array('f', [0.0])*capacity
+        self.status_codes=array('b', [0])*capacity
+        # -1 when the check has no usage percentage
+        self.usages=array('b', [0])*capacity
+        self._next=0
+        self._count=0
+
+    def __len__(self)->int:
+        return self._count
+
+    def append(self,timestamp:float,status_code:int,latency_ms:float,usage:int):
+        """ Store a result, overwriting the oldest one when the buffer is full.
+
+        Args:
+            timestamp (float): Unix timestamp of the result.
+            status_code (int): The status code as in HealthcheckHistory.STATUS_CODES.
+            latency_ms (float): Duration of the check in milliseconds.
+            usage (int): Usage percentage, -1 when the check has none.
+        """
+        index=self._next
+        self.timestamps[index]=timestamp
+        self.latencies_ms[index]=latency_ms
+        self.status_codes[index]=status_code
+        self.usages[index]=usage
+        self._next=(index+1)%self.capacity
+        self._count=min(self._count+1, self.capacity)
+
+    def get_indices(self,start:float=None,end:float=None)->list[int]:
+        """ Get the positions of the results checked within a time range, oldest first.
+
+        The buffer holds at most two runs of increasing timestamps, each one is searched with a binary search.
+
+        Args:
+            start (float, optional): Unix timestamp of the earliest result, no lower bound when not provided.
+            end (float, optional): Unix timestamp of the latest result, no upper bound when not provided.
+
+        Returns:
+            list[int]: The positions in the arrays.
+        """
+        if self._count<self.capacity:
+            runs=[(0, self._count)]
+        else:
+            runs=[(self._next, self.capacity), (0, self._next)]
+        indices=[]
+        for low, high in runs:
+            first=bisect_left(self.timestamps, start, low, high) if start is not None else low
+            last=bisect_right(self.timestamps, end, low, high) if end is not None else high
+            indices.extend(range(first, last))
+        return indices
+
+    def copy(self,indices:list[int])->'HealthcheckHistoryBuffer':
+        """ Copy some results into a new buffer so they can be read while this one keeps receiving results.
+
+        Args:
+            indices (list[int]): The positions of the results, oldest first.
+
+        Returns:
+            HealthcheckHistoryBuffer: A full buffer holding only these results, oldest first.
+        """
+        copied=HealthcheckHistoryBuffer.__new__(HealthcheckHistoryBuffer)
+        copied.capacity=len(indices)
+        copied.timestamps=array('d', [self.timestamps[index] for index in indices])
+        copied.latencies_ms=array('f', [self.latencies_ms[index] for index in indices])
+        copied.status_codes=array('b', [self.status_codes[index] for index in indices])
+        copied.usages=array('b', [self.usages[index] for index in indices])
+        copied._next=0
+        copied._count=len(indices)
+        return copied
+
+class HealthcheckHistory:
+    """ A class to keep a fixed size history of the results of each health check in memory.
+    """
+    # Status mapped to the code stored in the history, ordered by severity so the worst of several results is the highest code
+    STATUS_CODES={'Success': 0, 'Warning': 1, 'Unknown': 2, 'Failure': 3, 'Error': 4}
+    _STATUSES=tuple(STATUS_CODES)
+    _lock=threading.Lock()
+    # (check type, synonym) mapped to the buffer of the check, least recently recorded first
+    _buffers:OrderedDict=OrderedDict()
+
+    @staticmethod
+    def get_size()->int:
+        """ Get the number of results kept per health check.
+
+        Returns:
+            int: HEALTH_CHECK_HISTORY_SIZE environment variable or 1024.
+        """
+        return int(os.getenv('HEALTH_CHECK_HISTORY_SIZE', '1024'))
+
+    @staticmethod
+    def get_max_checks()->int:
+        """ Get the number of health checks with a history.
+
+        Returns:
+            int: HEALTH_CHECK_HISTORY_MAX_CHECKS environment variable or 1000.
+        """
+        return int(os.getenv('HEALTH_CHECK_HISTORY_MAX_CHECKS', '1000'))
+
+    @staticmethod
+    def get_memory_bound_bytes()->int:
+        """ Get the most memory the history arrays can use, whatever the uptime.
+
+        Returns:
+            int: The size of the arrays of the maximum number of checks in bytes.
+        """
+        return HealthcheckHistory.get_max_checks()*HealthcheckHistory.get_size()*HealthcheckHistoryBuffer.BYTES_PER_RESULT
+
+    @staticmethod
+    def record(check_type:str,synonym:str,status:str,latency_seconds:float,usage_percentage:int=None,timestamp:float=None):
+        """ Record the result of a health check.
+
+        Args:
+            check_type (str): The check type as used in the configuration file.
+            synonym (str): The synonym of the check.
+            status (str): The status of the result, 'Error' when the check itself failed.
+            latency_seconds (float): Duration of the check.
+            usage_percentage (int, optional): Usage percentage of mount points.
+            timestamp (float, optional): Unix timestamp of the result, now when not provided.
+        """
+        status_code=HealthcheckHistory.STATUS_CODES.get(status, HealthcheckHistory.STATUS_CODES['Unknown'])
+        usage=-1 if usage_percentage is None else max(0, min(int(usage_percentage), 100))
+        key=(check_type, synonym)
+        with HealthcheckHistory._lock:
+            buffer=HealthcheckHistory._buffers.get(key)
+            if buffer is None:
+                buffer=HealthcheckHistory._buffers[key]=HealthcheckHistoryBuffer(HealthcheckHistory.get_size())
+                # Forget the check recorded least recently, typically one removed from the configuration
+                while len(HealthcheckHistory._buffers)>HealthcheckHistory.get_max_checks():
+                    HealthcheckHistory._buffers.popitem(last=False)
+            else:
+                HealthcheckHistory._buffers.move_to_end(key)
+            # Taken under the lock so the timestamps of a buffer, and of the rows written to the history database, only increase
+            timestamp=timestamp or time.time()
+            buffer.append(timestamp, status_code, latency_seconds*1000, usage)
+            HealthcheckHistoryDatabase.enqueue(check_type, synonym, timestamp, status_code, latency_seconds*1000, usage)
+
+    @staticmethod
+    def _to_point(buffer:HealthcheckHistoryBuffer,indices:list[int])->HealthcheckHistoryPoint:
+        """ Summarize consecutive results of a buffer as a single point.
+
+        Args:
+            buffer (HealthcheckHistoryBuffer): The buffer of the check.
+            indices (list[int]): The positions of the results, oldest first.
+
+        Returns:
+            HealthcheckHistoryPoint: The point with the worst status, the average and maximum latency and the highest usage.
+        """
+        latencies=[buffer.latencies_ms[index] for index in indices]
+        usage=max(buffer.usages[index] for index in indices)
+        return HealthcheckHistoryPoint(timestamp=buffer.timestamps[indices[0]],
+                                       status=HealthcheckHistory._STATUSES[max(buffer.status_codes[index] for index in indices)],
+                                       latency_ms=round(sum(latencies)/len(latencies), 3),
+                                       max_latency_ms=round(max(latencies), 3),
+                                       usage_percentage=None if usage<0 else usage,
+                                       samples=len(indices))
+
+    @staticmethod
+    def _downsample(buffer:HealthcheckHistoryBuffer,indices:list[int],max_points:int=None)->list[HealthcheckHistoryPoint]:
+        """ Turn the results of a buffer into at most max_points points of equal time width.
+
+        Args:
+            buffer (HealthcheckHistoryBuffer): The buffer of the check.
+            indices (list[int]): The positions of the results, oldest first.
+            max_points (int, optional): Maximum number of points, one point per result when not provided.
+
+        Returns:
+            list[HealthcheckHistoryPoint]: The points, oldest first, time ranges without results have no point.
+        """
+        if max_points is None or len(indices)<=max_points:
+            return [HealthcheckHistory._to_point(buffer, [index]) for index in indices]
+        first_timestamp=buffer.timestamps[indices[0]]
+        width=(buffer.timestamps[indices[-1]]-first_timestamp)/max_points
+        points=[]
+        bucket_indices=[]
+        current_bucket=0
+        for index in indices:
+            bucket=min(int((buffer.timestamps[index]-first_timestamp)/width), max_points-1) if width>0 else 0
+            # Indices are in time order, so a new bucket closes the previous one
+            if bucket!=current_bucket and bucket_indices:
+                points.append(HealthcheckHistory._to_point(buffer, bucket_indices))
+                bucket_indices=[]
+            current_bucket=bucket
+            bucket_indices.append(index)
+        if bucket_indices:
+            points.append(HealthcheckHistory._to_point(buffer, bucket_indices))
+        return points
+
+    @staticmethod
+    def _get_database_history(check_type:str=None,synonym:str=None,start:float=None,end:float=None,max_points:int=None)->list[HealthcheckHistorySeries]:
+        """ Get the results of the health checks within a time range from the history database.
+
+        Args:
+            check_type (str, optional): Only return checks of this check type.
+            synonym (str, optional): Only return checks with this synonym.
+            start (float, optional): Unix timestamp of the earliest result.
+            end (float, optional): Unix timestamp of the latest result.
+            max_points (int, optional): Downsample each check to at most this many points.
+
+        Returns:
+            list[HealthcheckHistorySeries]: The history of each matching check with at least one result in the range,
+            ordered by check type and synonym.
+        """
+        series=[]
+        for row_check_type, row_synonym, timestamp, status_code, latency_ms, max_latency_ms, usage, samples in HealthcheckHistoryDatabase.query(
+                check_type, synonym, start, end, max_points):
+            if not series or (series[-1].check_type, series[-1].synonym)!=(row_check_type, row_synonym):
+                series.append(HealthcheckHistorySeries(check_type=row_check_type, synonym=row_synonym))
+            series[-1].points.append(HealthcheckHistoryPoint(timestamp=timestamp, status=HealthcheckHistory._STATUSES[status_code],
+                                                             latency_ms=round(latency_ms, 3), max_latency_ms=round(max_latency_ms, 3),
+                                                             usage_percentage=None if usage<0 else usage, samples=samples))
+        return series
+
+    @staticmethod
+    def get_history(check_type:str=None,synonym:str=None,start:float=None,end:float=None,max_points:int=None,source:str=None)->list[HealthcheckHistorySeries]:
+        """ Get the recorded results of the health checks within a time range.
+
+        Args:
+            check_type (str, optional): Only return checks of this check type.
+            synonym (str, optional): Only return checks with this synonym.
+            start (float, optional): Unix timestamp of the earliest result.
+            end (float, optional): Unix timestamp of the latest result.
+            max_points (int, optional): Downsample each check to at most this many points.
+            source (str, optional): 'memory' for the ring buffers or 'database' for the history database.
+                Defaults to the history database while it is running, the ring buffers otherwise.
+
+        Returns:
+            list[HealthcheckHistorySeries]: The history of each matching check with at least one result in the range,
+            ordered by check type and synonym.
+        """
+        if source is None:
+            source='database' if HealthcheckHistoryDatabase.is_running() else 'memory'
+        if source=='database':
+            return HealthcheckHistory._get_database_history(check_type, synonym, start, end, max_points)
+        copies=[]
+        # Only the matching results are copied under the lock, so downsampling does not hold back record
+        with HealthcheckHistory._lock:
+            for (buffer_check_type, buffer_synonym), buffer in HealthcheckHistory._buffers.items():
+                if (check_type is not None and buffer_check_type!=check_type) or (synonym is not None and buffer_synonym!=synonym):
+                    continue
+                indices=buffer.get_indices(start, end)
+                if indices:
+                    copies.append((buffer_check_type, buffer_synonym, buffer.copy(indices)))
+        return [HealthcheckHistorySeries(check_type=buffer_check_type, synonym=buffer_synonym,
+                                         points=HealthcheckHistory._downsample(copied, range(len(copied)), max_points))
+                for buffer_check_type, buffer_synonym, copied in sorted(copies, key=lambda item: item[:2])]
+
+    @staticmethod
+    def clear():
+        """ Drop the history of every health check.
+        """
+        with HealthcheckHistory._lock:
+            HealthcheckHistory._buffers.clear()
@@ -0,0 +1,387 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck History Database")
+class HealthcheckHistoryDatabase:
+    """ A class to persist every health check result to a local SQLite database, written in batches by a background thread.
+    """
+    SCHEMA_VERSION=1
+    # Seconds between two retention compactions
+    COMPACT_INTERVAL=3600
+    _lock=threading.Lock()
+    _queue:queue.Queue=None
+    _writer:threading.Thread=None
+    _database_file:str=None
+    _dropped_rows=0
+    # Marks the end of the queue when stopping
+    _STOP=object()
+
+    @staticmethod
+    def get_database_file()->Optional[str]:
+        """ Get the location of the history database.
+
+        Returns:
+            Optional[str]: HEALTH_CHECK_HISTORY_DATABASE environment variable, None when the database is disabled.
+        """
+        return os.getenv('HEALTH_CHECK_HISTORY_DATABASE') or None
+
+    @staticmethod
+    def get_batch_size()->int:
+        """ Get the most rows committed in a single transaction.
+
+        Returns:
+            int: HEALTH_CHECK_HISTORY_DATABASE_BATCH_SIZE environment variable or 1000.
+        """
+        return int(os.getenv('HEALTH_CHECK_HISTORY_DATABASE_BATCH_SIZE', '1000'))
+
+    @staticmethod
+    def get_flush_interval()->float:
+        """ Get how long rows are gathered before they are committed together.
+
+        Returns:
+            float: Seconds from HEALTH_CHECK_HISTORY_DATABASE_FLUSH_MS environment variable or 500 milliseconds.
+        """
+        return int(os.getenv('HEALTH_CHECK_HISTORY_DATABASE_FLUSH_MS', '500'))/1000
+
+    @staticmethod
+    def get_retention_days()->float:
+        """ Get how long results are kept in the database.
+
+        Returns:
+            float: Days from HEALTH_CHECK_HISTORY_DATABASE_RETENTION_DAYS environment variable or 7.
+        """
+        return float(os.getenv('HEALTH_CHECK_HISTORY_DATABASE_RETENTION_DAYS', '7'))
+
+    @staticmethod
+    def get_queue_size()->int:
+        """ Get the most rows waiting to be written, rows recorded while the queue is full are dropped.
+
+        Returns:
+            int: HEALTH_CHECK_HISTORY_DATABASE_QUEUE_SIZE environment variable or 100000.
+        """
+        return int(os.getenv('HEALTH_CHECK_HISTORY_DATABASE_QUEUE_SIZE', '100000'))
+
+    @staticmethod
+    def _connect(database_file:str)->sqlite3.Connection:
+        """ Open a connection to the history database in WAL mode.
+
+        With WAL readers never block the writer and the writer never blocks readers.
+        NORMAL synchronous mode only syncs at checkpoints, a power loss may lose the last commits but never corrupts the database.
+
+        Args:
+            database_file (str): The path to the database file.
+
+        Returns:
+            sqlite3.Connection: The connection in autocommit mode, transactions are opened explicitly.
+        """
+        connection=sqlite3.connect(database_file, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def _create_schema(connection:sqlite3.Connection):
+        """ Create the tables and indexes of the history database if they do not exist.
+
+        Checks are stored once and results refer to them by id, which keeps millions of rows compact. Results are clustered
+        on check and time, so the history of a check over a time range is a single range read and the table needs no other index.
+
+        Args:
+            connection (sqlite3.Connection): A connection to the history database.
+        """
+        # Must be set before the first table is created so deleted pages can be given back to the file system
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.executescript("""
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS checks (
+                id INTEGER PRIMARY KEY,
+                check_type TEXT NOT NULL,
+                synonym TEXT NOT NULL,
+                UNIQUE (synonym, check_type)
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                check_id INTEGER NOT NULL REFERENCES checks (id),
+                timestamp REAL NOT NULL,
+                status INTEGER NOT NULL,
+                latency_ms REAL NOT NULL,
+                usage INTEGER NOT NULL,
+                PRIMARY KEY (check_id, timestamp)
+            ) WITHOUT ROWID;
+            COMMIT;
+        """)
+        connection.execute(f"PRAGMA user_version={HealthcheckHistoryDatabase.SCHEMA_VERSION}")
+
+    @staticmethod
+    def is_running()->bool:
+        """ Check whether results are being written to the history database.
+
+        Returns:
+            bool: True if the writer thread is running, False otherwise.
+        """
+        return HealthcheckHistoryDatabase._writer is not None
+
+    @staticmethod
+    def start(database_file:str=None)->bool:
+        """ Create the history database if needed and start the writer thread.
+
+        Args:
+            database_file (str, optional): The path to the database file, HEALTH_CHECK_HISTORY_DATABASE environment variable when not provided.
+
+        Returns:
+            bool: True if the writer thread is running, False when the database is disabled or cannot be opened.
+        """
+        database_file=database_file or HealthcheckHistoryDatabase.get_database_file()
+        with HealthcheckHistoryDatabase._lock:
+            if HealthcheckHistoryDatabase._writer is not None or not database_file:
+                return HealthcheckHistoryDatabase._writer is not None
+            try:
+                connection=HealthcheckHistoryDatabase._connect(database_file)
+                HealthcheckHistoryDatabase._create_schema(connection)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open history database {database_file} caused by {e}")
+                return False
+            HealthcheckHistoryDatabase._database_file=database_file
+            HealthcheckHistoryDatabase._queue=queue.Queue(maxsize=HealthcheckHistoryDatabase.get_queue_size())
+            HealthcheckHistoryDatabase._writer=threading.Thread(target=HealthcheckHistoryDatabase._write_loop,
+                                                                 args=(connection, HealthcheckHistoryDatabase._queue),
+                                                                 name="healthcheck-history-writer", daemon=True)
+            HealthcheckHistoryDatabase._writer.start()
+            logger.info(f"Writing health check history to {database_file}")
+            return True
+
+    @staticmethod
+    def stop():
+        """ Write the remaining rows and stop the writer thread.
+        """
+        with HealthcheckHistoryDatabase._lock:
+            writer, results_queue=HealthcheckHistoryDatabase._writer, HealthcheckHistoryDatabase._queue
+            HealthcheckHistoryDatabase._writer=None
+            HealthcheckHistoryDatabase._queue=None
+        if writer is None:
+            return
+        # Blocks until the writer makes room, so no row recorded before stopping is lost
+        results_queue.put(HealthcheckHistoryDatabase._STOP)
+        writer.join()
+
+    @staticmethod
+    def enqueue(check_type:str,synonym:str,timestamp:float,status_code:int,latency_ms:float,usage:int):
+        """ Hand a result over to the writer thread without waiting for it to be written.
+
+        Args:
+            check_type (str): The check type as used in the configuration file.
+            synonym (str): The synonym of the check.
+            timestamp (float): Unix timestamp of the result.
+            status_code (int): The status code as in HealthcheckHistory.STATUS_CODES.
+            latency_ms (float): Duration of the check in milliseconds.
+            usage (int): Usage percentage, -1 when the check has none.
+        """
+        results_queue=HealthcheckHistoryDatabase._queue
+        if results_queue is None:
+            return
+        try:
+            results_queue.put_nowait((check_type, synonym, timestamp, status_code, latency_ms, usage))
+        except queue.Full:
+            # Never slow the checks down when the disk cannot keep up
+            HealthcheckHistoryDatabase._dropped_rows+=1
+
+    @staticmethod
+    def flush():
+        """ Wait until every result handed over so far is committed.
+        """
+        results_queue=HealthcheckHistoryDatabase._queue
+        if results_queue is not None:
+            results_queue.join()
+
+    @staticmethod
+    def get_dropped_rows()->int:
+        """ Get the number of results dropped because the queue was full.
+
+        Returns:
+            int: The number of dropped results since the process started.
+        """
+        return HealthcheckHistoryDatabase._dropped_rows
+
+    @staticmethod
+    def _get_check_id(connection:sqlite3.Connection,check_ids:dict,check_type:str,synonym:str)->int:
+        """ Get the id of a check, adding the check when it is new.
+
+        Args:
+            connection (sqlite3.Connection): The writer connection, within a transaction.
+            check_ids (dict): (check type, synonym) mapped to the id of the checks already known by the writer.
+            check_type (str): The check type.
+            synonym (str): The synonym of the check.
+
+        Returns:
+            int: The id of the check.
+        """
+        key=(check_type, synonym)
+        check_id=check_ids.get(key)
+        if check_id is None:
+            connection.execute("INSERT OR IGNORE INTO checks (check_type, synonym) VALUES (?, ?)", key)
+            check_id=check_ids[key]=connection.execute("SELECT id FROM checks WHERE check_type=? AND synonym=?", key).fetchone()[0]
+        return check_id
+
+    @staticmethod
+    def _write_batch(connection:sqlite3.Connection,check_ids:dict,rows:list[tuple]):
+        """ Commit a batch of results in a single transaction.
+
+        Args:
+            connection (sqlite3.Connection): The writer connection.
+            check_ids (dict): (check type, synonym) mapped to the id of the checks already known by the writer.
+            rows (list[tuple]): The results as handed over to enqueue.
+        """
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR IGNORE INTO results (check_id, timestamp, status, latency_ms, usage) VALUES (?, ?, ?, ?, ?)",
+                                   [(HealthcheckHistoryDatabase._get_check_id(connection, check_ids, check_type, synonym), *values)
+                                    for check_type, synonym, *values in rows])
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            # Ids added by the rolled back transaction do not exist
+            check_ids.clear()
+            raise
+
+    @staticmethod
+    def compact(connection:sqlite3.Connection,before:float)->int:
+        """ Delete the results older than a timestamp and give the freed pages back to the file system.
+
+        Args:
+            connection (sqlite3.Connection): A connection to the history database.
+            before (float): Unix timestamp, older results are deleted.
+
+        Returns:
+            int: The number of deleted results.
+        """
+        deleted=0
+        # One short transaction per check, each a range delete on the primary key, so readers and the writer are never blocked for long
+        for (check_id,) in connection.execute("SELECT id FROM checks").fetchall():
+            deleted+=connection.execute("DELETE FROM results WHERE check_id=? AND timestamp<?", (check_id, before)).rowcount
+        if deleted:
+            connection.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    @staticmethod
+    def _write_loop(connection:sqlite3.Connection,results_queue:queue.Queue):
+        """ Gather the results handed over to enqueue and commit them in batches until stopped.
+
+        After the first result of a batch arrives, more results are gathered for the flush interval or until the batch is full,
+        so a burst of checks is written with a single commit.
+
+        Args:
+            connection (sqlite3.Connection): The writer connection.
+            results_queue (queue.Queue): The queue the results are handed over through.
+        """
+        check_ids={}
+        batch_size=HealthcheckHistoryDatabase.get_batch_size()
+        flush_interval=HealthcheckHistoryDatabase.get_flush_interval()
+        next_compaction=0
+        is_stopping=False
+        while not is_stopping:
+            try:
+                rows=[results_queue.get(timeout=HealthcheckHistoryDatabase.COMPACT_INTERVAL)]
+            except queue.Empty:
+                rows=[]
+            flush_at=time.monotonic()+flush_interval
+            while rows and len(rows)<batch_size and rows[-1] is not HealthcheckHistoryDatabase._STOP:
+                try:
+                    rows.append(results_queue.get(timeout=max(0, flush_at-time.monotonic())))
+                except queue.Empty:
+                    break
+            is_stopping=any(row is HealthcheckHistoryDatabase._STOP for row in rows)
+            results=[row for row in rows if row is not HealthcheckHistoryDatabase._STOP]
+            try:
+                if results:
+                    HealthcheckHistoryDatabase._write_batch(connection, check_ids, results)
+                if time.monotonic()>=next_compaction:
+                    next_compaction=time.monotonic()+HealthcheckHistoryDatabase.COMPACT_INTERVAL
+                    deleted=HealthcheckHistoryDatabase.compact(connection, time.time()-HealthcheckHistoryDatabase.get_retention_days()*86400)
+                    if deleted:
+                        logger.info(f"Deleted {deleted} results older than the retention from the history database")
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(results)} results to the history database caused by {e}")
+            finally:
+                for _ in rows:
+                    results_queue.task_done()
+        connection.close()
+
+    @staticmethod
+    def _get_filters(check_type:str=None,synonym:str=None,start:float=None,end:float=None)->tuple[str,list]:
+        """ Build the WHERE clause selecting the results of a history query.
+
+        Args:
+            check_type (str, optional): Only select checks of this check type.
+            synonym (str, optional): Only select checks with this synonym.
+            start (float, optional): Unix timestamp of the earliest result.
+            end (float, optional): Unix timestamp of the latest result.
+
+        Returns:
+            tuple[str,list]: The clause and its parameters.
+        """
+        conditions, parameters=["1"], []
+        for condition, value in (("checks.check_type=?", check_type), ("checks.synonym=?", synonym),
+                                 ("results.timestamp>=?", start), ("results.timestamp<=?", end)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        return " AND ".join(conditions), parameters
+
+    @staticmethod
+    def query(check_type:str=None,synonym:str=None,start:float=None,end:float=None,max_points:int=None)->list[tuple]:
+        """ Read the results of the matching checks within a time range, downsampled by the database.
+
+        With max_points the range of each check is split into that many intervals of equal time width,
+        and each interval is summarized by a single row.
+
+        Args:
+            check_type (str, optional): Only return checks of this check type.
+            synonym (str, optional): Only return checks with this synonym.
+            start (float, optional): Unix timestamp of the earliest result.
+            end (float, optional): Unix timestamp of the latest result.
+            max_points (int, optional): Downsample each check to at most this many rows.
+
+        Returns:
+            list[tuple]: Rows of check type, synonym, first timestamp, worst status code, average latency, maximum latency,
+            highest usage and number of results, ordered by check type, synonym and time.
+        """
+        database_file=HealthcheckHistoryDatabase._database_file or HealthcheckHistoryDatabase.get_database_file()
+        if not database_file or not os.path.exists(database_file):
+            return []
+        where, parameters=HealthcheckHistoryDatabase._get_filters(check_type, synonym, start, end)
+        # CROSS JOIN keeps checks as the outer loop, so the results of each check are read as a primary key range
+        if max_points is None:
+            statement=f"""
+                SELECT checks.check_type, checks.synonym, results.timestamp, results.status, results.latency_ms, results.latency_ms, results.usage, 1
+                FROM checks CROSS JOIN results ON results.check_id=checks.id
+                WHERE {where}
+                ORDER BY checks.check_type, checks.synonym, results.timestamp"""
+        else:
+            statement=f"""
+                WITH bounds AS (
+                    SELECT results.check_id, MIN(results.timestamp) AS first, MAX(results.timestamp) AS last, COUNT(*) AS samples
+                    FROM checks CROSS JOIN results ON results.check_id=checks.id
+                    WHERE {where}
+                    GROUP BY results.check_id
+                )
+                SELECT checks.check_type, checks.synonym, MIN(results.timestamp), MAX(results.status), AVG(results.latency_ms),
+                       MAX(results.latency_ms), MAX(results.usage), COUNT(*),
+                       CASE WHEN bounds.samples<=? THEN results.timestamp
+                            WHEN bounds.last>bounds.first
+                            THEN MIN(CAST((results.timestamp-bounds.first)*?/(bounds.last-bounds.first) AS INTEGER), ?-1)
+                            ELSE 0 END AS bucket
+                FROM checks CROSS JOIN results ON results.check_id=checks.id JOIN bounds ON bounds.check_id=results.check_id
+                WHERE {where}
+                GROUP BY results.check_id, bucket
+                ORDER BY checks.check_type, checks.synonym, MIN(results.timestamp)"""
+            # Checks with no more results than max_points keep one row per result, like the in-memory history
+            parameters=parameters+[max_points, max_points, max_points]+parameters
+        connection=HealthcheckHistoryDatabase._connect(database_file)
+        try:
+            return [row[:8] for row in connection.execute(statement, parameters)]
+        finally:
+            connection.close()
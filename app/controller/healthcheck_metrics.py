@@ -0,0 +1,344 @@
+import bisect
+import threading
+import time
+from app.schema.healthcheck_config import AllHealthcheckConfig
+
+def _format_labels(label_names:tuple[str,...],label_values:tuple)->str:
+    """ Format label pairs in the Prometheus text exposition format.
+
+    Args:
+        label_names (tuple[str,...]): The label names.
+        label_values (tuple): The label values in the same order.
+
+    Returns:
+        str: The formatted labels including braces, empty when there are no labels.
+    """
+    if not label_names:
+        return ""
+    pairs=[]
+    for name, value in zip(label_names, label_values):
+        escaped=str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{"+",".join(pairs)+"}"
+
+def _format_value(value:float)->str:
+    """ Format a sample value in the Prometheus text exposition format.
+
+    Args:
+        value (float): The sample value.
+
+    Returns:
+        str: The formatted value.
+    """
+    if value==float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Collector:
+    """ Values per label set kept behind a lock, the base of every metric type.
+    """
+
+    def __init__(self,name:str,documentation:str,label_names:tuple[str,...]=()):
+        self.name=name
+        self.documentation=documentation
+        self.label_names=label_names
+        self._lock=threading.Lock()
+        self._values:dict[tuple,object]={}
+
+    def snapshot(self)->dict[tuple,object]:
+        """ Copy the values of every label set.
+
+        Returns:
+            dict[tuple,object]: The label values mapped to the value of the label set.
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def retain(self,keep)->int:
+        """ Drop the series of the label sets that are no longer wanted.
+
+        Args:
+            keep (callable): Called with the label values of each series, returns whether to keep it.
+
+        Returns:
+            int: The number of dropped series.
+        """
+        with self._lock:
+            dropped=[labels for labels in self._values if not keep(labels)]
+            for labels in dropped:
+                del self._values[labels]
+        return len(dropped)
+
+    def clear(self):
+        """ Drop every series.
+        """
+        with self._lock:
+            self._values={}
+
+class Counter(Collector):
+    """ A monotonically increasing value per label set.
+    """
+
+    def inc(self,*label_values,amount:float=1):
+        """ Increase the counter of a label set.
+
+        Args:
+            *label_values: The label values in the order of label_names.
+            amount (float, optional): The increment. The default value is 1.
+        """
+        with self._lock:
+            self._values[label_values]=self._values.get(label_values, 0)+amount
+
+    def render(self,values:dict[tuple,float]=None)->list[str]:
+        """ Render the counter in the Prometheus text exposition format.
+
+        Args:
+            values (dict[tuple,float], optional): Values computed at scrape time to render instead of the stored ones.
+
+        Returns:
+            list[str]: The exposition lines.
+        """
+        if values is None:
+            values=self.snapshot()
+        lines=[f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}" for labels, value in values.items())
+        return lines
+
+class Gauge(Collector):
+    """ A value per label set that can go up and down.
+    """
+
+    def set(self,value:float,*label_values):
+        """ Set the gauge of a label set.
+
+        Args:
+            value (float): The new value.
+            *label_values: The label values in the order of label_names.
+        """
+        with self._lock:
+            self._values[label_values]=value
+
+    def inc(self,*label_values,amount:float=1):
+        """ Increase the gauge of a label set, use a negative amount to decrease it.
+
+        Args:
+            *label_values: The label values in the order of label_names.
+            amount (float, optional): The increment. The default value is 1.
+        """
+        with self._lock:
+            self._values[label_values]=self._values.get(label_values, 0)+amount
+
+    def get(self,*label_values)->float:
+        """ Get the gauge of a label set.
+
+        Args:
+            *label_values: The label values in the order of label_names.
+
+        Returns:
+            float: The current value, 0 when the label set was never set.
+        """
+        return self._values.get(label_values, 0)
+
+    def render(self,values:dict[tuple,float]=None)->list[str]:
+        """ Render the gauge in the Prometheus text exposition format.
+
+        Args:
+            values (dict[tuple,float], optional): Values computed at scrape time to render instead of the stored ones.
+
+        Returns:
+            list[str]: The exposition lines.
+        """
+        if values is None:
+            values=self.snapshot()
+        lines=[f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        lines.extend(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}" for labels, value in values.items())
+        return lines
+
+class Histogram(Collector):
+    """ Bucketed observations per label set.
+    """
+    DEFAULT_BUCKETS=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self,name:str,documentation:str,label_names:tuple[str,...]=(),buckets:tuple[float,...]=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets=tuple(sorted(buckets))
+        # Per label set: observation count of each bucket (non cumulative), sum and count
+        self._values:dict[tuple,list]={}
+
+    def snapshot(self)->dict[tuple,tuple[list[int],float,int]]:
+        """ Copy the observations of every label set.
+
+        Returns:
+            dict[tuple,tuple[list[int],float,int]]: The label values mapped to the non cumulative bucket counts, the sum and the count.
+        """
+        with self._lock:
+            return {labels:(list(series[0]), series[1], series[2]) for labels, series in self._values.items()}
+
+    def observe(self,value:float,*label_values):
+        """ Record an observation for a label set.
+
+        Args:
+            value (float): The observed value.
+            *label_values: The label values in the order of label_names.
+        """
+        bucket_index=bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series=self._values.get(label_values)
+            if series is None:
+                series=self._values[label_values]=[[0]*(len(self.buckets)+1), 0.0, 0]
+            series[0][bucket_index]+=1
+            series[1]+=value
+            series[2]+=1
+
+    def render(self)->list[str]:
+        """ Render the histogram in the Prometheus text exposition format.
+
+        Returns:
+            list[str]: The exposition lines.
+        """
+        values=self.snapshot()
+        lines=[f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        label_names=self.label_names+("le",)
+        for labels, (bucket_counts, total, count) in values.items():
+            cumulative=0
+            for upper_bound, bucket_count in zip(self.buckets+(float("inf"),), bucket_counts):
+                cumulative+=bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(label_names, labels+(_format_value(upper_bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+class HealthcheckMetrics:
+    """ A class to keep low overhead in-process metrics of the health checks and render them for Prometheus.
+    """
+    CHECK_LABELS=('synonym', 'check_type')
+    check_duration=Histogram("healthcheck_check_duration_seconds", "Duration of individual health checks.", CHECK_LABELS)
+    check_results=Counter("healthcheck_check_results_total", "Individual health check results by status.", CHECK_LABELS+('status',))
+    last_checked=Gauge("healthcheck_last_result_timestamp_seconds", "Unix time of the last result of each health check.", CHECK_LABELS)
+    last_result_age=Gauge("healthcheck_last_result_age_seconds", "Age of the last result of each health check.", CHECK_LABELS)
+    checks_in_flight=Gauge("healthcheck_checks_in_flight", "Health checks currently running.")
+    dns_lookup_duration=Histogram("healthcheck_tcp_dns_lookup_seconds", "Duration of probe target name resolutions.", ('hostname',))
+    connect_duration=Histogram("healthcheck_tcp_connect_seconds", "Duration of TCP probe connects after name resolution.", ('hostname',))
+    open_probe_sockets=Gauge("healthcheck_open_probe_sockets", "TCP probe sockets currently open.")
+    probe_sockets_total=Counter("healthcheck_probe_sockets_total", "TCP probe sockets opened and closed.", ('event',))
+    http_connections_total=Counter("healthcheck_http_connections_total", "Connections used by HTTP probes: opened, reused from the pool, and opened with a resumed TLS session.", ('event',))
+    short_circuited_probes=Counter("healthcheck_short_circuited_probes_total", "Probes answered by an open circuit breaker without connecting.", ('hostname',))
+
+    @staticmethod
+    def check_started():
+        """ Record that an individual health check started.
+        """
+        HealthcheckMetrics.checks_in_flight.inc()
+
+    @staticmethod
+    def check_finished(synonym:str,check_type:str,status:str,duration_seconds:float):
+        """ Record the outcome of an individual health check.
+
+        Args:
+            synonym (str): The synonym of the check.
+            check_type (str): The check type as used in the configuration file.
+            status (str): The resulting status.
+            duration_seconds (float): How long the check took.
+        """
+        HealthcheckMetrics.checks_in_flight.inc(amount=-1)
+        HealthcheckMetrics.check_duration.observe(duration_seconds, synonym, check_type)
+        HealthcheckMetrics.check_results.inc(synonym, check_type, status)
+        HealthcheckMetrics.last_checked.set(time.time(), synonym, check_type)
+
+    @staticmethod
+    def tcp_probe_finished(hostname:str,dns_lookup_seconds:float,connect_seconds:float,is_resolved:bool):
+        """ Record the DNS lookup and connect durations of a TCP probe.
+
+        Args:
+            hostname (str): The probed hostname.
+            dns_lookup_seconds (float): How long the name resolution took.
+            connect_seconds (float): How long the connect took.
+            is_resolved (bool): Whether the hostname was resolved and a connect was attempted.
+        """
+        HealthcheckMetrics.dns_lookup_duration.observe(dns_lookup_seconds, hostname)
+        if is_resolved:
+            HealthcheckMetrics.connect_duration.observe(connect_seconds, hostname)
+
+    @staticmethod
+    def http_probe_finished(is_connection_reused:bool,is_session_reused:bool):
+        """ Record which connection an HTTP probe used.
+
+        Args:
+            is_connection_reused (bool): Whether the request went over a pooled keep-alive connection.
+            is_session_reused (bool): Whether a new TLS connection resumed a previous session.
+        """
+        HealthcheckMetrics.http_connections_total.inc('reused' if is_connection_reused else 'opened')
+        if is_session_reused:
+            HealthcheckMetrics.http_connections_total.inc('tls_resumed')
+
+    @staticmethod
+    def probe_short_circuited(hostname:str):
+        """ Record that an open circuit breaker answered a probe without connecting.
+
+        Args:
+            hostname (str): The hostname that was not probed.
+        """
+        HealthcheckMetrics.short_circuited_probes.inc(hostname)
+
+    @staticmethod
+    def render(probe_socket_counters:dict=None)->str:
+        """ Render all metrics in the Prometheus text exposition format without running any check.
+
+        Args:
+            probe_socket_counters (dict, optional): Probe socket counters as returned by TcpBasedConnection.get_probe_socket_counters.
+
+        Returns:
+            str: The exposition text.
+        """
+        now=time.time()
+        last_checked=HealthcheckMetrics.last_checked.snapshot()
+        lines=[]
+        lines.extend(HealthcheckMetrics.check_duration.render())
+        lines.extend(HealthcheckMetrics.check_results.render())
+        lines.extend(HealthcheckMetrics.last_checked.render(last_checked))
+        # Ages are derived at scrape time from the last result timestamps
+        lines.extend(HealthcheckMetrics.last_result_age.render({labels:round(now-checked_at, 3) for labels, checked_at in last_checked.items()}))
+        lines.extend(HealthcheckMetrics.checks_in_flight.render())
+        lines.extend(HealthcheckMetrics.dns_lookup_duration.render())
+        lines.extend(HealthcheckMetrics.connect_duration.render())
+        lines.extend(HealthcheckMetrics.http_connections_total.render())
+        lines.extend(HealthcheckMetrics.short_circuited_probes.render())
+        if probe_socket_counters is not None:
+            lines.extend(HealthcheckMetrics.open_probe_sockets.render({(): probe_socket_counters['open_probe_sockets']}))
+            lines.extend(HealthcheckMetrics.probe_sockets_total.render({('opened',): probe_socket_counters['opened_probe_sockets_total'],
+                                                                         ('closed',): probe_socket_counters['closed_probe_sockets_total']}))
+        return "\n".join(lines)+"\n"
+
+    @staticmethod
+    def retain_configured(healthcheck_config:AllHealthcheckConfig)->int:
+        """ Drop the series of checks and probe targets that are no longer configured, so removed checks stop being exported.
+
+        Args:
+            healthcheck_config (AllHealthcheckConfig): The configuration that was loaded.
+
+        Returns:
+            int: The number of dropped series.
+        """
+        checks=set()
+        hostnames=set()
+        for check_type, (category, _) in AllHealthcheckConfig.CHECK_TYPES.items():
+            for item in getattr(healthcheck_config, category) or []:
+                checks.add((item.synonym, check_type))
+                if hasattr(item, 'hostname'):
+                    hostnames.add(item.hostname)
+        dropped=0
+        for collector in (HealthcheckMetrics.check_duration, HealthcheckMetrics.check_results, HealthcheckMetrics.last_checked):
+            # The synonym and check type are the first two labels of every check series
+            dropped+=collector.retain(lambda labels: labels[:2] in checks)
+        for collector in (HealthcheckMetrics.dns_lookup_duration, HealthcheckMetrics.connect_duration, HealthcheckMetrics.short_circuited_probes):
+            dropped+=collector.retain(lambda labels: labels[0] in hostnames)
+        return dropped
+
+    @staticmethod
+    def clear():
+        """ Reset all metrics.
+        """
+        for collector in (HealthcheckMetrics.check_duration, HealthcheckMetrics.check_results, HealthcheckMetrics.last_checked,
+                          HealthcheckMetrics.checks_in_flight, HealthcheckMetrics.dns_lookup_duration, HealthcheckMetrics.connect_duration,
+                          HealthcheckMetrics.http_connections_total, HealthcheckMetrics.short_circuited_probes):
+            collector.clear()
@@ -1,10 +1,24 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
 from app.schema.healthcheck_status import MountPointHealthcheckStatus,WebServiceHealthcheckStatus,RequirementsFileHealthcheckStatus
 from app.schema.healthcheck_status import DatabaseHealthcheckStatus,AllHealthcheckStatus
+from app.schema.mount_point_usage import MountPointUsage
+from app.schema.healthcheck_snapshot import HealthcheckSnapshot
+from app.schema.tcp_probe_result import TcpProbeResult
 from app.controller.tcp_based_connection import TcpBasedConnection
+from app.controller.http_based_connection import HttpBasedConnection
+from app.controller.circuit_breaker import CircuitBreaker
 from app.controller.external_file_processing import ExternalFileProcessing
 from app.controller.terminal_processing import TerminalProcessing
+from app.controller.installed_package_index import InstalledPackageIndex
 from app.controller.healthcheck_foundation import HealthCheckFoundation
+from app.controller.healthcheck_config_cache import HealthcheckConfigCache
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.controller.single_flight import SingleFlight
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.controller.healthcheck_history import HealthcheckHistory
 from app.schema.healthcheck_config import DatabaseHealthcheckConfig,WebserviceHealthcheckConfig,MountPointHealthcheckConfig
 from app.schema.healthcheck_config import AllHealthcheckConfig,RequirementsFileHealthcheckConfig
 from app.logging.logging import return_logging_instance
@@ -13,11 +27,102 @@ logger=return_logging_instance("HealthCheck Processing")
 class HealthCheckProcessing:
     """ A class to handle health check processing tasks such as reading configuration files and performing health checks.
     """
+    # Shared bounded worker pool used to fan out individual checks
+    _executor:ThreadPoolExecutor=None
+    _executor_lock=threading.Lock()
+    # Concurrent callers of the same scope share one in-progress execution
+    _single_flight=SingleFlight()
+
+    @staticmethod
+    def _is_concurrent_mode()->bool:
+        """
+        Check whether health checks should be executed concurrently.
+
+        Returns:
+            bool: True unless HEALTH_CHECK_CONCURRENT environment variable is set to false, 0 or no.
+        """
+        return os.getenv('HEALTH_CHECK_CONCURRENT', 'true').lower() not in ['false', '0', 'no']
+
+    @staticmethod
+    def _get_executor()->ThreadPoolExecutor:
+        """
+        Get the shared worker pool, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The worker pool bounded by HEALTH_CHECK_MAX_WORKERS (default 32).
+        """
+        with HealthCheckProcessing._executor_lock:
+            if HealthCheckProcessing._executor is None:
+                max_workers = int(os.getenv('HEALTH_CHECK_MAX_WORKERS', '32'))
+                logger.info(f"Starting health check worker pool with {max_workers} workers")
+                HealthCheckProcessing._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                                     thread_name_prefix="healthcheck")
+            return HealthCheckProcessing._executor
+
+    @staticmethod
+    def _measured_check(check_function, item, *args):
+        """
+        Run a single check function and record its duration and outcome in HealthcheckMetrics and HealthcheckHistory.
+
+        Args:
+            check_function (callable): The function that checks a single configuration item.
+            item: The configuration item to check.
+            *args: Extra arguments passed to the check function after the configuration item.
+
+        Returns:
+            The result of the check function.
+        """
+        check_type=HealthCheckProcessing._check_types().get(type(item), 'unknown')
+        status='Error'
+        result=None
+        HealthcheckMetrics.check_started()
+        started=time.perf_counter()
+        try:
+            result=check_function(item, *args)
+            status=result.status
+            return result
+        finally:
+            duration=time.perf_counter()-started
+            HealthcheckMetrics.check_finished(item.synonym, check_type, status, duration)
+            HealthcheckHistory.record(check_type, item.synonym, status, duration, getattr(result, 'current_usage', None))
+
+    @staticmethod
+    def _check_types()->dict:
+        """
+        Map each configuration item type to its check type as used in the configuration file.
+
+        Returns:
+            dict: Configuration class mapped to the check type name.
+        """
+        return {
+            DatabaseHealthcheckConfig: 'database',
+            WebserviceHealthcheckConfig: 'webservice',
+            MountPointHealthcheckConfig: 'mount_point',
+            RequirementsFileHealthcheckConfig: 'requirements'
+        }
+
+    @staticmethod
+    def _run_checks(check_function, items:list)->list:
+        """
+        Run a single check function over a list of configuration items, concurrently when enabled.
+
+        Args:
+            check_function (callable): The function that checks a single configuration item.
+            items (list): The configuration items to check.
+
+        Returns:
+            list: The check results in the same order as the configuration items.
+        """
+        # Avoid the pool overhead when there is nothing to fan out
+        measured_check=HealthCheckProcessing._measured_check
+        if not HealthCheckProcessing._is_concurrent_mode() or len(items) < 2:
+            return [measured_check(check_function, item) for item in items]
+        return list(HealthCheckProcessing._get_executor().map(measured_check, [check_function]*len(items), items))
 
     @staticmethod
     def _read_healthcheck_config()->list[dict]:
         """
-        Reads the health check configuration from a file.
+        Reads the health check configuration entries from a file without validating them.
         
         Returns:
             list[dict]: The health check configuration.
@@ -31,24 +136,96 @@ class HealthCheckProcessing:
             return []  # Return an empty list if the file does not exist
         # Read the health check configuration file and return its content as a list of dictionaries
         config_file_content = ExternalFileProcessing.load_health_check_json_schema(config_file_location)
-        logger.info(f"Config file content: {config_file_content}")
-        # Verify if the config schema is not empty
-        if not HealthCheckFoundation.config_schmema_is_not_empty(config_file_content):
-            logger.info("{config_file_location} is Empty")
-            return []
-        # Vertify all elements in the config schema are valid
-        if not all(HealthCheckFoundation.is_valid_health_check_type_element(element) for element in config_file_content):
-            logger.info("One or more of the check elements not valid")
-            return []
+        logger.debug("Config file content: %s", config_file_content)
+        # Validation happens in a single pass when the entries are compiled by HealthcheckConfigCompiler
         return config_file_content  # Return the health check configuration as a list of dictionaries
     
     @staticmethod
-    def _get_healthcheck_config():
-        healthcheck_config_dict = HealthCheckProcessing._read_healthcheck_config()
-        healthcheck_config = AllHealthcheckConfig(healthcheck_config_dict)
-        logger.info(f"healthcheck_config content {healthcheck_config.__dict__}")
-        return healthcheck_config
+    def _get_healthcheck_config()->AllHealthcheckConfig:
+        """
+        Get the parsed health check configuration, re-reading the file only when it changed.
+
+        Returns:
+            AllHealthcheckConfig: The health check configuration.
+        """
+        config_file_location = os.getenv('HEALTH_CHECK_CONFIG_FILE', 'health_check_config.json')
+        return HealthcheckConfigCache.get_config(config_file_location, HealthCheckProcessing._read_healthcheck_config)
     
+    @staticmethod
+    def _probe_target(hostname:str,port:int,probe_function,is_reached=bool)->tuple:
+        """
+        Probe a target through its circuit breaker when enabled.
+
+        Args:
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            probe_function (callable): Probes the target without arguments.
+            is_reached (callable, optional): Tells from the probe result whether the target was reached. Defaults to bool.
+
+        Returns:
+            tuple: The probe result, None when an open circuit breaker answered without probing, and whether it did.
+        """
+        if not CircuitBreaker.is_enabled():
+            return probe_function(), False
+        target=(hostname, port)
+        if not CircuitBreaker.allow(target):
+            HealthcheckMetrics.probe_short_circuited(hostname)
+            return None, True
+        result=None
+        try:
+            result=probe_function()
+            return result, False
+        finally:
+            # Also record unexpected errors so a trial probe never keeps the circuit half-open
+            CircuitBreaker.record(target, result is not None and is_reached(result))
+
+    @staticmethod
+    def _establish_tcp_connection(hostname:str,port:int)->tuple[TcpProbeResult,bool]:
+        """
+        Establish a TCP connection to a probe target through its circuit breaker when enabled.
+
+        Args:
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+
+        Returns:
+            tuple[TcpProbeResult,bool]: The probe result with the stage that failed and its timings, None when an open
+            circuit breaker answered without connecting, and whether it did.
+        """
+        return HealthCheckProcessing._probe_target(
+            hostname, port, lambda: TcpBasedConnection.probe_tcp_connection(hostname, port),
+            is_reached=lambda result: result.is_connected)
+
+    @staticmethod
+    def _webservice_http_health_check(webservice:WebserviceHealthcheckConfig) -> WebServiceHealthcheckStatus:
+        """
+        Perform an HTTP or HTTPS request health check on a single web service.
+
+        Args:
+            webservice (WebserviceHealthcheckConfig): The web service configuration with a path or an expected body.
+
+        Returns:
+            WebServiceHealthcheckStatus: The result with the response status code and whether the body matched.
+        """
+        probe_result, is_short_circuited = HealthCheckProcessing._probe_target(
+            webservice.hostname,
+            webservice.port,
+            lambda: HttpBasedConnection.probe_http_connection(webservice.hostname, webservice.port, webservice.protocol,
+                                                              webservice.path or '/', webservice.expected_body),
+            is_reached=lambda result: result.is_connected
+        )
+        return WebServiceHealthcheckStatus(
+            synonym=webservice.synonym,
+            hostname=webservice.hostname,
+            port=webservice.port,
+            protocol=webservice.protocol,
+            can_tcp=probe_result is not None and probe_result.is_connected,
+            is_short_circuited=is_short_circuited,
+            status_code=probe_result.status_code if probe_result else None,
+            is_body_matched=probe_result.is_body_matched if probe_result else None,
+            failed_stage=probe_result.failed_stage if probe_result else None
+        )
+
     # Webservices health check
     @staticmethod
     def _webservice_health_check(webservice:WebserviceHealthcheckConfig) -> WebServiceHealthcheckStatus:
@@ -61,7 +238,9 @@ class HealthCheckProcessing:
         Returns:
             WebServiceHealthcheckStatus: The result of the web service health check.
         """
-        can_establish_tcp = TcpBasedConnection.establish_tcp_connection(
+        if webservice.is_http_check():
+            return HealthCheckProcessing._webservice_http_health_check(webservice)
+        probe_result, is_short_circuited = HealthCheckProcessing._establish_tcp_connection(
             webservice.hostname,
             webservice.port
         )
@@ -70,7 +249,11 @@ class HealthCheckProcessing:
             hostname=webservice.hostname,
             port=webservice.port,
             protocol=webservice.protocol,
-            can_tcp=can_establish_tcp
+            can_tcp=probe_result is not None and probe_result.is_connected,
+            is_short_circuited=is_short_circuited,
+            failed_stage=probe_result.failed_stage if probe_result else None,
+            dns_lookup_seconds=probe_result.dns_lookup_seconds if probe_result else None,
+            connect_seconds=probe_result.connect_seconds if probe_result else None
         )
 
     # Webservices health check
@@ -92,7 +275,7 @@ class HealthCheckProcessing:
         if not healthcheck_config.webservices or len(healthcheck_config.webservices) == 0:
             return []
         # Perform health checks on each web service and return the results
-        return [HealthCheckProcessing._webservice_health_check(webservice) for webservice in healthcheck_config.webservices]
+        return HealthCheckProcessing._run_checks(HealthCheckProcessing._webservice_health_check, healthcheck_config.webservices)
 
     # Database health check
     @staticmethod
@@ -106,29 +289,34 @@ class HealthCheckProcessing:
         Returns:
             DatabaseHealthcheckStatus: The result of the database health check.
         """
-        can_establish_tcp = TcpBasedConnection.establish_tcp_connection(
+        probe_result, is_short_circuited = HealthCheckProcessing._establish_tcp_connection(
             database.hostname,
             database.port
         )
-        if not can_establish_tcp:
+        if probe_result is None or not probe_result.is_connected:
             return DatabaseHealthcheckStatus(
                 synonym=database.synonym,
                 hostname=database.hostname,
                 port=database.port,
                 database_type=database.database_type,
-                can_tcp=can_establish_tcp
+                can_tcp=False,
+                is_short_circuited=is_short_circuited,
+                failed_stage=probe_result.failed_stage if probe_result else None,
+                dns_lookup_seconds=probe_result.dns_lookup_seconds if probe_result else None,
+                connect_seconds=probe_result.connect_seconds if probe_result else None
             )
-        installed_packages= TerminalProcessing.get_installed_packages()
         # Check if the database driver is installed
-        is_db_driver_installed = any(package in installed_packages for package in database.database_drivers) and len(installed_packages) > 0
+        is_db_driver_installed = any(InstalledPackageIndex.is_installed(package) for package in database.database_drivers)
         # Return the health check result as a DatabaseHealthcheckStatus object
         return DatabaseHealthcheckStatus(
             synonym=database.synonym,
             hostname=database.hostname,
             port=database.port,
             database_type=database.database_type,
-            can_tcp=can_establish_tcp,
-            db_driver_installed=is_db_driver_installed
+            can_tcp=True,
+            db_driver_installed=is_db_driver_installed,
+            dns_lookup_seconds=probe_result.dns_lookup_seconds,
+            connect_seconds=probe_result.connect_seconds
         )
 
     # Databases health check
@@ -150,41 +338,45 @@ class HealthCheckProcessing:
         if not healthcheck_config.databases or len(healthcheck_config.databases) == 0:
             return []
         # Perform health checks on each database and return the results
-        return [HealthCheckProcessing._database_health_check(database) for database in healthcheck_config.databases]
+        return HealthCheckProcessing._run_checks(HealthCheckProcessing._database_health_check, healthcheck_config.databases)
 
 
     # Mount point health check
     @staticmethod
-    def _mount_point_health_check(mount_point:MountPointHealthcheckConfig) -> MountPointHealthcheckStatus:
+    def _mount_point_health_check(mount_point:MountPointHealthcheckConfig,mount_point_usage:MountPointUsage=None) -> MountPointHealthcheckStatus:
         """
         Perform a health check on a single mount point.
         
         Args:
             mount_point (MountPointHealthcheckConfig): The mount point configuration.
+            mount_point_usage (MountPointUsage, optional): Usage already collected for the mount point, read on demand when missing.
             
         Returns:
-            dict: The result of the mount point health check.
+            MountPointHealthcheckStatus: The result of the mount point health check.
         """
         # check if the mount point is mounted by the system
         is_mount_point_mounted=HealthCheckFoundation.is_file_system_mounted(mount_point.mount_point)
-        # if mount point is not mounted return health check status as failed
-        if not is_mount_point_mounted:
+        # Get the usage of the mount point if it was not collected in advance
+        if is_mount_point_mounted and mount_point_usage is None:
+            mount_point_usage=TerminalProcessing.collect_mount_points_usages([mount_point.mount_point])[mount_point.mount_point]
+        # if mount point is not mounted or its usage cannot be read return health check status as failed
+        if not is_mount_point_mounted or mount_point_usage is None:
             return MountPointHealthcheckStatus(
                 synonym=mount_point.synonym,
                 mount_point=mount_point.mount_point,
-                is_mounted=is_mount_point_mounted,
+                is_mounted=False,
                 current_usage=0,
                 threshold_percentage=mount_point.threshold_percentage
             )
-        # Get the usage percentage of the mount point
-        usage_percentage = TerminalProcessing.get_mount_point_usages(mount_point.mount_point) if is_mount_point_mounted else None
         # Return the health check result
         return  MountPointHealthcheckStatus(
             synonym=mount_point.synonym,
             mount_point=mount_point.mount_point,
             is_mounted=is_mount_point_mounted,
-            current_usage=usage_percentage,
-            threshold_percentage=mount_point.threshold_percentage
+            current_usage=mount_point_usage.usage_percentage,
+            threshold_percentage=mount_point.threshold_percentage,
+            used_bytes=mount_point_usage.used_bytes,
+            total_bytes=mount_point_usage.total_bytes
         )
 
     # Mount points health check
@@ -205,8 +397,11 @@ class HealthCheckProcessing:
         # If no mount points are found, return an empty list
         if not healthcheck_config.mount_points or len(healthcheck_config.mount_points) == 0:
             return []
+        # Collect the usage of all mount points in one pass
+        usages=TerminalProcessing.collect_mount_points_usages([mount_point.mount_point for mount_point in healthcheck_config.mount_points])
         # Perform health checks on each mount point and return the results
-        return [HealthCheckProcessing._mount_point_health_check(mount_point) for mount_point in healthcheck_config.mount_points ]
+        return [HealthCheckProcessing._measured_check(HealthCheckProcessing._mount_point_health_check, mount_point, usages.get(mount_point.mount_point))
+                for mount_point in healthcheck_config.mount_points]
 
     # Required packages health check
     @staticmethod
@@ -230,12 +425,8 @@ class HealthCheckProcessing:
                 is_file_exists=False,
                 are_all_packages_installed=False
             )
-        # Get the list of installed packages
-        installed_packages = TerminalProcessing.get_installed_packages()
-        def normalize_package(package:str):
-            return package.replace('-','_').lower()
         # Check if all required packages are installed
-        are_all_packages_installed = all(pkg.lower() or normalize_package(pkg) in installed_packages for pkg in required_packages)
+        are_all_packages_installed = all(InstalledPackageIndex.is_installed(package) for package in required_packages)
         # Return the health check result as a RequirementsFileHealthcheckStatus object
         return RequirementsFileHealthcheckStatus(
             synonym=requirements.synonym,
@@ -263,22 +454,258 @@ class HealthCheckProcessing:
         if not healthcheck_config.requirements_files or len(healthcheck_config.requirements_files) == 0:
             return []
         # Perform health checks on each requirements and return the results
-        return [HealthCheckProcessing._required_packages_health_check(requirements) for requirements in healthcheck_config.requirements_files]
+        return HealthCheckProcessing._run_checks(HealthCheckProcessing._required_packages_health_check, healthcheck_config.requirements_files)
+
+    @staticmethod
+    def _category_checks()->dict:
+        """
+        Map each health check category to its single check function.
+
+        Returns:
+            dict: Category name (as used by AllHealthcheckConfig and AllHealthcheckStatus) mapped to its check function.
+        """
+        return {
+            'databases': HealthCheckProcessing._database_health_check,
+            'webservices': HealthCheckProcessing._webservice_health_check,
+            'mount_points': HealthCheckProcessing._mount_point_health_check,
+            'requirements_files': HealthCheckProcessing._required_packages_health_check
+        }
+
+    @staticmethod
+    def _category_health_checks()->dict:
+        """
+        Map each health check category to the function checking the whole category.
+
+        Returns:
+            dict: Category name mapped to its category check function.
+        """
+        return {
+            'databases': HealthCheckProcessing.databases_health_check,
+            'webservices': HealthCheckProcessing.webservices_health_check,
+            'mount_points': HealthCheckProcessing.mount_points_health_check,
+            'requirements_files': HealthCheckProcessing.all_required_packages_health_check
+        }
+
+    @staticmethod
+    def _unknown_status(category:str,item):
+        """
+        Build the status of a check that did not finish before the deadline.
+
+        Args:
+            category (str): The category name of the check.
+            item: The configuration of the check.
+
+        Returns:
+            The status of the check with HealthcheckStatusEnum.UNKNOWN status and no measurements.
+        """
+        match category:
+            # Statuses without measurements get HealthcheckStatusEnum.UNKNOWN status
+            case 'databases':
+                return DatabaseHealthcheckStatus(synonym=item.synonym, hostname=item.hostname, port=item.port,
+                                                 database_type=item.database_type, can_tcp=None)
+            case 'webservices':
+                return WebServiceHealthcheckStatus(synonym=item.synonym, hostname=item.hostname, port=item.port,
+                                                   protocol=item.protocol, can_tcp=None)
+            case 'mount_points':
+                return MountPointHealthcheckStatus(synonym=item.synonym, mount_point=item.mount_point, is_mounted=None,
+                                                   current_usage=None, threshold_percentage=item.threshold_percentage)
+            case _:
+                return RequirementsFileHealthcheckStatus(synonym=item.synonym, requirements_file_path=item.requirements_file_path,
+                                                         is_file_exists=None, are_all_packages_installed=None)
+
+    @staticmethod
+    def get_default_deadline_ms()->int:
+        """
+        Get the deadline applied when the caller does not provide one.
+
+        Returns:
+            int: Milliseconds from HEALTH_CHECK_DEADLINE_MS environment variable, None when not set.
+        """
+        deadline_ms=os.getenv('HEALTH_CHECK_DEADLINE_MS')
+        return int(deadline_ms) if deadline_ms else None
+
+    @staticmethod
+    def categories_health_check(categories:list[str]=None,healthcheck_config:AllHealthcheckConfig=None,deadline_ms:int=None) -> dict[str,list]:
+        """
+        Perform the health checks of the selected categories.
+
+        In concurrent mode every individual check of every selected category is submitted to the shared worker pool,
+        so the total latency is close to the slowest single check instead of the sum of all checks.
+        Concurrent calls for the same categories without an explicit configuration share one execution and its result.
+
+        Args:
+            categories (list[str], optional): The categories to check, all categories when not provided.
+            healthcheck_config (AllHealthcheckConfig, optional): The health check configuration, read from file when not provided.
+            deadline_ms (int, optional): Return after this many milliseconds reporting unfinished checks with Unknown status.
+                Checks always run on the worker pool when a deadline is given.
+
+        Returns:
+            dict[str,list]: The check results of each selected category.
+        """
+        categories=categories or list(HealthCheckProcessing._category_checks())
+        if not healthcheck_config:
+            # Concurrent callers checking the same categories from the configuration file share one execution
+            return HealthCheckProcessing._single_flight.do(('categories', tuple(categories), deadline_ms),
+                                                           HealthCheckProcessing._run_categories_health_check,
+                                                           categories, HealthCheckProcessing._get_healthcheck_config(), deadline_ms)
+        return HealthCheckProcessing._run_categories_health_check(categories, healthcheck_config, deadline_ms)
+
+    @staticmethod
+    def _submit_category_checks(categories:list[str],healthcheck_config:AllHealthcheckConfig)->dict:
+        """
+        Submit the health checks of the selected categories to the shared worker pool.
+
+        Args:
+            categories (list[str]): The categories to check.
+            healthcheck_config (AllHealthcheckConfig): The health check configuration.
+
+        Returns:
+            dict: Category name mapped to one future per configuration item, or to a single future of the whole list for mount points.
+        """
+        executor=HealthCheckProcessing._get_executor()
+        futures={}
+        for category in categories:
+            if category=='mount_points':
+                # Mount points usage is read in one pass by a single task as it only costs a statvfs call per mount point
+                futures[category]=executor.submit(HealthCheckProcessing.mount_points_health_check, healthcheck_config)
+            else:
+                # Fan out every individual check of the category on the worker pool
+                check_function=HealthCheckProcessing._category_checks()[category]
+                futures[category]=[executor.submit(HealthCheckProcessing._measured_check, check_function, item) for item in getattr(healthcheck_config, category) or []]
+        return futures
 
     @staticmethod
-    def full_health_check() -> AllHealthcheckStatus:
+    def _run_categories_health_check(categories:list[str],healthcheck_config:AllHealthcheckConfig,deadline_ms:int=None) -> dict[str,list]:
+        """
+        Run the health checks of the selected categories.
+
+        Args:
+            categories (list[str]): The categories to check.
+            healthcheck_config (AllHealthcheckConfig): The health check configuration.
+            deadline_ms (int, optional): Return after this many milliseconds reporting unfinished checks with Unknown status.
+
+        Returns:
+            dict[str,list]: The check results of each selected category.
+        """
+        if deadline_ms is None and not HealthCheckProcessing._is_concurrent_mode():
+            return {category:HealthCheckProcessing._category_health_checks()[category](healthcheck_config) for category in categories}
+        futures=HealthCheckProcessing._submit_category_checks(categories, healthcheck_config)
+        if deadline_ms is not None:
+            # Wait for the checks until the deadline, checks already running keep running in the background
+            all_futures=[future for category_futures in futures.values()
+                         for future in (category_futures if isinstance(category_futures, list) else [category_futures])]
+            done, not_done=wait(all_futures, timeout=deadline_ms/1000)
+            # Checks still queued at the deadline are dropped so they do not hold up the shared pool for later callers
+            for future in not_done:
+                future.cancel()
+        results={}
+        # Collect the results keeping the configuration order within each category
+        for category, category_futures in futures.items():
+            items=getattr(healthcheck_config, category) or []
+            if category=='mount_points':
+                results[category]=(category_futures.result() if deadline_ms is None or category_futures in done
+                                   else [HealthCheckProcessing._unknown_status(category, item) for item in items])
+            else:
+                results[category]=[future.result() if deadline_ms is None or future in done
+                                   else HealthCheckProcessing._unknown_status(category, item)
+                                   for future, item in zip(category_futures, items)]
+        return results
+
+    @staticmethod
+    def full_health_check(deadline_ms:int=None) -> AllHealthcheckStatus:
         """
         Perform a full health check.
+
+        Args:
+            deadline_ms (int, optional): Return after this many milliseconds reporting unfinished checks with Unknown status.
         
         Returns:
             AllHealthcheckStatus: The results of the full health check.
         """
+        return AllHealthcheckStatus(**HealthCheckProcessing.categories_health_check(deadline_ms=deadline_ms))
+
+    @staticmethod
+    def health_check_snapshot(scope:str='full',deadline_ms:int=None) -> HealthcheckSnapshot:
+        """
+        Get the results of a health check scope together with the time they were checked.
+
+        While the background scheduler is running the latest stored snapshot is returned without running any check,
+        otherwise the checks run live and their results are stored.
+
+        Args:
+            scope (str, optional): 'full' or one of the category names of AllHealthcheckStatus. The default value is 'full'.
+            deadline_ms (int, optional): Deadline of live checks in milliseconds, HEALTH_CHECK_DEADLINE_MS when not provided.
+
+        Returns:
+            HealthcheckSnapshot: The results of the scope and when they were checked.
+        """
+        if HealthcheckResultStore.is_background_refreshed():
+            snapshot=HealthcheckResultStore.get_full() if scope=='full' else HealthcheckResultStore.get(scope)
+            if snapshot is not None:
+                return snapshot
+        if deadline_ms is None:
+            deadline_ms=HealthCheckProcessing.get_default_deadline_ms()
+        results=HealthCheckProcessing.categories_health_check(None if scope=='full' else [scope], deadline_ms=deadline_ms)
+        snapshots=HealthcheckResultStore.publish_all(results)
+        if scope!='full':
+            return snapshots[scope]
+        return HealthcheckSnapshot(result=AllHealthcheckStatus(**results),
+                                   checked_at=min(snapshot.checked_at for snapshot in snapshots.values()),
+                                   version=max(snapshot.version for snapshot in snapshots.values()))
+
+    @staticmethod
+    def stream_health_check(scope:str='full',deadline_ms:int=None):
+        """
+        Yield the results of a health check scope one by one as soon as each check completes.
+
+        While the background scheduler is running the latest stored results are yielded without running any check,
+        otherwise the checks run live on the worker pool and their results are stored once all of them are yielded.
+
+        Args:
+            scope (str, optional): 'full' or one of the category names of AllHealthcheckStatus. The default value is 'full'.
+            deadline_ms (int, optional): Deadline of live checks in milliseconds, HEALTH_CHECK_DEADLINE_MS when not provided.
+                Checks that did not finish before it are yielded with Unknown status.
+
+        Yields:
+            tuple[str,object]: The category name and the status of a single check, in completion order.
+        """
+        categories=list(HealthCheckProcessing._category_checks()) if scope=='full' else [scope]
+        if HealthcheckResultStore.is_background_refreshed():
+            snapshots=[HealthcheckResultStore.get(category) for category in categories]
+            if all(snapshot is not None for snapshot in snapshots):
+                for category, snapshot in zip(categories, snapshots):
+                    for status in snapshot.result:
+                        yield category, status
+                return
+        if deadline_ms is None:
+            deadline_ms=HealthCheckProcessing.get_default_deadline_ms()
         healthcheck_config=HealthCheckProcessing._get_healthcheck_config()
-        databases_healthcheck=HealthCheckProcessing.databases_health_check(healthcheck_config)
-        webservices_healthcheck=HealthCheckProcessing.webservices_health_check(healthcheck_config)
-        mount_points_healthcheck=HealthCheckProcessing.mount_points_health_check(healthcheck_config)
-        requirements_files_healthcheck=HealthCheckProcessing.all_required_packages_health_check(healthcheck_config)
-        return AllHealthcheckStatus(mount_points_healthcheck,
-                                    webservices_healthcheck,
-                                    databases_healthcheck,
-                                    requirements_files_healthcheck)
\ No newline at end of file
+        futures=HealthCheckProcessing._submit_category_checks(categories, healthcheck_config)
+        # Keep the configuration order of the stored results while yielding in completion order
+        results={category:[None]*len(getattr(healthcheck_config, category) or []) for category in categories}
+        pending={}
+        for category, category_futures in futures.items():
+            if category=='mount_points':
+                pending[category_futures]=(category, None)
+            else:
+                pending.update({future:(category, index) for index, future in enumerate(category_futures)})
+        try:
+            for future in as_completed(list(pending), timeout=deadline_ms/1000 if deadline_ms is not None else None):
+                category, index=pending.pop(future)
+                if index is None:
+                    results[category]=future.result()
+                    for status in results[category]:
+                        yield category, status
+                else:
+                    results[category][index]=future.result()
+                    yield category, results[category][index]
+        except TimeoutError:
+            # Report the checks that did not finish before the deadline, running ones keep running in the background
+            for future, (category, index) in pending.items():
+                future.cancel()
+                items=getattr(healthcheck_config, category) or []
+                unknown_items=list(enumerate(items)) if index is None else [(index, items[index])]
+                for item_index, item in unknown_items:
+                    results[category][item_index]=HealthCheckProcessing._unknown_status(category, item)
+                    yield category, results[category][item_index]
+        HealthcheckResultStore.publish_all(results)
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from fastapi import WebSocket, WebSocketDisconnect
+from app.controller.healthcheck_processing import HealthCheckProcessing
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Push Channel")
+class HealthcheckPushChannel:
+    """ A class to push health check result changes from the shared result store to connected WebSocket clients.
+    """
+    # Number of encoded messages kept, connected clients mostly share the same cursor
+    MAX_CACHED_MESSAGES=64
+    _lock=threading.Lock()
+    _messages:OrderedDict=OrderedDict()
+    _connections=0
+
+    @staticmethod
+    def get_message(since:int,always:bool=False)->tuple[int,str]:
+        """ Get the encoded changes after a cursor, encoding each distinct message once for all clients.
+
+        Args:
+            since (int): The version the client is up to date with.
+            always (bool, optional): Return a message even when nothing changed. The default value is False.
+
+        Returns:
+            tuple[int,str]: The new cursor and the JSON message, None when nothing changed and always is False.
+        """
+        changes=HealthcheckResultStore.get_changes(since)
+        if not changes.changes and not always:
+            return changes.version, None
+        key=(since, changes.version)
+        with HealthcheckPushChannel._lock:
+            message=HealthcheckPushChannel._messages.get(key)
+        if message is None:
+            message=json.dumps(asdict(changes), ensure_ascii=False, separators=(",", ":"))
+            with HealthcheckPushChannel._lock:
+                HealthcheckPushChannel._messages[key]=message
+                if len(HealthcheckPushChannel._messages)>HealthcheckPushChannel.MAX_CACHED_MESSAGES:
+                    HealthcheckPushChannel._messages.popitem(last=False)
+        return changes.version, message
+
+    @staticmethod
+    def get_connections()->int:
+        """ Get the number of connected clients.
+
+        Returns:
+            int: The number of open WebSocket connections.
+        """
+        return HealthcheckPushChannel._connections
+
+    @staticmethod
+    async def serve(websocket:WebSocket):
+        """ Push the current results to a WebSocket client, then every change published to the result store until it disconnects.
+
+        Clients never trigger checks on their own: results come from the background scheduler or the other endpoints,
+        and a single coalesced check run only happens when nothing was checked yet.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection to serve.
+        """
+        await websocket.accept()
+        loop=asyncio.get_running_loop()
+        updated=asyncio.Event()
+        def on_publish(version:int):
+            # Publishes happen on worker threads, the event is set on the connection event loop
+            loop.call_soon_threadsafe(updated.set)
+        HealthcheckResultStore.subscribe(on_publish)
+        HealthcheckPushChannel._connections+=1
+        # Client messages are ignored, reading them is only used to notice the disconnect
+        receiver=asyncio.create_task(websocket.receive())
+        try:
+            if HealthcheckResultStore.get_full() is None:
+                # Concurrent first connections share one run through the single flight of the processing
+                await asyncio.to_thread(HealthCheckProcessing.health_check_snapshot, 'full')
+            cursor, message=HealthcheckPushChannel.get_message(0, always=True)
+            while True:
+                if message is not None:
+                    await websocket.send_text(message)
+                waiter=asyncio.create_task(updated.wait())
+                done, _=await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    waiter.cancel()
+                    if receiver.result()["type"]=="websocket.disconnect":
+                        break
+                    receiver=asyncio.create_task(websocket.receive())
+                    continue
+                # Clear before reading the changes so a publish happening meanwhile is not missed
+                updated.clear()
+                cursor, message=HealthcheckPushChannel.get_message(cursor)
+        except (WebSocketDisconnect, RuntimeError) as e:
+            logger.debug(f"WebSocket client disconnected: {e!r}")
+        finally:
+            receiver.cancel()
+            HealthcheckResultStore.unsubscribe(on_publish)
+            HealthcheckPushChannel._connections-=1
+
+    @staticmethod
+    def clear():
+        """ Drop all encoded messages.
+        """
+        with HealthcheckPushChannel._lock:
+            HealthcheckPushChannel._messages=OrderedDict()
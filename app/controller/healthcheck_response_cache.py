@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+from dataclasses import asdict, is_dataclass, replace
+from email.utils import parsedate_to_datetime
+from app.schema.healthcheck_snapshot import HealthcheckSnapshot
+from app.schema.encoded_response import EncodedResponse
+
+class HealthcheckResponseCache:
+    """ A class to keep the encoded JSON body of the latest snapshot of each health check scope.
+    """
+    _lock=threading.Lock()
+    # Scope mapped to the encoded response of its latest snapshot
+    _responses:dict[str,EncodedResponse]={}
+
+    @staticmethod
+    def encode(result)->bytes:
+        """ Encode health check results the same way the routes response models serialize them.
+
+        Args:
+            result: A list of statuses or AllHealthcheckStatus.
+
+        Returns:
+            bytes: The UTF-8 encoded compact JSON.
+        """
+        content=asdict(result) if is_dataclass(result) else [asdict(status) for status in result]
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def compute_etag(body:bytes)->str:
+        """ Compute the strong entity tag of an encoded body.
+
+        Args:
+            body (bytes): The encoded body.
+
+        Returns:
+            str: The quoted hash of the body.
+        """
+        return '"'+hashlib.blake2b(body, digest_size=16).hexdigest()+'"'
+
+    @staticmethod
+    def get_response(scope:str,snapshot:HealthcheckSnapshot)->EncodedResponse:
+        """ Get the encoded response of a snapshot, encoding it only when the scope results changed.
+
+        The result store version changes on every publish, even when the results are checked again without any change, so
+        results equal to the cached ones reuse the cached body, ETag and last modification time under the new version.
+        Timings are left out of the status comparisons, a body differing from the cached one only by its timings is not encoded.
+
+        Args:
+            scope (str): 'full' or one of the category names of AllHealthcheckStatus.
+            snapshot (HealthcheckSnapshot): The snapshot being returned.
+
+        Returns:
+            EncodedResponse: The encoded JSON body of the snapshot results with its ETag and last modification time.
+        """
+        cached=HealthcheckResponseCache._responses.get(scope)
+        if cached is not None and cached.version==snapshot.version:
+            return cached
+        if cached is not None and cached.result==snapshot.result:
+            encoded_response=replace(cached, version=snapshot.version)
+        else:
+            body=HealthcheckResponseCache.encode(snapshot.result)
+            encoded_response=EncodedResponse(version=snapshot.version, body=body, etag=HealthcheckResponseCache.compute_etag(body),
+                                             last_modified=snapshot.checked_at, result=snapshot.result)
+        with HealthcheckResponseCache._lock:
+            current=HealthcheckResponseCache._responses.get(scope)
+            if current is not None and current.etag==encoded_response.etag:
+                # Results that were checked again without any change keep their last modification time
+                encoded_response.last_modified=current.last_modified
+            # Never replace the response of a newer snapshot with an older one
+            if current is None or current.version<=snapshot.version:
+                HealthcheckResponseCache._responses[scope]=encoded_response
+        return encoded_response
+
+    @staticmethod
+    def get_body(scope:str,snapshot:HealthcheckSnapshot)->bytes:
+        """ Get the encoded JSON body of a snapshot, encoding it only when the scope results changed.
+
+        Args:
+            scope (str): 'full' or one of the category names of AllHealthcheckStatus.
+            snapshot (HealthcheckSnapshot): The snapshot being returned.
+
+        Returns:
+            bytes: The encoded JSON body of the snapshot results.
+        """
+        return HealthcheckResponseCache.get_response(scope, snapshot).body
+
+    @staticmethod
+    def is_not_modified(encoded_response:EncodedResponse,if_none_match:str=None,if_modified_since:str=None)->bool:
+        """ Evaluate the conditional request headers against an encoded response.
+
+        If-None-Match takes precedence over If-Modified-Since as required by RFC 9110.
+
+        Args:
+            encoded_response (EncodedResponse): The encoded response of the current snapshot.
+            if_none_match (str, optional): The If-None-Match request header.
+            if_modified_since (str, optional): The If-Modified-Since request header.
+
+        Returns:
+            bool: True if the client copy is still current and a 304 response can be sent.
+        """
+        if if_none_match is not None:
+            # Weak comparison, the W/ prefix of the client tags is ignored
+            tags=[tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or encoded_response.etag in tags
+        if if_modified_since is not None:
+            try:
+                modified_since=parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                # Invalid dates are ignored
+                return False
+            # HTTP dates have a one second resolution
+            return int(encoded_response.last_modified)<=modified_since
+        return False
+
+    @staticmethod
+    def clear():
+        """ Drop all encoded responses.
+        """
+        with HealthcheckResponseCache._lock:
+            HealthcheckResponseCache._responses={}
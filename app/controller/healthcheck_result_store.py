@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from collections import deque
+from app.schema.healthcheck_status import AllHealthcheckStatus
+from app.schema.healthcheck_snapshot import HealthcheckSnapshot
+from app.schema.healthcheck_change import HealthcheckChange,HealthcheckChanges
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Result Store")
+
+class HealthcheckResultStore:
+    """ A class to keep the latest health check results of each category in memory.
+    """
+    CATEGORIES=('mount_points', 'webservices', 'databases', 'requirements_files')
+    _lock=threading.Lock()
+    _snapshots:dict[str,HealthcheckSnapshot]={}
+    # Monotonic version increased on every publish
+    _version=0
+    # Bounded log of the result changes in version order
+    _change_log:deque=deque(maxlen=int(os.getenv('HEALTH_CHECK_CHANGE_LOG_SIZE', '10000')))
+    # Changes up to this version may have been dropped from the change log
+    _change_log_floor=0
+    # Whether a background scheduler keeps the snapshots fresh
+    _background_refresh=False
+    # Callbacks notified with the new version after every publish
+    _subscribers:list=[]
+
+    @staticmethod
+    def publish(category:str,statuses:list,checked_at:float=None)->HealthcheckSnapshot:
+        """ Store the latest results of a category.
+
+        Args:
+            category (str): The category name as used by AllHealthcheckStatus.
+            statuses (list): The check results of the category.
+            checked_at (float, optional): Unix timestamp of the check, now when not provided.
+
+        Returns:
+            HealthcheckSnapshot: The stored snapshot.
+        """
+        with HealthcheckResultStore._lock:
+            HealthcheckResultStore._version+=1
+            snapshot=HealthcheckSnapshot(result=statuses, checked_at=checked_at or time.time(), version=HealthcheckResultStore._version)
+            HealthcheckResultStore._record_changes(category, snapshot)
+            HealthcheckResultStore._snapshots[category]=snapshot
+        HealthcheckResultStore._notify_subscribers(snapshot.version)
+        return snapshot
+
+    @staticmethod
+    def publish_all(results:dict[str,list],checked_at:float=None,category_checked_at:dict[str,float]=None)->dict[str,HealthcheckSnapshot]:
+        """ Store the latest results of several categories checked at the same time.
+
+        Args:
+            results (dict[str,list]): The check results of each category.
+            checked_at (float, optional): Unix timestamp of the check, now when not provided.
+            category_checked_at (dict[str,float], optional): Unix timestamp of the oldest result of each category, overriding checked_at.
+
+        Returns:
+            dict[str,HealthcheckSnapshot]: The stored snapshot of each category.
+        """
+        checked_at=checked_at or time.time()
+        with HealthcheckResultStore._lock:
+            # Results checked together are published as one change so a version always describes a consistent state
+            HealthcheckResultStore._version+=1
+            snapshots={category:HealthcheckSnapshot(result=statuses, checked_at=(category_checked_at or {}).get(category, checked_at),
+                                                    version=HealthcheckResultStore._version)
+                       for category, statuses in results.items()}
+            for category, snapshot in snapshots.items():
+                HealthcheckResultStore._record_changes(category, snapshot)
+            HealthcheckResultStore._snapshots.update(snapshots)
+            version=HealthcheckResultStore._version
+        HealthcheckResultStore._notify_subscribers(version)
+        return snapshots
+
+    @staticmethod
+    def subscribe(callback):
+        """ Register a callback notified after every publish.
+
+        The callback runs on the publishing thread so it must only hand the notification over, not do any work.
+
+        Args:
+            callback (callable): Called with the new result store version.
+        """
+        with HealthcheckResultStore._lock:
+            HealthcheckResultStore._subscribers=HealthcheckResultStore._subscribers+[callback]
+
+    @staticmethod
+    def unsubscribe(callback):
+        """ Remove a callback registered with subscribe.
+
+        Args:
+            callback (callable): The registered callback.
+        """
+        with HealthcheckResultStore._lock:
+            HealthcheckResultStore._subscribers=[subscriber for subscriber in HealthcheckResultStore._subscribers if subscriber is not callback]
+
+    @staticmethod
+    def _notify_subscribers(version:int):
+        """ Notify every subscriber of a new version, outside the store lock.
+
+        Args:
+            version (int): The new result store version.
+        """
+        # The list is replaced on change so it can be iterated without the lock
+        for callback in HealthcheckResultStore._subscribers:
+            try:
+                callback(version)
+            except Exception as e:
+                logger.warning(f"Result store subscriber failed caused by {e!r}")
+
+    @staticmethod
+    def _record_changes(category:str,snapshot:HealthcheckSnapshot):
+        """ Append the differences between the stored and the new snapshot of a category to the change log.
+
+        Must be called with the store lock held and before the new snapshot replaces the stored one.
+
+        Args:
+            category (str): The category name as used by AllHealthcheckStatus.
+            snapshot (HealthcheckSnapshot): The new snapshot of the category.
+        """
+        previous_snapshot=HealthcheckResultStore._snapshots.get(category)
+        previous={status.synonym:status for status in previous_snapshot.result} if previous_snapshot else {}
+        current={status.synonym:status for status in snapshot.result}
+        changes=[]
+        for synonym, status in current.items():
+            previous_status=previous.get(synonym)
+            # Statuses are dataclasses so any status or measurement difference makes them unequal
+            if previous_status is None:
+                changes.append(HealthcheckChange(snapshot.version, category, synonym, 'added', status))
+            elif previous_status!=status:
+                changes.append(HealthcheckChange(snapshot.version, category, synonym, 'changed', status))
+        changes.extend(HealthcheckChange(snapshot.version, category, synonym, 'removed') for synonym in previous if synonym not in current)
+        change_log=HealthcheckResultStore._change_log
+        for change in changes:
+            if len(change_log)==change_log.maxlen:
+                # The oldest change is about to be dropped
+                HealthcheckResultStore._change_log_floor=change_log[0].version
+            change_log.append(change)
+
+    @staticmethod
+    def get_version()->int:
+        """ Get the current result store version.
+
+        Returns:
+            int: The version of the latest publish, 0 if nothing was published.
+        """
+        return HealthcheckResultStore._version
+
+    @staticmethod
+    def get_changes(since:int=0)->HealthcheckChanges:
+        """ Get the result changes published after a version.
+
+        Several changes of the same check are merged into the latest one. When the change log no longer holds
+        every change since the cursor, the whole current state is returned as added entries with reset set.
+
+        Args:
+            since (int, optional): The version the caller is up to date with. The default value is 0.
+
+        Returns:
+            HealthcheckChanges: The changes after the cursor and the current version.
+        """
+        with HealthcheckResultStore._lock:
+            version=HealthcheckResultStore._version
+            if since<HealthcheckResultStore._change_log_floor or since>version:
+                changes=[HealthcheckChange(snapshot.version, category, status.synonym, 'added', status)
+                         for category, snapshot in HealthcheckResultStore._snapshots.items() for status in snapshot.result]
+                return HealthcheckChanges(version=version, reset=True, changes=changes)
+            recent_changes=[]
+            # The log is in version order so only its tail has to be read
+            for change in reversed(HealthcheckResultStore._change_log):
+                if change.version<=since:
+                    break
+                recent_changes.append(change)
+        latest_changes={}
+        for change in reversed(recent_changes):
+            # Keep the latest change of each check, ordered by when it happened
+            latest_changes.pop((change.category, change.synonym), None)
+            latest_changes[(change.category, change.synonym)]=change
+        return HealthcheckChanges(version=version, reset=False, changes=list(latest_changes.values()))
+
+    @staticmethod
+    def get(category:str)->HealthcheckSnapshot:
+        """ Get the latest results of a category.
+
+        Args:
+            category (str): The category name as used by AllHealthcheckStatus.
+
+        Returns:
+            HealthcheckSnapshot: The latest snapshot of the category, None if the category was never checked.
+        """
+        return HealthcheckResultStore._snapshots.get(category)
+
+    @staticmethod
+    def get_full()->HealthcheckSnapshot:
+        """ Get the latest results of all categories combined.
+
+        Returns:
+            HealthcheckSnapshot: AllHealthcheckStatus dated by its oldest category with results, None if any category was never checked.
+        """
+        with HealthcheckResultStore._lock:
+            snapshots={category:HealthcheckResultStore._snapshots.get(category) for category in HealthcheckResultStore.CATEGORIES}
+        if any(snapshot is None for snapshot in snapshots.values()):
+            return None
+        # Categories without checks have no result that could be stale
+        checked_snapshots=[snapshot for snapshot in snapshots.values() if snapshot.result] or snapshots.values()
+        return HealthcheckSnapshot(
+            result=AllHealthcheckStatus(**{category:snapshot.result for category, snapshot in snapshots.items()}),
+            checked_at=min(snapshot.checked_at for snapshot in checked_snapshots),
+            version=max(snapshot.version for snapshot in snapshots.values())
+        )
+
+    @staticmethod
+    def set_background_refresh(enabled:bool):
+        """ Flag whether a background scheduler keeps the snapshots fresh.
+
+        Args:
+            enabled (bool): True while the scheduler is running.
+        """
+        HealthcheckResultStore._background_refresh=enabled
+
+    @staticmethod
+    def is_background_refreshed()->bool:
+        """ Check whether a background scheduler keeps the snapshots fresh.
+
+        Returns:
+            bool: True while the scheduler is running.
+        """
+        return HealthcheckResultStore._background_refresh
+
+    @staticmethod
+    def clear():
+        """ Drop all stored results.
+        """
+        with HealthcheckResultStore._lock:
+            HealthcheckResultStore._snapshots={}
+            HealthcheckResultStore._background_refresh=False
+            HealthcheckResultStore._change_log.clear()
+            # The version stays monotonic so cursors from before are answered with a reset
+            HealthcheckResultStore._change_log_floor=HealthcheckResultStore._version
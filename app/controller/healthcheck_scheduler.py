@@ -0,0 +1,338 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from app.controller.healthcheck_processing import HealthCheckProcessing
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.schema.check_schedule import CheckSchedule
+from app.schema.healthcheck_config import AllHealthcheckConfig
+from app.schema.healthcheck_status import HealthcheckStatusEnum
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck Scheduler")
+class AdaptiveCheckSchedule:
+    """ A class to give each health check its own interval, backing off while it is stable and tightening while it fails or flaps.
+    """
+
+    def __init__(self,min_interval:float=None,max_interval:float=None,backoff:float=None,jitter:float=0.1):
+        """ Initialize an empty schedule.
+
+        Args:
+            min_interval (float, optional): Shortest interval in seconds. Defaults to HEALTH_CHECK_SCHEDULER_MIN_INTERVAL environment variable or 5.
+            max_interval (float, optional): Longest interval in seconds. Defaults to HEALTH_CHECK_SCHEDULER_MAX_INTERVAL environment variable or 300.
+            backoff (float, optional): Factor the interval grows by after each stable result and shrinks by after each failing one.
+                Defaults to HEALTH_CHECK_SCHEDULER_BACKOFF environment variable or 2.
+            jitter (float, optional): Each run is moved by up to this share of the interval so checks do not run in lockstep. The default value is 0.1.
+        """
+        self.min_interval=max(0.1, min_interval or float(os.getenv('HEALTH_CHECK_SCHEDULER_MIN_INTERVAL', '5')))
+        self.max_interval=max(self.min_interval, max_interval or float(os.getenv('HEALTH_CHECK_SCHEDULER_MAX_INTERVAL', '300')))
+        self.backoff=max(1.0, backoff or float(os.getenv('HEALTH_CHECK_SCHEDULER_BACKOFF', '2')))
+        self.jitter=jitter
+        self._healthcheck_config:AllHealthcheckConfig=None
+        # (category, synonym) mapped to the schedule, the config and the latest status of each check
+        self._schedules:dict[tuple,CheckSchedule]={}
+        self._items:dict[tuple,object]={}
+        self._statuses:dict[tuple,object]={}
+        # Categories to publish with the next results, even without a due check
+        self._changed_categories:set[str]=set()
+        # Heap of (next due, sequence, key), entries whose due time no longer matches their schedule are skipped
+        self._due=[]
+        self._sequence=itertools.count()
+
+    def _push(self,key:tuple,schedule:CheckSchedule):
+        heapq.heappush(self._due, (schedule.next_due, next(self._sequence), key))
+
+    def get_schedule(self,category:str,synonym:str)->CheckSchedule:
+        """ Get the schedule of a check.
+
+        Args:
+            category (str): The category name as used by AllHealthcheckConfig.
+            synonym (str): The synonym of the check.
+
+        Returns:
+            CheckSchedule: The schedule, None if the check is not scheduled.
+        """
+        return self._schedules.get((category, synonym))
+
+    def sync(self,healthcheck_config:AllHealthcheckConfig,now:float):
+        """ Follow the configuration, new checks are due right away and removed checks are dropped.
+
+        Args:
+            healthcheck_config (AllHealthcheckConfig): The current health check configuration.
+            now (float): The current monotonic time.
+        """
+        # The configuration is cached and only replaced when its file changes
+        if healthcheck_config is self._healthcheck_config:
+            return
+        items={}
+        for category in HealthcheckResultStore.CATEGORIES:
+            for item in getattr(healthcheck_config, category) or []:
+                items[(category, item.synonym)]=item
+        # A new configuration may empty a category, so every category is published again
+        self._changed_categories.update(HealthcheckResultStore.CATEGORIES)
+        for key in self._items.keys()-items.keys():
+            del self._schedules[key]
+            self._statuses.pop(key, None)
+            self._changed_categories.add(key[0])
+        for key in [key for key in items if key not in self._schedules]:
+            interval=min(self.max_interval, max(self.min_interval, HealthCheckScheduler.get_interval(key[0])))
+            self._schedules[key]=CheckSchedule(category=key[0], synonym=key[1], interval=interval, next_due=now)
+            self._push(key, self._schedules[key])
+        self._items=items
+        self._healthcheck_config=healthcheck_config
+
+    def pop_due(self,now:float)->tuple[AllHealthcheckConfig,list[tuple]]:
+        """ Take the checks that are due out of the schedule until their results are recorded.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            tuple[AllHealthcheckConfig,list[tuple]]: A configuration holding only the due checks, and their keys.
+        """
+        due_config=AllHealthcheckConfig()
+        due_keys=[]
+        while self._due and self._due[0][0]<=now:
+            due_at, _, key=heapq.heappop(self._due)
+            schedule=self._schedules.get(key)
+            if schedule is None or schedule.next_due!=due_at:
+                continue
+            getattr(due_config, key[0]).append(self._items[key])
+            due_keys.append(key)
+        return due_config, due_keys
+
+    def _next_interval(self,schedule:CheckSchedule,status:str)->float:
+        """ Compute the interval of a check after a result.
+
+        Args:
+            schedule (CheckSchedule): The schedule of the check, holding the status of its previous result.
+            status (str): The status of the new result.
+
+        Returns:
+            float: The minimum interval when the status flipped, a shorter interval while the check fails,
+            a longer one while it keeps succeeding and the same one while it keeps any other status.
+        """
+        if schedule.last_status is not None and status!=schedule.last_status:
+            return self.min_interval
+        if status==HealthcheckStatusEnum.FAILURE:
+            return max(self.min_interval, schedule.interval/self.backoff)
+        if status==HealthcheckStatusEnum.SUCCESS:
+            return min(self.max_interval, schedule.interval*self.backoff)
+        return schedule.interval
+
+    def _reschedule(self,key:tuple,interval:float,now:float):
+        schedule=self._schedules[key]
+        schedule.interval=interval
+        schedule.next_due=now+interval*random.uniform(1-self.jitter, 1+self.jitter)
+        self._push(key, schedule)
+
+    def has_changed_categories(self)->bool:
+        """ Check whether categories wait to be published after a configuration change.
+
+        Returns:
+            bool: True if the next call of record should publish categories without due checks.
+        """
+        return bool(self._changed_categories)
+
+    def record(self,results:dict[str,list],now:float,checked_at:float=None)->tuple[dict[str,list],dict[str,float]]:
+        """ Record the results of the due checks and schedule their next run.
+
+        Args:
+            results (dict[str,list]): The statuses of the due checks of each category.
+            now (float): The current monotonic time.
+            checked_at (float, optional): Unix timestamp of the results, now when not provided.
+
+        Returns:
+            tuple[dict[str,list],dict[str,float]]: The latest status of every check of the categories in results and of the
+            categories changed by the configuration, in configuration order, and the Unix timestamp of the oldest of
+            these statuses in each category.
+        """
+        checked_at=checked_at or time.time()
+        for category, statuses in results.items():
+            for status in statuses:
+                key=(category, status.synonym)
+                schedule=self._schedules.get(key)
+                # The check may have been removed from the configuration while it ran
+                if schedule is None:
+                    continue
+                self._reschedule(key, self._next_interval(schedule, str(status.status)), now)
+                schedule.last_status=str(status.status)
+                schedule.checked_at=checked_at
+                self._statuses[key]=status
+        categories=self._changed_categories.union(results)
+        self._changed_categories=set()
+        merged={}
+        category_checked_at={}
+        for category in categories:
+            keys=[key for key in self._items if key[0]==category and key in self._statuses]
+            merged[category]=[self._statuses[key] for key in keys]
+            # A category is as old as its least recently checked status, categories without any status are current
+            category_checked_at[category]=min((self._schedules[key].checked_at for key in keys), default=checked_at)
+        return merged, category_checked_at
+
+    def retry(self,keys:list[tuple],now:float):
+        """ Schedule checks whose run failed without a result again after the minimum interval.
+
+        Args:
+            keys (list[tuple]): The keys of the checks.
+            now (float): The current monotonic time.
+        """
+        for key in keys:
+            if key in self._schedules:
+                self._reschedule(key, self.min_interval, now)
+
+    def get_next_due(self,now:float)->float:
+        """ Get when the next check is due.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The monotonic time of the earliest scheduled run, now plus the maximum interval when nothing is scheduled.
+        """
+        return self._due[0][0] if self._due else now+self.max_interval
+
+class HealthCheckScheduler:
+    """ A class to run health checks in the background on configurable intervals and keep the latest results in memory.
+    """
+    _task:asyncio.Task=None
+
+    @staticmethod
+    def is_enabled()->bool:
+        """ Check whether the background scheduler is enabled.
+
+        Returns:
+            bool: True if HEALTH_CHECK_SCHEDULER_ENABLED environment variable is set to true, 1 or yes.
+        """
+        return os.getenv('HEALTH_CHECK_SCHEDULER_ENABLED', 'false').lower() in ['true', '1', 'yes']
+
+    @staticmethod
+    def get_interval(category:str)->float:
+        """ Get the interval between two checks of a category.
+
+        Args:
+            category (str): The category name as used by AllHealthcheckStatus.
+
+        Returns:
+            float: Seconds from HEALTH_CHECK_SCHEDULER_<CATEGORY>_INTERVAL, falling back to HEALTH_CHECK_SCHEDULER_INTERVAL or 30.
+        """
+        default_interval=os.getenv('HEALTH_CHECK_SCHEDULER_INTERVAL', '30')
+        return max(0.1, float(os.getenv(f'HEALTH_CHECK_SCHEDULER_{category.upper()}_INTERVAL', default_interval)))
+
+    @staticmethod
+    def is_adaptive()->bool:
+        """ Check whether each check gets its own adaptive interval instead of running with its whole category.
+
+        Returns:
+            bool: True if HEALTH_CHECK_SCHEDULER_ADAPTIVE environment variable is set to true, 1 or yes.
+        """
+        return os.getenv('HEALTH_CHECK_SCHEDULER_ADAPTIVE', 'false').lower() in ['true', '1', 'yes']
+
+    @staticmethod
+    def is_running()->bool:
+        """ Check whether the background scheduler is running.
+
+        Returns:
+            bool: True if the scheduler task is running, False otherwise.
+        """
+        return HealthCheckScheduler._task is not None and not HealthCheckScheduler._task.done()
+
+    @staticmethod
+    async def run_due_checks(next_due:dict[str,float])->dict[str,float]:
+        """ Run the checks of the categories that are due and publish their results.
+
+        Args:
+            next_due (dict[str,float]): Monotonic time at which each category is due.
+
+        Returns:
+            dict[str,float]: The updated monotonic time at which each category is due.
+        """
+        due_categories=[category for category, due_at in next_due.items() if due_at<=time.monotonic()]
+        if not due_categories:
+            return next_due
+        try:
+            # Checks block on sockets and file systems so they run outside the event loop
+            results=await asyncio.to_thread(HealthCheckProcessing.categories_health_check, due_categories)
+            HealthcheckResultStore.publish_all(results)
+        except Exception as e:
+            logger.error(f"Scheduled health check of {due_categories} failed caused by {e}")
+        for category in due_categories:
+            next_due[category]=time.monotonic()+HealthCheckScheduler.get_interval(category)
+        return next_due
+
+    @staticmethod
+    async def run_adaptive_checks(schedule:AdaptiveCheckSchedule)->float:
+        """ Run the individual checks that are due and publish the categories they belong to.
+
+        Args:
+            schedule (AdaptiveCheckSchedule): The schedule of every check.
+
+        Returns:
+            float: The monotonic time at which the next check is due.
+        """
+        healthcheck_config=await asyncio.to_thread(HealthCheckProcessing._get_healthcheck_config)
+        schedule.sync(healthcheck_config, time.monotonic())
+        due_config, due_keys=schedule.pop_due(time.monotonic())
+        results={}
+        if due_keys:
+            categories=list(dict.fromkeys(category for category, _ in due_keys))
+            try:
+                results=await asyncio.to_thread(HealthCheckProcessing.categories_health_check, categories, due_config)
+            except Exception as e:
+                logger.error(f"Scheduled health check of {len(due_keys)} checks failed caused by {e}")
+                schedule.retry(due_keys, time.monotonic())
+        # Publish after a configuration change even without due checks, so removed checks stop being served
+        if results or schedule.has_changed_categories():
+            merged, category_checked_at=schedule.record(results, time.monotonic())
+            HealthcheckResultStore.publish_all(merged, category_checked_at=category_checked_at)
+        return schedule.get_next_due(time.monotonic())
+
+    @staticmethod
+    async def _run_adaptive():
+        """ Run the adaptive scheduler loop until it is cancelled.
+        """
+        schedule=AdaptiveCheckSchedule()
+        while True:
+            next_due=await HealthCheckScheduler.run_adaptive_checks(schedule)
+            # Sleep until the next check is due, waking up at least every second to follow configuration changes
+            await asyncio.sleep(min(1.0, max(0.01, next_due-time.monotonic())))
+
+    @staticmethod
+    async def _run():
+        """ Run the scheduler loop until it is cancelled.
+        """
+        if HealthCheckScheduler.is_adaptive():
+            await HealthCheckScheduler._run_adaptive()
+            return
+        next_due={category:0.0 for category in HealthcheckResultStore.CATEGORIES}
+        while True:
+            next_due=await HealthCheckScheduler.run_due_checks(next_due)
+            # Sleep until the next category is due
+            await asyncio.sleep(max(0.0, min(next_due.values())-time.monotonic()))
+
+    @staticmethod
+    async def start():
+        """ Start the background scheduler if it is enabled and not already running.
+        """
+        if not HealthCheckScheduler.is_enabled() or HealthCheckScheduler.is_running():
+            return
+        logger.info("Starting background health check scheduler")
+        HealthCheckScheduler._task=asyncio.create_task(HealthCheckScheduler._run())
+        HealthcheckResultStore.set_background_refresh(True)
+
+    @staticmethod
+    async def stop():
+        """ Stop the background scheduler if it is running.
+        """
+        HealthcheckResultStore.set_background_refresh(False)
+        if HealthCheckScheduler._task is None:
+            return
+        HealthCheckScheduler._task.cancel()
+        try:
+            await HealthCheckScheduler._task
+        except asyncio.CancelledError:
+            pass
+        HealthCheckScheduler._task=None
+        logger.info("Stopped background health check scheduler")
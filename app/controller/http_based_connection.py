@@ -0,0 +1,237 @@
+import http.client
+import os
+import socket
+import ssl
+import threading
+import time
+from app.controller.dns_resolver_cache import DnsResolverCache
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.schema.http_probe_result import HttpProbeResult
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("HealthCheck HTTP")
+
+def _open_socket(hostname:str,port:int,time_out:float)->socket.socket:
+    """ Open a TCP connection to the first resolved address of the target that accepts it.
+
+    Args:
+        hostname (str): hostname or IP address for the destination server.
+        port (int): port number on the destination server.
+        time_out (float): How long each connection attempt may take before stopping.
+
+    Raises:
+        OSError: When the hostname cannot be resolved or no resolved address accepts the connection.
+
+    Returns:
+        socket.socket: The connected socket.
+    """
+    error=OSError(f"No address found for {hostname}")
+    for address in DnsResolverCache.resolve(hostname, port):
+        try:
+            connection=socket.create_connection((address[0], port), timeout=time_out)
+        except OSError as e:
+            error=e
+            continue
+        # Requests are small, send them without waiting for more data
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+    raise error
+
+class _PooledHTTPConnection(http.client.HTTPConnection):
+    """ An HTTP connection resolving its target through DnsResolverCache."""
+
+    def connect(self):
+        self.sock=_open_socket(self.host, self.port, self.timeout)
+
+class _PooledHTTPSConnection(http.client.HTTPSConnection):
+    """ An HTTPS connection resolving its target through DnsResolverCache and resuming the last TLS session of the target."""
+
+    def connect(self):
+        connection=_open_socket(self.host, self.port, self.timeout)
+        session=HttpBasedConnection._get_tls_session((self.host, self.port))
+        try:
+            self.sock=self._context.wrap_socket(connection, server_hostname=self.host, session=session)
+        except BaseException:
+            connection.close()
+            raise
+
+class HttpBasedConnection:
+    """ A class to probe web services with HTTP or HTTPS requests over pooled keep-alive connections."""
+    _lock=threading.Lock()
+    # (protocol, hostname, port) mapped to idle keep-alive connections, most recently used last
+    _idle_connections:dict[tuple,list[http.client.HTTPConnection]]={}
+    # (hostname, port) mapped to the last TLS session, new connections resume it instead of a full handshake
+    _tls_sessions:dict[tuple,ssl.SSLSession]={}
+    _ssl_context:ssl.SSLContext=None
+    _ssl_context_ca_file:str=None
+
+    @staticmethod
+    def get_pool_size()->int:
+        """ Get the number of idle keep-alive connections kept per target.
+
+        Returns:
+            int: HEALTH_CHECK_HTTP_POOL_SIZE environment variable or 4.
+        """
+        return int(os.getenv('HEALTH_CHECK_HTTP_POOL_SIZE', '4'))
+
+    @staticmethod
+    def get_max_body_bytes()->int:
+        """ Get the number of response body bytes searched for the expected body substring.
+
+        Returns:
+            int: HEALTH_CHECK_HTTP_MAX_BODY_BYTES environment variable or 65536.
+        """
+        return int(os.getenv('HEALTH_CHECK_HTTP_MAX_BODY_BYTES', '65536'))
+
+    @staticmethod
+    def _get_ssl_context()->ssl.SSLContext:
+        """ Get the TLS context shared by every HTTPS probe, TLS sessions can only be resumed within the same context.
+
+        Returns:
+            ssl.SSLContext: A verifying context trusting the system certificates, or HEALTH_CHECK_HTTP_CA_FILE when set.
+        """
+        ca_file=os.getenv('HEALTH_CHECK_HTTP_CA_FILE') or None
+        with HttpBasedConnection._lock:
+            if HttpBasedConnection._ssl_context is None or ca_file!=HttpBasedConnection._ssl_context_ca_file:
+                HttpBasedConnection._ssl_context=ssl.create_default_context(cafile=ca_file)
+                HttpBasedConnection._ssl_context_ca_file=ca_file
+                # Sessions of the previous context cannot be resumed
+                HttpBasedConnection._tls_sessions.clear()
+            return HttpBasedConnection._ssl_context
+
+    @staticmethod
+    def _get_tls_session(target:tuple)->ssl.SSLSession:
+        with HttpBasedConnection._lock:
+            return HttpBasedConnection._tls_sessions.get(target)
+
+    @staticmethod
+    def _create(protocol:str,hostname:str,port:int,time_out:float)->http.client.HTTPConnection:
+        """ Create a new connection to the target, it connects when the first request is sent.
+
+        Args:
+            protocol (str): 'http' or 'https'.
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            time_out (float): Timeout of the connect and of each socket operation.
+
+        Returns:
+            http.client.HTTPConnection: The connection.
+        """
+        if protocol=='https':
+            return _PooledHTTPSConnection(hostname, port, timeout=time_out, context=HttpBasedConnection._get_ssl_context())
+        return _PooledHTTPConnection(hostname, port, timeout=time_out)
+
+    @staticmethod
+    def _acquire(protocol:str,hostname:str,port:int,time_out:float)->tuple[http.client.HTTPConnection,bool]:
+        """ Take an idle keep-alive connection to the target, or create a new one.
+
+        Args:
+            protocol (str): 'http' or 'https'.
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            time_out (float): Timeout of the connect and of each socket operation.
+
+        Returns:
+            tuple[http.client.HTTPConnection,bool]: The connection and whether it was taken from the pool.
+        """
+        with HttpBasedConnection._lock:
+            idle_connections=HttpBasedConnection._idle_connections.get((protocol, hostname, port))
+            connection=idle_connections.pop() if idle_connections else None
+        if connection is not None:
+            connection.timeout=time_out
+            connection.sock.settimeout(time_out)
+            return connection, True
+        return HttpBasedConnection._create(protocol, hostname, port, time_out), False
+
+    @staticmethod
+    def _release(protocol:str,connection:http.client.HTTPConnection):
+        """ Keep a connection whose response was fully read for the next probe of the target, closing it when the pool is full.
+
+        Args:
+            protocol (str): 'http' or 'https'.
+            connection (http.client.HTTPConnection): The connection.
+        """
+        with HttpBasedConnection._lock:
+            if protocol=='https':
+                HttpBasedConnection._tls_sessions[(connection.host, connection.port)]=connection.sock.session
+            idle_connections=HttpBasedConnection._idle_connections.setdefault((protocol, connection.host, connection.port), [])
+            if len(idle_connections)<HttpBasedConnection.get_pool_size():
+                idle_connections.append(connection)
+                return
+        connection.close()
+
+    @staticmethod
+    def _request(connection:http.client.HTTPConnection,path:str)->tuple[http.client.HTTPResponse,bytes]:
+        """ Send a GET request and read the beginning of the response body.
+
+        Args:
+            connection (http.client.HTTPConnection): The connection.
+            path (str): The request path.
+
+        Returns:
+            tuple[http.client.HTTPResponse,bytes]: The response and up to HEALTH_CHECK_HTTP_MAX_BODY_BYTES bytes of its body.
+        """
+        connection.request('GET', path, headers={'User-Agent': 'rd-healthcheck', 'Accept': '*/*'})
+        response=connection.getresponse()
+        return response, response.read(HttpBasedConnection.get_max_body_bytes())
+
+    @staticmethod
+    def probe_http_connection(hostname:str,port:int,protocol:str='https',path:str='/',expected_body:str=None,time_out:float=1)->HttpProbeResult:
+        """ Send a GET request to a web service over a pooled keep-alive connection.
+
+        A pooled connection the server closed meanwhile is replaced by a new connection once.
+
+        Args:
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            protocol (str, optional): 'http' or 'https'. The default value is 'https'.
+            path (str, optional): The request path. The default value is '/'.
+            expected_body (str, optional): Substring the beginning of the response body must contain.
+            time_out (float, optional): Timeout of the connect and of each socket operation. The default value is 1.
+
+        Returns:
+            HttpProbeResult: The status code and whether the body matched, or the error when no response was received.
+        """
+        protocol=protocol.lower()
+        started=time.perf_counter()
+        connection=None
+        try:
+            connection, is_reused=HttpBasedConnection._acquire(protocol, hostname, port, time_out)
+            try:
+                response, body=HttpBasedConnection._request(connection, path)
+            except (ConnectionError, ssl.SSLEOFError):
+                if not is_reused:
+                    raise
+                # The server closed the idle connection, retry on a new one
+                connection.close()
+                connection, is_reused=HttpBasedConnection._create(protocol, hostname, port, time_out), False
+                response, body=HttpBasedConnection._request(connection, path)
+        except Exception as e:
+            if connection is not None:
+                connection.close()
+            seconds=time.perf_counter()-started
+            logger.error(f"Failed to request {protocol}://{hostname}:{port}{path} in {seconds:.3f}s caused by {e!r}")
+            return HttpProbeResult(hostname=hostname, port=port, protocol=protocol, is_connected=False, seconds=seconds,
+                                   failed_stage='dns' if isinstance(e, socket.gaierror) else 'request', error=repr(e))
+        is_session_reused=protocol=='https' and not is_reused and connection.sock.session_reused
+        HealthcheckMetrics.http_probe_finished(is_reused, is_session_reused)
+        # Only connections whose response was read to the end can carry the next request
+        if response.isclosed() and not response.will_close:
+            HttpBasedConnection._release(protocol, connection)
+        else:
+            connection.close()
+        return HttpProbeResult(hostname=hostname, port=port, protocol=protocol, is_connected=True, status_code=response.status,
+                               is_body_matched=None if expected_body is None else expected_body.encode() in body,
+                               is_connection_reused=is_reused, is_session_reused=is_session_reused,
+                               seconds=time.perf_counter()-started)
+
+    @staticmethod
+    def close_idle_connections():
+        """ Close every pooled connection and forget the TLS sessions.
+        """
+        with HttpBasedConnection._lock:
+            idle_connections=[connection for connections in HttpBasedConnection._idle_connections.values() for connection in connections]
+            HttpBasedConnection._idle_connections.clear()
+            HttpBasedConnection._tls_sessions.clear()
+        for connection in idle_connections:
+            connection.close()
@@ -0,0 +1,110 @@
+import os
+import re
+import site
+import sys
+import threading
+from importlib import metadata
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("Installed Package Index")
+class InstalledPackageIndex:
+    """ A class to keep an in-process index of installed Python packages built from importlib.metadata.
+
+    The index is kept as a set of PEP 503 normalized names and rebuilt only when one of the site-packages directories changes.
+    """
+    _lock=threading.Lock()
+    _packages:frozenset[str]=frozenset()
+    _fingerprint:tuple=None
+
+    @staticmethod
+    def normalize_package_name(package:str)->str:
+        """ Normalize a package name as described by PEP 503.
+
+        Args:
+            package (str): The package name to normalize.
+
+        Returns:
+            str: The lower case package name with runs of '-', '_' and '.' replaced by a single '-'.
+        """
+        return re.sub(r"[-_.]+", "-", package).lower()
+
+    @staticmethod
+    def _site_packages_directories()->list[str]:
+        """ Get the directories where installed distributions are looked up.
+
+        Returns:
+            list[str]: The existing site-packages directories of the running interpreter.
+        """
+        # Site directories reported by site module and any site/dist-packages directory on sys.path
+        candidates=list(site.getsitepackages()) if hasattr(site, 'getsitepackages') else []
+        candidates.append(site.getusersitepackages())
+        candidates.extend(path for path in sys.path if path.endswith(('site-packages', 'dist-packages')))
+        # Remove duplicates while keeping the order and ignore directories that do not exist
+        return [path for path in dict.fromkeys(candidates) if os.path.isdir(path)]
+
+    @staticmethod
+    def _get_fingerprint()->tuple:
+        """ Get a fingerprint of the site-packages directories based on their modification times.
+
+        Returns:
+            tuple: Pairs of directory and modification time in nanoseconds.
+        """
+        fingerprint=[]
+        for directory in InstalledPackageIndex._site_packages_directories():
+            try:
+                fingerprint.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(fingerprint)
+
+    @staticmethod
+    def _build_index()->frozenset[str]:
+        """ Build the set of normalized names of all installed distributions.
+
+        Returns:
+            frozenset[str]: The normalized names of installed distributions.
+        """
+        packages=set()
+        for distribution in metadata.distributions():
+            name=distribution.metadata['Name']
+            if name:
+                packages.add(InstalledPackageIndex.normalize_package_name(name))
+        logger.info(f"Indexed {len(packages)} installed packages")
+        return frozenset(packages)
+
+    @staticmethod
+    def get_installed_packages()->frozenset[str]:
+        """ Get the normalized names of installed packages, rebuilding the index if site-packages changed.
+
+        Returns:
+            frozenset[str]: The normalized names of installed packages.
+        """
+        fingerprint=InstalledPackageIndex._get_fingerprint()
+        # Fast path when nothing was installed or removed since the last build
+        if fingerprint==InstalledPackageIndex._fingerprint:
+            return InstalledPackageIndex._packages
+        with InstalledPackageIndex._lock:
+            if fingerprint!=InstalledPackageIndex._fingerprint:
+                InstalledPackageIndex._packages=InstalledPackageIndex._build_index()
+                InstalledPackageIndex._fingerprint=fingerprint
+            return InstalledPackageIndex._packages
+
+    @staticmethod
+    def is_installed(package:str)->bool:
+        """ Check if the specified package is installed.
+
+        Args:
+            package (str): The package name in any spelling allowed by PEP 503.
+
+        Returns:
+            bool: True if the package is installed, False otherwise.
+        """
+        return bool(package) and InstalledPackageIndex.normalize_package_name(package) in InstalledPackageIndex.get_installed_packages()
+
+    @staticmethod
+    def clear():
+        """ Drop the index so it is rebuilt on the next lookup.
+        """
+        with InstalledPackageIndex._lock:
+            InstalledPackageIndex._packages=frozenset()
+            InstalledPackageIndex._fingerprint=None
@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+class SingleFlight:
+    """ A class to share one in-progress execution and its result between concurrent callers of the same key.
+    """
+
+    def __init__(self):
+        self._lock=threading.Lock()
+        self._calls:dict[Hashable,Future]={}
+
+    def do(self,key:Hashable,function:Callable,*args,**kwargs)->Any:
+        """ Run the function unless a call with the same key is already in progress, in which case wait for its result.
+
+        Args:
+            key (Hashable): Identifies calls that can share the same result.
+            function (Callable): The function to run.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Any: The result of the function, shared by every caller that joined the same call.
+        """
+        with self._lock:
+            call=self._calls.get(key)
+            is_leader=call is None
+            if is_leader:
+                call=Future()
+                self._calls[key]=call
+        # Followers wait for the leader and receive its result or exception
+        if not is_leader:
+            return call.result()
+        try:
+            result=function(*args,**kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            # Later callers start a fresh execution
+            with self._lock:
+                self._calls.pop(key,None)
+
+    def in_flight(self)->int:
+        """ Get the number of calls currently in progress.
+
+        Returns:
+            int: The number of distinct keys being executed.
+        """
+        with self._lock:
+            return len(self._calls)
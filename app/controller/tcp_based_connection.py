@@ -1,28 +1,247 @@
+import asyncio
+import os
 import socket
+import struct
+import threading
+import time
+from app.controller.dns_resolver_cache import DnsResolverCache
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.schema.tcp_probe_result import TcpProbeResult
 from app.logging.logging import return_logging_instance
 
 logger=return_logging_instance("HealthCheck TCP")    
 class TcpBasedConnection:
     """A class to handle TCP based connections."""
+    # Probe socket counters shared by the blocking and asyncio probes
+    _counters_lock=threading.Lock()
+    _open_probe_sockets=0
+    _opened_probe_sockets_total=0
+    _closed_probe_sockets_total=0
 
     @staticmethod
-    def establish_tcp_connection(hostname:str,port:int,time_out:int=1)->bool:
+    def is_abortive_close_enabled()->bool:
+        """ Check whether probe sockets should be closed abortively.
+
+        Returns:
+            bool: True if HEALTH_CHECK_TCP_ABORTIVE_CLOSE environment variable is set to true, 1 or yes.
+        """
+        return os.getenv('HEALTH_CHECK_TCP_ABORTIVE_CLOSE', 'false').lower() in ['true', '1', 'yes']
+
+    @staticmethod
+    def _count_probe_socket(opened:bool):
+        """ Update the probe socket counters when a probe socket is opened or closed.
+
+        Args:
+            opened (bool): True when a probe socket was opened, False when it was closed.
+        """
+        with TcpBasedConnection._counters_lock:
+            if opened:
+                TcpBasedConnection._open_probe_sockets+=1
+                TcpBasedConnection._opened_probe_sockets_total+=1
+            else:
+                TcpBasedConnection._open_probe_sockets-=1
+                TcpBasedConnection._closed_probe_sockets_total+=1
+
+    @staticmethod
+    def get_probe_socket_counters()->dict:
+        """ Get the probe socket counters.
+
+        Returns:
+            dict: Currently open probe sockets and the total number of opened and closed probe sockets.
+        """
+        with TcpBasedConnection._counters_lock:
+            return {
+                'open_probe_sockets': TcpBasedConnection._open_probe_sockets,
+                'opened_probe_sockets_total': TcpBasedConnection._opened_probe_sockets_total,
+                'closed_probe_sockets_total': TcpBasedConnection._closed_probe_sockets_total
+            }
+
+    @staticmethod
+    def close_probe_socket(probe_socket:socket.socket,abortive:bool=False):
+        """ Close a probe socket, optionally with an abortive close.
+
+        An abortive close sets SO_LINGER with a zero timeout so the kernel sends a RST instead of a FIN,
+        which means the probing side does not keep the connection in TIME_WAIT.
+
+        Args:
+            probe_socket (socket.socket): The probe socket to close.
+            abortive (bool, optional): Whether to close the socket abortively. The default value is False.
+        """
+        try:
+            if abortive:
+                # Linger on with zero timeout to reset the connection on close
+                probe_socket.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        except OSError as e:
+            logger.warning(f"Failed to set SO_LINGER on probe socket caused by {e}")
+        finally:
+            probe_socket.close()
+
+    @staticmethod
+    def probe_tcp_connection(hostname:str,port:int,time_out:int=1,abortive_close:bool=None)->TcpProbeResult:
+        """ Probe a TCP connection to the specified hostname and port, timing the name resolution and the connect separately.
+
+        The hostname is resolved through DnsResolverCache, then each resolved address is tried until one accepts the connection.
+
+        Args:
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            time_out (int, optional): How long each connection attempt may take before stopping. The default value is 1.
+            abortive_close (bool, optional): Close the probe socket with a RST instead of a FIN. Defaults to HEALTH_CHECK_TCP_ABORTIVE_CLOSE environment variable.
+
+        Returns:
+            TcpProbeResult: Whether the connection was established with the DNS lookup and connect times.
+        """
+        if abortive_close is None:
+            abortive_close=TcpBasedConnection.is_abortive_close_enabled()
+        lookup_started=time.perf_counter()
+        try:
+            addresses=DnsResolverCache.resolve(hostname,port)
+        except OSError as e:
+            # Report that the hostname cannot be resolved, which is not the same as a down service
+            dns_lookup_seconds=time.perf_counter()-lookup_started
+            HealthcheckMetrics.tcp_probe_finished(hostname, dns_lookup_seconds, 0, is_resolved=False)
+            logger.error(f"Failed to resolve {hostname} in {dns_lookup_seconds:.3f}s caused by {e}")
+            return TcpProbeResult(hostname=hostname, port=port, is_connected=False, dns_lookup_seconds=dns_lookup_seconds,
+                                  failed_stage='dns', error=str(e))
+        dns_lookup_seconds=time.perf_counter()-lookup_started
+        connect_started=time.perf_counter()
+        probe_socket=None
+        error=None
+        for address in addresses:
+            # Count the socket before it connects, connects in flight to blackholed hosts are the sockets that pile up
+            TcpBasedConnection._count_probe_socket(opened=True)
+            try:
+                # Try to establish a connection to the resolved address and port
+                probe_socket=socket.create_connection((address[0],port),timeout=time_out)
+                break
+            except Exception as e:
+                error=e
+                TcpBasedConnection._count_probe_socket(opened=False)
+        connect_seconds=time.perf_counter()-connect_started
+        HealthcheckMetrics.tcp_probe_finished(hostname, dns_lookup_seconds, connect_seconds, is_resolved=True)
+        if probe_socket is None:
+            # Report that the TCP connection cannot be established
+            logger.error(f"Failed to establish TCP connection to {hostname}:{port} in {connect_seconds:.3f}s "
+                         f"(DNS lookup {dns_lookup_seconds:.3f}s) caused by {error}")
+            return TcpProbeResult(hostname=hostname, port=port, is_connected=False, dns_lookup_seconds=dns_lookup_seconds,
+                                  connect_seconds=connect_seconds, failed_stage='connect', error=str(error))
+        try:
+            # Release the probe socket right away instead of waiting for garbage collection
+            TcpBasedConnection.close_probe_socket(probe_socket,abortive=abortive_close)
+        finally:
+            TcpBasedConnection._count_probe_socket(opened=False)
+        logger.debug(f"TCP connection to {hostname}:{port} established, DNS lookup {dns_lookup_seconds:.3f}s connect {connect_seconds:.3f}s")
+        return TcpProbeResult(hostname=hostname, port=port, is_connected=True, dns_lookup_seconds=dns_lookup_seconds,
+                              connect_seconds=connect_seconds)
+
+    @staticmethod
+    def establish_tcp_connection(hostname:str,port:int,time_out:int=1,abortive_close:bool=None)->bool:
         """ Establish a TCP connection to the specified hostname and port to check if the connection can be established or not.
 
         Args:
             hostname (str): hosttname or IP address for the destination server.
             port (int): port number on the destination server.
-            time_out (int, optional): The timeout value specifies how long the service should attempt to establish a connection before stopping. The default value is 5.
+            time_out (int, optional): The timeout value specifies how long the service should attempt to establish a connection before stopping. The default value is 1.
+            abortive_close (bool, optional): Close the probe socket with a RST instead of a FIN. Defaults to HEALTH_CHECK_TCP_ABORTIVE_CLOSE environment variable.
+
+        Returns:
+            bool: True if the TCP connection can be established, False otherwise.
+        """
+        return TcpBasedConnection.probe_tcp_connection(hostname,port,time_out,abortive_close).is_connected
+
+class AsyncTcpProbeEngine:
+    """An asyncio based engine to probe many TCP targets from a single event loop without a thread per probe.
+
+    It is a standalone API for callers probing large target lists, the health check endpoints keep using the blocking probe.
+    """
+
+    def __init__(self,max_concurrency:int=None,time_out:float=1,abortive_close:bool=None):
+        """ Initialize the probe engine.
+
+        Args:
+            max_concurrency (int, optional): Maximum number of probes in flight at the same time. Defaults to HEALTH_CHECK_ASYNC_MAX_CONCURRENCY environment variable or 1000.
+            time_out (float, optional): How long each probe should attempt to establish a connection before stopping. The default value is 1.
+            abortive_close (bool, optional): Close probe sockets with a RST instead of a FIN. Defaults to HEALTH_CHECK_TCP_ABORTIVE_CLOSE environment variable.
+        """
+        self.max_concurrency=max_concurrency or int(os.getenv('HEALTH_CHECK_ASYNC_MAX_CONCURRENCY', '1000'))
+        self.time_out=time_out
+        self.abortive_close=TcpBasedConnection.is_abortive_close_enabled() if abortive_close is None else abortive_close
+
+    async def establish_tcp_connection(self,hostname:str,port:int,time_out:float=None)->bool:
+        """ Establish a TCP connection to the specified hostname and port without blocking the event loop.
+
+        Args:
+            hostname (str): hostname or IP address for the destination server.
+            port (int): port number on the destination server.
+            time_out (float, optional): Overrides the engine timeout for each address of this probe.
 
         Returns:
             bool: True if the TCP connection can be established, False otherwise.
         """
         try:
-            # Try to establish a connection to mentioned hostname/ip port
-            socket.create_connection((hostname,port),timeout=time_out)
-            # Announce that the process is successful and TCP connection can be established
-            return True
+            # Resolve through the cache, only going to a worker thread when the resolver has to be called
+            addresses=DnsResolverCache.get_cached(hostname,port) or await asyncio.to_thread(DnsResolverCache.resolve,hostname,port)
         except Exception as e:
+            # Report that the hostname cannot be resolved
+            logger.error(f"Failed to resolve {hostname} caused by {e!r}")
+            return False
+        writer=None
+        error=None
+        # Try each resolved address in order like the blocking probe, until one accepts the connection
+        for address in addresses:
+            # Count the socket before it connects so connects in flight are included
+            TcpBasedConnection._count_probe_socket(opened=True)
+            try:
+                # Try to establish a connection to the resolved address and port within the timeout
+                _, writer=await asyncio.wait_for(asyncio.open_connection(address[0],port),
+                                                 timeout=time_out if time_out is not None else self.time_out)
+                break
+            except Exception as e:
+                error=e
+            finally:
+                # Also uncount when the probe is cancelled while connecting, the socket is closed with the cancelled connect
+                if writer is None:
+                    TcpBasedConnection._count_probe_socket(opened=False)
+        if writer is None:
             # Report that the TCP connection cannot be established
-            logger.error(f"Failed to establish TCP connection to {hostname}:{port} caused by {e}")
-            return False
\ No newline at end of file
+            logger.error(f"Failed to establish TCP connection to {hostname}:{port} caused by {error!r}")
+            return False
+        try:
+            probe_socket=writer.get_extra_info('socket')
+            if self.abortive_close and probe_socket is not None:
+                # Linger on with zero timeout to reset the connection on close
+                probe_socket.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            writer.close()
+            await writer.wait_closed()
+        except OSError as e:
+            logger.warning(f"Failed to close probe socket to {hostname}:{port} caused by {e!r}")
+        finally:
+            TcpBasedConnection._count_probe_socket(opened=False)
+        return True
+
+    async def probe_many(self,targets:list[tuple[str,int]])->list[bool]:
+        """ Probe all targets concurrently while keeping at most max_concurrency probes in flight.
+
+        Args:
+            targets (list[tuple[str,int]]): The hostname and port pairs to probe.
+
+        Returns:
+            list[bool]: The probe results in the same order as the targets.
+        """
+        # Semaphore is created here so it belongs to the running event loop
+        semaphore=asyncio.Semaphore(self.max_concurrency)
+        async def bounded_probe(hostname:str,port:int)->bool:
+            async with semaphore:
+                return await self.establish_tcp_connection(hostname,port)
+        return await asyncio.gather(*(bounded_probe(hostname,port) for hostname,port in targets))
+
+    def run(self,targets:list[tuple[str,int]])->list[bool]:
+        """ Blocking helper to probe all targets from synchronous code.
+
+        Args:
+            targets (list[tuple[str,int]]): The hostname and port pairs to probe.
+
+        Returns:
+            list[bool]: The probe results in the same order as the targets.
+        """
+        return asyncio.run(self.probe_many(targets))
@@ -1,5 +1,6 @@
 import subprocess
 import os
+from app.schema.mount_point_usage import MountPointUsage
 from app.logging.logging import return_logging_instance
 
 class TerminalProcessing:
@@ -32,9 +33,30 @@ class TerminalProcessing:
         # Check if the current os is a Unix based
         return os.name=='posix'
 
+    @staticmethod
+    def get_mount_point_usage_details(mount_point:str)->MountPointUsage:
+        """ Get the byte accurate usage of the specified mount point using os.statvfs without running any subprocess.
+
+        Args:
+            mount_point (str): The mount point to check the usage for.
+
+        Returns:
+            MountPointUsage: The total, used and available bytes of the specified mount point.
+        """
+        # Read file system statistics directly from the kernel
+        statistics=os.statvfs(mount_point)
+        # Compute the sizes the same way as the 'df' command does
+        total_bytes=statistics.f_blocks*statistics.f_frsize
+        used_bytes=(statistics.f_blocks-statistics.f_bfree)*statistics.f_frsize
+        available_bytes=statistics.f_bavail*statistics.f_frsize
+        return MountPointUsage(mount_point=mount_point,
+                               total_bytes=total_bytes,
+                               used_bytes=used_bytes,
+                               available_bytes=available_bytes)
+
     @staticmethod
     def get_mount_point_usages(mount_point:str)->int:
-        """ Get the usage percentage of the specified mount point by executing the 'df' command in the terminal.
+        """ Get the usage percentage of the specified mount point.
 
         Args:
             mount_point (str): The mount point to check the usage percentage for.
@@ -42,37 +64,25 @@ class TerminalProcessing:
         Returns:
             int: The usage percentage of the specified mount point as an integer.
         """
-        # Execute the 'df' command in the terminal and capture its output
-        terminal_command=['df',mount_point]
-        output=TerminalProcessing.return_terminal_cmd_output(terminal_command)
-        # Extract the usage percentage from the output
-        lines=output.splitlines()
-        data=lines[1].split()
-        # Extract the usage percentage from the data list
-        usage_percentage=int(data[4].strip('%'))
-        # Convert the output to an integer and return it
-        return usage_percentage
+        return TerminalProcessing.get_mount_point_usage_details(mount_point).usage_percentage
 
     @staticmethod
-    def get_installed_packages()->list[str]:
-        """_summary_
+    def collect_mount_points_usages(mount_points:list[str])->dict[str,MountPointUsage]:
+        """ Collect the usage of all specified mount points in one pass.
+
+        Args:
+            mount_points (list[str]): The mount points to collect the usage for.
 
         Returns:
-            list[str]: _description_
+            dict[str,MountPointUsage]: The usage of each mount point, None for mount points that cannot be read.
         """
         logger=return_logging_instance("Terminal Processing")
-        # 'pip freeze' command in the terminal and capture its output
-        command=['pip','freeze']
-        try:
-            output = TerminalProcessing.return_terminal_cmd_output(command)
-            # Split the output into a list of lines, each representing a package
-            packages = output.splitlines()
-            # Extract only the package names by splitting each line at '=='
-            # and stripping any extra whitespace
-            packages_name=[package.split('==')[0].strip() for package in packages if package]
-            logger.info(f"Cleaned installed packages: {packages_name}")
-            # Return the list of package names
-            return packages_name
-        except subprocess.CalledProcessError:
-            # If pip freeze returns a terminal error, then return an empty list
-            return []
+        usages={}
+        # Each distinct mount point is read once even if it is configured several times
+        for mount_point in dict.fromkeys(mount_points):
+            try:
+                usages[mount_point]=TerminalProcessing.get_mount_point_usage_details(mount_point)
+            except OSError as e:
+                logger.error(f"Failed to read usage of {mount_point} caused by {e}")
+                usages[mount_point]=None
+        return usages
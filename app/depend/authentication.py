@@ -1,9 +1,11 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer,HTTPAuthorizationCredentials
 import os
 
 http_bearer = HTTPBearer()
+# Lets endpoints that are only partly restricted read the token without requiring it
+optional_http_bearer = HTTPBearer(auto_error=False)
 
 class Auth:
     """
@@ -15,14 +17,19 @@ class Auth:
         """Get the admin key from environment variables."""
         return os.getenv('ADMIN_KEY', 'rd-healthcheck')
     
+    @staticmethod
+    def is_admin_key(key: Optional[str]) -> bool:
+        """Check if a key is the admin key, a missing key never is."""
+        return key is not None and key == Auth.get_admin_key()
+
     @staticmethod
     def is_admin(token: HTTPAuthorizationCredentials = Depends(http_bearer)):
         """
         Dependency to check if the user is an admin.
-        Raises HTTPException if the user is not an admin.
+        Raises HTTPException if the user is not an admin, including when no token was sent.
         """
         # Check if the provided token matches the admin key
-        if token.credentials != Auth.get_admin_key():
+        if not Auth.is_admin_key(token.credentials if token else None):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to access this resource."
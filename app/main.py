@@ -1,9 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.healthcheck import healthcheck_router
 from app.routes.staticfiles import static_files_router
+from app.routes.metrics import metrics_router
+from app.controller.healthcheck_scheduler import HealthCheckScheduler
+from app.controller.healthcheck_history_database import HealthcheckHistoryDatabase
+from app.controller.http_based_connection import HttpBasedConnection
 
-app= FastAPI(summary="Health Check API", description="API for interacting with health check configurations.", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app:FastAPI):
+    # Start the history database writer and the background scheduler when enabled and stop them on shutdown
+    HealthcheckHistoryDatabase.start()
+    await HealthCheckScheduler.start()
+    yield
+    await HealthCheckScheduler.stop()
+    HealthcheckHistoryDatabase.stop()
+    HttpBasedConnection.close_idle_connections()
+
+app= FastAPI(summary="Health Check API", description="API for interacting with health check configurations.", version="1.0.0", lifespan=lifespan)
 origins = [
     "*"
 ]
@@ -17,4 +32,5 @@ app.add_middleware(
 )
 
 app.include_router(healthcheck_router, tags=["Health Check"])
-app.include_router(static_files_router)
\ No newline at end of file
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(static_files_router)
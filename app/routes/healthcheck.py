@@ -1,8 +1,19 @@
-from fastapi import APIRouter,Depends
-from app.depend.authentication import Auth
+import json
+from typing import Literal,Optional
+from fastapi import APIRouter,Depends,Query,Request,Response,WebSocket,status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from app.depend.authentication import Auth,optional_http_bearer
 from app.controller.healthcheck_processing import HealthCheckProcessing
 from app.schema.healthcheck_status import MountPointHealthcheckStatus,WebServiceHealthcheckStatus, DatabaseHealthcheckStatus
 from app.schema.healthcheck_status import RequirementsFileHealthcheckStatus,AllHealthcheckStatus
+from app.schema.healthcheck_snapshot import HealthcheckSnapshot
+from app.controller.healthcheck_response_cache import HealthcheckResponseCache
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.controller.healthcheck_push_channel import HealthcheckPushChannel
+from app.schema.healthcheck_change import HealthcheckChanges
+from app.controller.healthcheck_history import HealthcheckHistory
+from app.schema.healthcheck_history import HealthcheckHistorySeries
 from dataclasses import asdict
 
 
@@ -10,38 +21,141 @@ from dataclasses import asdict
 healthcheck_router = APIRouter()
 
 
+def set_snapshot_headers(response:Response,snapshot:HealthcheckSnapshot):
+    """ Add the check time and the age of the results to the response headers.
+
+    Args:
+        response (Response): The response to add the headers to.
+        snapshot (HealthcheckSnapshot): The snapshot being returned.
+    """
+    response.headers["X-Healthcheck-Checked-At"]=snapshot.checked_at_iso
+    response.headers["X-Healthcheck-Age"]=f"{snapshot.age_seconds:.3f}"
+
+def snapshot_response(scope:str,snapshot:HealthcheckSnapshot,request:Request)->Response:
+    """ Build the response of a snapshot from its cached JSON body, skipping the response model validation.
+
+    Conditional requests whose If-None-Match or If-Modified-Since header still matches get a 304 response without a body.
+
+    Args:
+        scope (str): 'full' or one of the category names of AllHealthcheckStatus.
+        snapshot (HealthcheckSnapshot): The snapshot being returned.
+        request (Request): The incoming request carrying the conditional headers.
+
+    Returns:
+        Response: The JSON response, or a 304 response, with the snapshot and validator headers.
+    """
+    encoded_response=HealthcheckResponseCache.get_response(scope,snapshot)
+    if HealthcheckResponseCache.is_not_modified(encoded_response,request.headers.get("if-none-match"),request.headers.get("if-modified-since")):
+        response=Response(status_code=304)
+    else:
+        response=Response(content=encoded_response.body, media_type="application/json")
+    response.headers["ETag"]=encoded_response.etag
+    response.headers["Last-Modified"]=encoded_response.last_modified_http
+    set_snapshot_headers(response,snapshot)
+    return response
+
 @healthcheck_router.get(path="/healthcheck",
                         summary="Healthcheck Endpoint",
                         description="This endpoint is used to check the health checkpoints of the application.",
                         response_model=AllHealthcheckStatus)
-def healthcheck()-> AllHealthcheckStatus:
-    return HealthCheckProcessing.full_health_check()
+def healthcheck(request:Request,
+                deadline_ms:Optional[int]=Query(default=None, gt=0, description="Return after this many milliseconds, unfinished checks are reported with Unknown status."))-> Response:
+    snapshot=HealthCheckProcessing.health_check_snapshot('full',deadline_ms)
+    return snapshot_response('full',snapshot,request)
 
 @healthcheck_router.get(path="/healthcheck/databases",
                         summary="Databases Healthcheck Endpoint",
                         description="This endpoint is used to check the health of databases defined in the health check configuration.",
                         response_model=list[DatabaseHealthcheckStatus])
-def healthcheck_databases(is_admin: bool = Depends(Auth.is_admin))-> list[DatabaseHealthcheckStatus]:
-    return HealthCheckProcessing.databases_health_check()
+def healthcheck_databases(request:Request,is_admin: bool = Depends(Auth.is_admin))-> Response:
+    snapshot=HealthCheckProcessing.health_check_snapshot('databases')
+    return snapshot_response('databases',snapshot,request)
 
 @healthcheck_router.get(path="/healthcheck/mountpoints",
                         summary="Mount Points Healthcheck Endpoint",
                         description="This endpoint is used to check the health of mount points defined in the health check configuration.",
                         response_model=list[MountPointHealthcheckStatus])
-def healthcheck_mountpoints(is_admin: bool = Depends(Auth.is_admin))-> list[MountPointHealthcheckStatus]:
-    mount_point_healthcheck_status=HealthCheckProcessing.mount_points_health_check()
-    return mount_point_healthcheck_status
+def healthcheck_mountpoints(request:Request,is_admin: bool = Depends(Auth.is_admin))-> Response:
+    mount_point_healthcheck_snapshot=HealthCheckProcessing.health_check_snapshot('mount_points')
+    return snapshot_response('mount_points',mount_point_healthcheck_snapshot,request)
 
 @healthcheck_router.get(path="/healthcheck/webservices",
                         summary="Web Services Healthcheck Endpoint",
                         description="This endpoint is used to check the health of web services defined in the health check configuration.",
                         response_model=list[WebServiceHealthcheckStatus])
-def healthcheck_webservices(is_admin: bool = Depends(Auth.is_admin))-> list[WebServiceHealthcheckStatus]:
-    return HealthCheckProcessing.webservices_health_check()
+def healthcheck_webservices(request:Request,is_admin: bool = Depends(Auth.is_admin))-> Response:
+    snapshot=HealthCheckProcessing.health_check_snapshot('webservices')
+    return snapshot_response('webservices',snapshot,request)
 
 @healthcheck_router.get(path="/healthcheck/requirements",
                         summary="Requirement files Healthcheck Endpoint",
                         description="This endpoint is used to check the health of requirements files defined in the health check configuration.",
                         response_model=list[RequirementsFileHealthcheckStatus])
-def healthcheck_requirements(is_admin: bool = Depends(Auth.is_admin))-> list[RequirementsFileHealthcheckStatus]:
-    return HealthCheckProcessing.all_required_packages_health_check()
\ No newline at end of file
+def healthcheck_requirements(request:Request,is_admin: bool = Depends(Auth.is_admin))-> Response:
+    snapshot=HealthCheckProcessing.health_check_snapshot('requirements_files')
+    return snapshot_response('requirements_files',snapshot,request)
+
+def stream_lines(scope:str,stream_format:str,deadline_ms:int=None):
+    """ Encode the streamed check results as NDJSON lines or Server-Sent Events.
+
+    Args:
+        scope (str): 'full' or one of the category names of AllHealthcheckStatus.
+        stream_format (str): 'ndjson' or 'sse'.
+        deadline_ms (int, optional): Deadline of live checks in milliseconds.
+
+    Yields:
+        str: One encoded message per check result, followed by an end event for Server-Sent Events.
+    """
+    for category, status in HealthCheckProcessing.stream_health_check(scope,deadline_ms):
+        message=json.dumps({"category":category,"result":asdict(status)})
+        yield f"event: result\ndata: {message}\n\n" if stream_format=="sse" else f"{message}\n"
+    if stream_format=="sse":
+        # Let EventSource clients close the connection instead of reconnecting
+        yield "event: end\ndata: {}\n\n"
+
+@healthcheck_router.get(path="/healthcheck/stream",
+                        summary="Streaming Healthcheck Endpoint",
+                        description="This endpoint streams each health check result as soon as it completes, as NDJSON lines or Server-Sent Events. A single category requires the admin key like its own endpoint.")
+def healthcheck_stream(scope:Literal['full','databases','webservices','mount_points','requirements_files']=Query(default='full', description="Stream all categories or a single one."),
+                       format:Literal['ndjson','sse']=Query(default='ndjson', description="NDJSON lines or Server-Sent Events."),
+                       deadline_ms:Optional[int]=Query(default=None, gt=0, description="Stop waiting after this many milliseconds, unfinished checks are streamed with Unknown status."),
+                       token:Optional[HTTPAuthorizationCredentials]=Depends(optional_http_bearer))->StreamingResponse:
+    # The category endpoints are admin only, so streaming a single category is too
+    if scope!='full':
+        Auth.is_admin(token)
+    media_type="text/event-stream" if format=="sse" else "application/x-ndjson"
+    # Ask proxies not to buffer the stream so each result reaches the client right away
+    return StreamingResponse(stream_lines(scope,format,deadline_ms), media_type=media_type,
+                             headers={"Cache-Control":"no-cache","X-Accel-Buffering":"no"})
+
+@healthcheck_router.get(path="/healthcheck/changes",
+                        summary="Healthcheck Changes Endpoint",
+                        description="This endpoint returns only the health check results that changed after a result version, without running any check.",
+                        response_model=HealthcheckChanges)
+def healthcheck_changes(since:int=Query(default=0, ge=0, description="The result version returned by the previous call, 0 to get the whole current state."),
+                        is_admin: bool = Depends(Auth.is_admin))-> HealthcheckChanges:
+    return HealthcheckResultStore.get_changes(since)
+
+@healthcheck_router.get(path="/healthcheck/history",
+                        summary="Healthcheck History Endpoint",
+                        description="This endpoint returns the recent results of each health check kept in memory, optionally within a time range and downsampled.",
+                        response_model=list[HealthcheckHistorySeries])
+def healthcheck_history(check_type:Optional[Literal['mount_point','webservice','database','requirements']]=Query(default=None, description="Only return checks of this check type."),
+                        synonym:Optional[str]=Query(default=None, description="Only return checks with this synonym."),
+                        start:Optional[float]=Query(default=None, description="Unix timestamp of the earliest result."),
+                        end:Optional[float]=Query(default=None, description="Unix timestamp of the latest result."),
+                        max_points:Optional[int]=Query(default=None, gt=0, description="Summarize each check as at most this many points of equal time width."),
+                        source:Optional[Literal['memory','database']]=Query(default=None, description="Read the in-memory ring buffers or the history database, the database when it is enabled."),
+                        is_admin: bool = Depends(Auth.is_admin))-> list[HealthcheckHistorySeries]:
+    return HealthcheckHistory.get_history(check_type,synonym,start,end,max_points,source)
+
+@healthcheck_router.websocket(path="/healthcheck/ws")
+async def healthcheck_websocket(websocket:WebSocket,
+                                token:Optional[str]=Query(default=None, description="The admin key, for clients that cannot send the Authorization header.")):
+    # Like the category endpoints the pushed results are admin only, browsers cannot set headers on WebSockets so the key may come as a query parameter
+    scheme, _, credentials=websocket.headers.get("authorization", "").partition(" ")
+    if not Auth.is_admin_key(credentials if scheme.lower()=="bearer" else token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    # Push the current results, then every change, as HealthcheckChanges JSON messages
+    await HealthcheckPushChannel.serve(websocket)
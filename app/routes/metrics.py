@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.controller.tcp_based_connection import TcpBasedConnection
+
+metrics_router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE="text/plain; version=0.0.4; charset=utf-8"
+
+@metrics_router.get(path="/metrics",
+                    summary="Metrics Endpoint",
+                    description="This endpoint exposes health check metrics in the Prometheus text format without running any check.",
+                    response_class=PlainTextResponse)
+def metrics()->PlainTextResponse:
+    return PlainTextResponse(HealthcheckMetrics.render(TcpBasedConnection.get_probe_socket_counters()),
+                             media_type=PROMETHEUS_CONTENT_TYPE)
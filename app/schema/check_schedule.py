@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class CheckSchedule:
+    """
+    Class to represent how often a single health check runs and when it runs next.
+    """
+    # Category name as used by AllHealthcheckConfig
+    category: str
+    synonym: str
+    # Seconds between two runs of the check
+    interval: float
+    # Monotonic time at which the check runs next
+    next_due: float
+    # Status of the latest result, None until the check ran once
+    last_status: Optional[str] = field(default=None)
+    # Unix timestamp of the latest result, None until the check ran once
+    checked_at: Optional[float] = field(default=None)
@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+
+@dataclass
+class CircuitState:
+    """
+    Class to represent the circuit breaker state of a single probe target.
+    """
+    # Consecutive failed probes
+    failures: int = field(default=0)
+    # Monotonic time after which a trial probe may run, 0 while the circuit is closed
+    opened_until: float = field(default=0.0)
+    # Seconds the circuit stays open after the next failed trial probe
+    reset_seconds: float = field(default=0.0)
+    # Whether a trial probe is running, other callers keep receiving the failure meanwhile
+    is_trial_running: bool = field(default=False)
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Any
+from email.utils import formatdate
+
+@dataclass
+class EncodedResponse:
+    """
+    Class to represent the encoded JSON body of a health check snapshot with its validators.
+    """
+    # Version of the result store the body was encoded from
+    version: int
+    # UTF-8 encoded JSON body
+    body: bytes
+    # Strong entity tag derived from a hash of the body
+    etag: str
+    # Unix timestamp of the moment the body content last changed
+    last_modified: float
+    # Results the body was encoded from, equal results of a newer version reuse the body without encoding it again
+    result: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def last_modified_http(self) -> str:
+        """
+        Returns the last modification time as an HTTP date.
+        """
+        return formatdate(self.last_modified, usegmt=True)
@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+@dataclass
+class HealthcheckChange:
+    """
+    Class to represent a change of a single health check result.
+    """
+    # Result store version that introduced the change
+    version: int
+    category: str
+    synonym: str
+    # 'added', 'changed' or 'removed'
+    change: str
+    # The new status of the check, None when the check was removed
+    result: Optional[Any] = field(default=None)
+
+@dataclass
+class HealthcheckChanges:
+    """
+    Class to represent the health check result changes since a version.
+    """
+    # Current result store version, to be used as the next cursor
+    version: int
+    # True when the changes since the cursor are no longer available and the whole current state is returned instead
+    reset: bool
+    changes: list[HealthcheckChange] = field(default_factory=list)
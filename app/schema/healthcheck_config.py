@@ -1,8 +1,38 @@
 from dataclasses import dataclass, field
+from typing import ClassVar, Optional
 import re
+import functools
 import ipaddress
+import sys
 
-@dataclass
+# Validation patterns are compiled once and only used with fullmatch on bounded pieces, so they run in linear time
+# A hostname label (RFC 1123): 1 to 63 letters, digits or hyphens, not starting or ending with a hyphen
+HOSTNAME_LABEL_PATTERN=re.compile(r'[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?')
+# A mount point path segment: word characters, dots and hyphens
+MOUNT_POINT_SEGMENT_PATTERN=re.compile(r'[\w.-]+')
+# A requirements file path: word characters, hyphens, dots, spaces and slashes
+FILE_PATH_PATTERN=re.compile(r'[\w\-. /]+')
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_hostname(hostname:str)->bool:
+    """ Check if the provided hostname is a valid hostname Based on RFC 1123.
+
+    Args:
+        hostname (str): The hostname to check.
+
+    Returns:
+        bool: True if the hostname is valid, False otherwise.
+    """
+    # check if hostname is not empty and does not exceed the maximum length (255 characters)
+    if not hostname or len(hostname) > 255:
+        return False
+    # check if hostname starts or ends with a hyphen
+    if hostname.startswith('-') or hostname.endswith('-'):
+        return False
+    # check if each label is not empty, does not exceed the maximum length (63 characters) and only contains letters, digits, and hyphens
+    return all(label and len(label) <= 63 and HOSTNAME_LABEL_PATTERN.fullmatch(label) for label in hostname.split('.'))
+
+@dataclass(slots=True, frozen=True)
 class HealthcheckConfigBase:
     """
     Base class for health check configurations.
@@ -39,25 +69,10 @@ class HealthcheckConfigBase:
         Returns:
             bool: True if the hostname is valid, False otherwise.
         """
-        # check if hostname is not empty and does not exceed the maximum length (255 characters)
-        if not hostname or len(hostname) > 255 or len(hostname)==0:
-            return False
-        # check if hostname starts or ends with a hyphen
-        if hostname.startswith('-') or hostname.endswith('-'):
+        if not isinstance(hostname, str):
             return False
-        # split the hostname into labels
-        labels = hostname.split('.')
-        # check if each label is valid
-        for label in labels:
-            # check if label is not empty and does not exceed the maximum length (63 characters)
-            if not label or len(label) > 63:
-                return False
-            label_pattern = r'^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$'
-            # check if label contains only valid characters (letters, digits, and hyphens)
-            if not re.match(label_pattern, label):
-                return False
-        # if all checks pass, the hostname is valid
-        return True
+        # Large configurations repeat a few hosts across many checks, so each distinct hostname is only validated once
+        return _is_valid_hostname(hostname)
     def _is_valid_ip_address(self,ip_address:str)->bool:
         """ Check if the provided IP address is a valid IPv4 or IPv6 address using ipaddress library.
 
@@ -91,12 +106,24 @@ class HealthcheckConfigBase:
         except:
             # If the port number cannot be converted to an integer, it is not valid
             return False
+    def _intern_fields(self,*field_names:str):
+        """ Replace string fields with their interned copy so repeated values share a single object.
+
+        Args:
+            *field_names (str): The names of the fields to intern.
+        """
+        for field_name in field_names:
+            value=getattr(self, field_name)
+            if isinstance(value, str):
+                # Frozen dataclasses can only be updated through object.__setattr__
+                object.__setattr__(self, field_name, sys.intern(value))
+
     def __post_init__(self):
         # Validate synonym
         if not self._is_valid_synonym(self.synonym):
             raise ValueError(f"Invalid synonym: {self.synonym}. It must be a non-empty string.")
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WebserviceHealthcheckConfig(HealthcheckConfigBase):
     """
     Configuration for web service health checks.
@@ -104,6 +131,10 @@ class WebserviceHealthcheckConfig(HealthcheckConfigBase):
     hostname: str
     port: int
     protocol: str
+    # An HTTP request is sent when a path or an expected body is set, otherwise only a TCP connection is established
+    path: Optional[str] = field(default=None)
+    # Substring the response body must contain
+    expected_body: Optional[str] = field(default=None)
 
     def __post_init__(self):
         # Validate protocol
@@ -116,8 +147,24 @@ class WebserviceHealthcheckConfig(HealthcheckConfigBase):
         # Validate port
         if not self._is_valid_port(self.port):
             raise ValueError(f"Invalid port number: {self.port}")
+        # Validate path, it is sent as is in the request line
+        if self.path is not None and (not isinstance(self.path, str) or not self.path.startswith('/')
+                                      or any(character.isspace() or not character.isprintable() for character in self.path)):
+            raise ValueError(f"Invalid path: {self.path}. It must start with '/' and not contain whitespace.")
+        # Validate expected body
+        if self.expected_body is not None and (not isinstance(self.expected_body, str) or len(self.expected_body) == 0):
+            raise ValueError(f"Invalid expected_body: {self.expected_body}. It must be a non-empty string.")
+        self._intern_fields('hostname', 'protocol', 'path')
+
+    def is_http_check(self)->bool:
+        """ Check whether the web service is checked with an HTTP request rather than only a TCP connection.
 
-@dataclass
+        Returns:
+            bool: True if a path or an expected body is configured.
+        """
+        return self.path is not None or self.expected_body is not None
+
+@dataclass(slots=True, frozen=True)
 class DatabaseHealthcheckConfig(HealthcheckConfigBase):
     """
     Configuration for database health checks.
@@ -147,7 +194,7 @@ class DatabaseHealthcheckConfig(HealthcheckConfigBase):
         """
 
         # Check if the database driver is in the DB_DRIVER_MAP values
-        return database_type.lower() in list(self._DB_DRIVER_MAP.keys())
+        return database_type.lower() in self._DB_DRIVER_MAP
 
     def _get_database_drivers_by_type(self,database_type:str)->list:
         """ Get the database drivers by type.
@@ -178,7 +225,8 @@ class DatabaseHealthcheckConfig(HealthcheckConfigBase):
         # Validate database type
         if not self._is_valid_db(self.database_type):
             raise ValueError(f"Invalid database type: {self.database_type}. Supported types are: {list(self._DB_DRIVER_MAP.keys())}")
-@dataclass
+        self._intern_fields('hostname', 'database_type')
+@dataclass(slots=True, frozen=True)
 class MountPointHealthcheckConfig(HealthcheckConfigBase):
     """
     Configuration for mount point health checks.
@@ -196,10 +244,15 @@ class MountPointHealthcheckConfig(HealthcheckConfigBase):
         Returns:
             bool: True if the mount point is valid, False otherwise.
         """
-        # Regex pattern to match valid Linux mount points (absolute paths like /, /home, /mnt/data)
-        mount_point_pattern = r'^/([\w.-]+/?)*$'
-        # Return 
-        return re.match(mount_point_pattern, mount_point) is not None
+        # Valid Linux mount points are absolute paths like /, /home, /mnt/data or /mnt/data/
+        if not isinstance(mount_point, str) or not mount_point.startswith('/'):
+            return False
+        # Split on slashes instead of matching the whole path with a nested quantifier, which backtracks exponentially
+        segments = mount_point[1:].split('/')
+        # A trailing slash leaves an empty last segment, any other empty segment is a repeated slash
+        if segments[-1] == '':
+            segments.pop()
+        return all(MOUNT_POINT_SEGMENT_PATTERN.fullmatch(segment) for segment in segments)
     
     @staticmethod
     def _is_valid_capacity_threshold(capacity_threshold:int)->bool:
@@ -228,8 +281,9 @@ class MountPointHealthcheckConfig(HealthcheckConfigBase):
         # Validate capacity threshold
         if not self._is_valid_capacity_threshold(self.threshold_percentage):
             raise ValueError(f"Invalid capacity threshold: {self.threshold_percentage}. It must be a positive integer between 0 and 100.")
+        self._intern_fields('mount_point')
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RequirementsFileHealthcheckConfig(HealthcheckConfigBase):
     """
     Configuration for requirements file health checks.
@@ -247,12 +301,13 @@ class RequirementsFileHealthcheckConfig(HealthcheckConfigBase):
             bool: True if the file path is valid, False otherwise.
         """
         # Check if the file path is not empty and does not contain any invalid characters
-        return bool(file_path) and re.match(r'^[\w\-. /]+$', file_path) and len(file_path) > 0
+        return bool(file_path) and isinstance(file_path, str) and FILE_PATH_PATTERN.fullmatch(file_path) is not None
 
     def __post_init__(self):
         # Validate requirements file path syntax
         if not self._is_valid_file_path(self.requirements_file_path):
             raise ValueError(f"Invalid requirements file path: {self.requirements_file_path}. It must be a valid file path.")
+        self._intern_fields('requirements_file_path')
 @dataclass
 class AllHealthcheckConfig:
     """
@@ -263,12 +318,22 @@ class AllHealthcheckConfig:
     databases: list[DatabaseHealthcheckConfig] = field(default_factory=list)
     requirements_files: list[RequirementsFileHealthcheckConfig] = field(default_factory=list)
 
-    def __init__(self,healthcheck_config):
+    # Check type mapped to the attribute holding its checks and the class of its config
+    CHECK_TYPES: ClassVar[dict[str,tuple[str,type]]] = {
+        'mount_point': ('mount_points', MountPointHealthcheckConfig),
+        'webservice': ('webservices', WebserviceHealthcheckConfig),
+        'database': ('databases', DatabaseHealthcheckConfig),
+        'requirements': ('requirements_files', RequirementsFileHealthcheckConfig)
+    }
+
+    def __init__(self,healthcheck_config=()):
         """
         Initialize AllHealthcheckConfig with the provided healthcheck_config.
 
+        Entries that cannot be created are skipped, HealthcheckConfigCompiler reports them instead.
+
         Args:
-            healthcheck_config (dict): The health check configuration to initialize the object with.
+            healthcheck_config (list[dict], optional): The health check configuration to initialize the object with. Defaults to no checks.
         """
         # Initialize empty lists for each type of health check configuration
         self.mount_points = []
@@ -277,24 +342,29 @@ class AllHealthcheckConfig:
         self.requirements_files = []
         # Iterate through the healthcheck_config and create instances of the respective health check configuration classes
         for item in healthcheck_config:
-            match item['check_type']:
-                case 'mount_point':
-                    try:
-                        self.mount_points.append(MountPointHealthcheckConfig(**item["details"]))
-                    except Exception as e:
-                        print(f"Error while creating mount point health check: {e}")
-                case 'webservice':
-                    try:
-                        self.webservices.append(WebserviceHealthcheckConfig(**item["details"]))
-                    except Exception as e:
-                        print(f"Error while creating webservice health check: {e}")
-                case 'database':
-                    try:
-                        self.databases.append(DatabaseHealthcheckConfig(**item["details"]))
-                    except Exception as e:
-                        print(f"Error while creating database health check: {e}")
-                case 'requirements':
-                    try:
-                        self.requirements_files.append(RequirementsFileHealthcheckConfig(**item["details"]))
-                    except Exception as e:
-                        print(f"Error while creating requirements file health check: {e}")
\ No newline at end of file
+            try:
+                self.add_check(item['check_type'], item['details'])
+            except Exception:
+                # Any invalid value, e.g. a protocol that is not a string, only skips its own entry
+                continue
+
+    def add_check(self,check_type:str,details:dict):
+        """ Create the config of a single health check and add it to its category.
+
+        Args:
+            check_type (str): One of 'mount_point', 'webservice', 'database' or 'requirements'.
+            details (dict): The fields of the health check config.
+
+        Returns:
+            HealthcheckConfigBase: The created health check config.
+
+        Raises:
+            ValueError: If the check type is unknown or a field is not valid.
+            TypeError: If a required field is missing or an unknown field is given.
+        """
+        if check_type not in AllHealthcheckConfig.CHECK_TYPES:
+            raise ValueError(f"Unknown check type: {check_type}")
+        category, config_class = AllHealthcheckConfig.CHECK_TYPES[check_type]
+        check = config_class(**details)
+        getattr(self, category).append(check)
+        return check
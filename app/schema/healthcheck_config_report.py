@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class HealthcheckConfigIssue:
+    """
+    Class to represent a health check config entry that was not compiled.
+    """
+    # Position of the entry in the configuration file
+    index: int
+    check_type: Optional[str]
+    synonym: Optional[str]
+    reason: str
+
+@dataclass
+class HealthcheckConfigReport:
+    """
+    Class to represent the outcome of compiling a health check configuration.
+    """
+    total_entries: int = field(default=0)
+    compiled_entries: int = field(default=0)
+    # Entries without the structure of a health check, any of them rejects the whole configuration
+    malformed_entries: list[HealthcheckConfigIssue] = field(default_factory=list)
+    # Entries with a value that does not pass validation, they are skipped
+    invalid_entries: list[HealthcheckConfigIssue] = field(default_factory=list)
+    # Entries repeating the check type and synonym of an earlier entry, they are skipped
+    duplicate_entries: list[HealthcheckConfigIssue] = field(default_factory=list)
+    # True when the compiled configuration was loaded from the compiled config cache file
+    from_cache: bool = field(default=False)
+
+    @property
+    def is_rejected(self)->bool:
+        """ Whether the configuration is empty, malformed or entirely invalid and must not replace a good configuration.
+
+        Returns:
+            bool: True if no entry was compiled or any entry is malformed, False otherwise.
+        """
+        return self.compiled_entries==0 or bool(self.malformed_entries)
+
+    @property
+    def issues(self)->list[HealthcheckConfigIssue]:
+        """ All entries that were not compiled, in configuration file order.
+
+        Returns:
+            list[HealthcheckConfigIssue]: The malformed, invalid and duplicate entries.
+        """
+        return sorted(self.malformed_entries+self.invalid_entries+self.duplicate_entries, key=lambda issue: issue.index)
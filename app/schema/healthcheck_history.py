@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class HealthcheckHistoryPoint:
+    """
+    Class to represent a past result of a health check, or the summary of several results when the history is downsampled.
+    """
+    # Unix timestamp of the first result summarized by the point
+    timestamp: float
+    # The worst status among the summarized results, 'Error' when the check itself failed
+    status: str
+    # Average and maximum duration of the summarized checks
+    latency_ms: float
+    max_latency_ms: float
+    # Highest usage percentage among the summarized results, None for checks without a usage
+    usage_percentage: Optional[int] = field(default=None)
+    samples: int = field(default=1)
+
+@dataclass
+class HealthcheckHistorySeries:
+    """
+    Class to represent the result history of a single health check.
+    """
+    check_type: str
+    synonym: str
+    points: list[HealthcheckHistoryPoint] = field(default_factory=list)
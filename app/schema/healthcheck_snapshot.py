@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+import time
+
+@dataclass
+class HealthcheckSnapshot:
+    """
+    Class to represent the latest results of a health check scope and when they were checked.
+    """
+    # List of statuses for a single category or AllHealthcheckStatus for the full health check
+    result: Any
+    # Unix timestamp of the moment the results were checked
+    checked_at: float
+    # Version of the result store when the results were published, it changes whenever any result changes
+    version: int = 0
+
+    @property
+    def age_seconds(self) -> float:
+        """
+        Returns how many seconds ago the results were checked.
+        """
+        return max(0.0, time.time() - self.checked_at)
+
+    @property
+    def checked_at_iso(self) -> str:
+        """
+        Returns the check timestamp in ISO 8601 format in UTC.
+        """
+        return datetime.fromtimestamp(self.checked_at, tz=timezone.utc).isoformat()
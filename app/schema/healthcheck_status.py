@@ -2,18 +2,23 @@ from enum import Enum
 from dataclasses import dataclass, field
 from typing import Optional
 
-class HealthcheckStatusEnum(Enum):
+class HealthcheckStatusEnum(str, Enum):
     """
     Enum to represent the health check status.
+    Members are strings so they compare, hash and serialize like their values.
     """
     FAILURE = "Failure"
     SUCCESS = "Success"
     WARNING = "Warning"
+    UNKNOWN = "Unknown"
 
     def __str__(self):
         return self.value
+
+    def __hash__(self):
+        return str.__hash__(self)
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HealthcheckStatus:
     """
     Class to represent the health check status of a system.
@@ -21,77 +26,111 @@ class HealthcheckStatus:
     synonym: str
     
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MountPointHealthcheckStatus(HealthcheckStatus):
     """
     Class to represent the health check status of a mount point.
     """
-    status: Optional[str]=field(init=False, default=None)
+    status: Optional[HealthcheckStatusEnum]=field(init=False, default=None)
     mount_point: str
-    is_mounted: bool
-    current_usage: int
+    is_mounted: Optional[bool]
+    current_usage: Optional[int]
     threshold_percentage: int
+    used_bytes: Optional[int] = field(default=None)
+    total_bytes: Optional[int] = field(default=None)
 
     def __post_init__(self):
-        if not(self.is_mounted):
-            self.status=HealthcheckStatusEnum.FAILURE.value
+        if self.is_mounted is None:
+            status=HealthcheckStatusEnum.UNKNOWN
+        elif not(self.is_mounted):
+            status=HealthcheckStatusEnum.FAILURE
         elif self.current_usage >= self.threshold_percentage:
-            self.status=HealthcheckStatusEnum.FAILURE.value
+            status=HealthcheckStatusEnum.FAILURE
         elif self.current_usage >= (self.threshold_percentage - 5):
-            self.status=HealthcheckStatusEnum.WARNING.value
+            status=HealthcheckStatusEnum.WARNING
         else:
-            self.status=HealthcheckStatusEnum.SUCCESS.value
+            status=HealthcheckStatusEnum.SUCCESS
+        # Frozen dataclasses can only be updated through object.__setattr__
+        object.__setattr__(self, 'status', status)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WebServiceHealthcheckStatus(HealthcheckStatus):
     """
     Class to represent the health check status of a web service.
     """
-    status: Optional[str]=field(init=False, default=None)
+    status: Optional[HealthcheckStatusEnum]=field(init=False, default=None)
     hostname: str
     port: int
     protocol: str
-    can_tcp: bool
+    can_tcp: Optional[bool]
+    # True when an open circuit breaker answered with the failure instead of a fresh probe
+    is_short_circuited: bool = field(default=False)
+    # HTTP checks only: the response status code and whether the body contained the expected substring
+    status_code: Optional[int] = field(default=None)
+    is_body_matched: Optional[bool] = field(default=None)
+    # 'dns' when the hostname could not be resolved, 'connect' or 'request' when the target did not answer
+    failed_stage: Optional[str] = field(default=None)
+    # TCP checks only: seconds spent resolving the hostname and connecting, left out of comparisons so timings alone are no change
+    dns_lookup_seconds: Optional[float] = field(default=None, compare=False)
+    connect_seconds: Optional[float] = field(default=None, compare=False)
 
     def __post_init__(self):
-        if self.can_tcp:
-            self.status=HealthcheckStatusEnum.SUCCESS.value
+        if self.can_tcp is None:
+            status=HealthcheckStatusEnum.UNKNOWN
+        elif not self.can_tcp:
+            status=HealthcheckStatusEnum.FAILURE
+        elif (self.status_code is not None and self.status_code >= 400) or self.is_body_matched is False:
+            status=HealthcheckStatusEnum.FAILURE
         else:
-            self.status=HealthcheckStatusEnum.FAILURE.value
+            status=HealthcheckStatusEnum.SUCCESS
+        object.__setattr__(self, 'status', status)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatabaseHealthcheckStatus(HealthcheckStatus):
     """
     Class to represent the health check status of a database.
     """
-    status: Optional[str]=field(init=False, default=None)
+    status: Optional[HealthcheckStatusEnum]=field(init=False, default=None)
     hostname: str
     port: int
     database_type:str
-    can_tcp: bool
+    can_tcp: Optional[bool]
     db_driver_installed: bool = field(default=None)
+    # True when an open circuit breaker answered with the failure instead of a fresh probe
+    is_short_circuited: bool = field(default=False)
+    # 'dns' when the hostname could not be resolved, 'connect' when no resolved address accepted the connection
+    failed_stage: Optional[str] = field(default=None)
+    # Seconds spent resolving the hostname and connecting, left out of comparisons so timings alone are no change
+    dns_lookup_seconds: Optional[float] = field(default=None, compare=False)
+    connect_seconds: Optional[float] = field(default=None, compare=False)
     
     def __post_init__(self):
-        if self.can_tcp and (self.db_driver_installed is None or self.db_driver_installed):
-            self.status = HealthcheckStatusEnum.SUCCESS.value
+        if self.can_tcp is None:
+            status = HealthcheckStatusEnum.UNKNOWN
+        elif self.can_tcp and (self.db_driver_installed is None or self.db_driver_installed):
+            status = HealthcheckStatusEnum.SUCCESS
         else:
-            self.status = HealthcheckStatusEnum.FAILURE.value
+            status = HealthcheckStatusEnum.FAILURE
+        object.__setattr__(self, 'status', status)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RequirementsFileHealthcheckStatus(HealthcheckStatus):
     """
     Class to represent the health check status of a requirements file.
     """
-    status: Optional[str]=field(init=False, default=None)
+    status: Optional[HealthcheckStatusEnum]=field(init=False, default=None)
     requirements_file_path: str
-    is_file_exists: bool
-    are_all_packages_installed: bool=field(default=False)
+    is_file_exists: Optional[bool]
+    are_all_packages_installed: Optional[bool]=field(default=False)
 
     def __post_init__(self):
-        if self.is_file_exists and self.are_all_packages_installed:
-            self.status = HealthcheckStatusEnum.SUCCESS.value
+        if self.is_file_exists is None:
+            status = HealthcheckStatusEnum.UNKNOWN
+        elif self.is_file_exists and self.are_all_packages_installed:
+            status = HealthcheckStatusEnum.SUCCESS
         else:
-            self.status = HealthcheckStatusEnum.FAILURE.value
+            status = HealthcheckStatusEnum.FAILURE
+        object.__setattr__(self, 'status', status)
 
 @dataclass
 class AllHealthcheckStatus:
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class HttpProbeResult:
+    """
+    Class to represent the outcome of an HTTP or HTTPS probe.
+    """
+    hostname: str
+    port: int
+    protocol: str
+    # Whether a response was received, False when the connection or the request failed
+    is_connected: bool
+    status_code: Optional[int] = None
+    # None when no expected body substring is configured
+    is_body_matched: Optional[bool] = None
+    # Whether the request went over a pooled keep-alive connection, and whether a new TLS connection resumed a session
+    is_connection_reused: bool = False
+    is_session_reused: bool = False
+    seconds: float = 0.0
+    # 'dns' when the hostname could not be resolved, 'request' when no response was received otherwise
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
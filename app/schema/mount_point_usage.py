@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+import math
+
+@dataclass
+class MountPointUsage:
+    """
+    Class to represent the disk usage of a mount point in bytes.
+    """
+    mount_point: str
+    total_bytes: int
+    used_bytes: int
+    available_bytes: int
+
+    @property
+    def usage_percentage(self) -> int:
+        """
+        Returns the usage percentage rounded up the same way as the 'df' command.
+        """
+        # Blocks reserved for root are neither used nor available to users, so they are excluded like 'df' does
+        usable_bytes = self.used_bytes + self.available_bytes
+        if usable_bytes == 0:
+            return 0
+        return math.ceil(self.used_bytes * 100 / usable_bytes)
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class TcpProbeResult:
+    """
+    Class to represent the outcome of a TCP probe with the name resolution and connect times reported separately.
+    """
+    hostname: str
+    port: int
+    is_connected: bool
+    dns_lookup_seconds: float = 0.0
+    connect_seconds: float = 0.0
+    # 'dns' when the hostname could not be resolved, 'connect' when no resolved address accepted the connection
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
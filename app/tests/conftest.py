@@ -0,0 +1,89 @@
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.controller.healthcheck_config_cache import HealthcheckConfigCache
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.controller.healthcheck_response_cache import HealthcheckResponseCache
+from app.controller.healthcheck_history import HealthcheckHistory
+from app.controller.circuit_breaker import CircuitBreaker
+from app.controller.http_based_connection import HttpBasedConnection
+
+@pytest.fixture(autouse=True)
+def clear_healthcheck_state():
+    # Each test mocks its own configuration so cached configuration and results must not leak between tests
+    HealthcheckConfigCache.clear()
+    HealthcheckResultStore.clear()
+    HealthcheckResponseCache.clear()
+    HealthcheckHistory.clear()
+    CircuitBreaker.clear()
+    HttpBasedConnection.close_idle_connections()
+    yield
+    HealthcheckConfigCache.clear()
+    HealthcheckResultStore.clear()
+    HealthcheckResponseCache.clear()
+    HealthcheckHistory.clear()
+    CircuitBreaker.clear()
+    HttpBasedConnection.close_idle_connections()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive unless a response closes the connection
+    protocol_version="HTTP/1.1"
+    # Path mapped to the status code and body of the response
+    RESPONSES={"/health": (200, b"status: ok"), "/broken": (503, b"status: down"), "/close": (200, b"status: ok")}
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately, do not hold the body back for the acknowledgement of the headers
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections+=1
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        status_code, body=self.RESPONSES.get(self.path, (404, b"not found"))
+        self.send_response(status_code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close without announcing it, as a server dropping an idle keep-alive connection does
+        self.close_connection=self.path=="/close"
+
+    def log_message(self,format,*args):
+        pass
+
+def _serve(tls_context:ssl.SSLContext=None):
+    server=ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.connections=0
+    server.paths=[]
+    if tls_context is not None:
+        server.socket=tls_context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+@pytest.fixture
+def http_server():
+    # A local stand-in web service counting the connections it accepts
+    server=_serve()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def https_server(tmp_path,monkeypatch):
+    # The same stand-in behind TLS with a self-signed certificate the probes are told to trust
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to create a test certificate")
+    certificate_file, key_file=str(tmp_path/"certificate.pem"), str(tmp_path/"key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+                    "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key_file, "-out", certificate_file],
+                   check=True, capture_output=True)
+    tls_context=ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    tls_context.load_cert_chain(certificate_file, key_file)
+    monkeypatch.setenv("HEALTH_CHECK_HTTP_CA_FILE", certificate_file)
+    server=_serve(tls_context)
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+admin_headers={"Authorization": "Bearer rd-healthcheck"}
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "First API",
+                    "hostname": "first.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                },
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "Second API",
+                    "hostname": "second.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_tcp(monkeypatch):
+    down_hostnames=set()
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=hostname not in down_hostnames)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+    return down_hostnames
+
+def test_changes_since_version(mock_load_health_check_json_schema,mock_tcp):
+    client.get("/healthcheck")
+    response=client.get("/healthcheck/changes",headers=admin_headers)
+    assert response.status_code==200
+    body=response.json()
+    # The first call gets every current result
+    assert {change["synonym"] for change in body["changes"]}=={"First API","Second API"}
+    cursor=body["version"]
+    # Checked again without any change
+    client.get("/healthcheck")
+    assert client.get("/healthcheck/changes",params={"since":cursor},headers=admin_headers).json()["changes"]==[]
+    # Only the flipped check is returned
+    mock_tcp.add("second.example.com")
+    client.get("/healthcheck")
+    body=client.get("/healthcheck/changes",params={"since":cursor},headers=admin_headers).json()
+    assert body["reset"] is False
+    assert [(change["category"],change["synonym"],change["change"],change["result"]["status"]) for change in body["changes"]]==[
+        ("webservices","Second API","changed","Failure")]
+    assert body["version"]>cursor
+
+def test_changes_rejects_negative_cursor():
+    assert client.get("/healthcheck/changes",params={"since":-1},headers=admin_headers).status_code==422
+
+def test_changes_require_admin():
+    # The changes carry the results of every category, which are admin only
+    assert client.get("/healthcheck/changes").status_code==403
@@ -0,0 +1,57 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "First API",
+                    "hostname": "google.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_tcp(monkeypatch):
+    can_tcp={"value":True}
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=can_tcp["value"])
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+    return can_tcp
+
+def test_conditional_get_returns_not_modified_until_results_change(mock_load_health_check_json_schema,mock_tcp):
+    response=client.get("/healthcheck")
+    assert response.status_code==200
+    etag=response.headers["ETag"]
+    assert response.headers["Last-Modified"].endswith("GMT")
+    # The checks run again with the same results so the client copy is still current
+    response=client.get("/healthcheck",headers={"If-None-Match":etag})
+    assert response.status_code==304
+    assert response.content==b""
+    assert response.headers["ETag"]==etag
+    assert "X-Healthcheck-Checked-At" in response.headers
+    # A status change produces a new ETag and the full body
+    mock_tcp["value"]=False
+    response=client.get("/healthcheck",headers={"If-None-Match":etag})
+    assert response.status_code==200
+    assert response.headers["ETag"]!=etag
+    assert response.json()["webservices"][0]["status"]=="Failure"
+
+def test_conditional_get_on_admin_endpoint(mock_load_health_check_json_schema,mock_tcp):
+    headers={"Authorization": "Bearer rd-healthcheck"}
+    response=client.get("/healthcheck/webservices",headers=headers)
+    response=client.get("/healthcheck/webservices",headers={**headers,"If-Modified-Since":response.headers["Last-Modified"]})
+    assert response.status_code==304
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
 
 client=TestClient(app)
 
@@ -70,8 +71,8 @@ def mock_load_health_check_json_schema(monkeypatch):
 @pytest.fixture
 def mock_can_establish_tcp(monkeypatch):
     def can_establish_tcp_mock(hostname,port,timeout=0):
-        return True
-    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.establish_tcp_connection",
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
                         can_establish_tcp_mock)
 def test_successful_database_healthcheck(mock_load_health_check_json_schema,mock_can_establish_tcp):
     # Call /healthcheck/databases with admin default password
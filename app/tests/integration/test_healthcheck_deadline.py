@@ -0,0 +1,57 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "Fast API",
+                    "hostname": "fast.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                },
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "Hung API",
+                    "hostname": "hung.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_hung_tcp(monkeypatch):
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        if hostname.startswith("hung"):
+            time.sleep(1.5)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+
+def test_healthcheck_with_deadline_returns_partial_results(mock_load_health_check_json_schema,mock_hung_tcp):
+    started=time.perf_counter()
+    response=client.get("/healthcheck",params={"deadline_ms":300})
+    # The response is sent at the deadline instead of waiting for the hung target
+    assert time.perf_counter()-started<1
+    assert response.status_code==200
+    statuses={item["synonym"]:item["status"] for item in response.json()["webservices"]}
+    assert statuses=={"Fast API":"Success","Hung API":"Unknown"}
+
+@pytest.mark.parametrize("deadline_ms",[("0"),("-5"),("soon")])
+def test_healthcheck_rejects_invalid_deadline(deadline_ms):
+    response=client.get("/healthcheck",params={"deadline_ms":deadline_ms})
+    assert response.status_code==422
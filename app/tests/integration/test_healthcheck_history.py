@@ -0,0 +1,36 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+admin_headers={"Authorization": "Bearer rd-healthcheck"}
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [{"check_type": "webservice", "details": {"synonym": "Core API", "hostname": "api.example.com", "port": 443, "protocol": "https"}}]
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_tcp(monkeypatch):
+    outcomes=[True,False,True]
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        lambda hostname,port,timeout=0: TcpProbeResult(hostname=hostname,port=port,is_connected=outcomes.pop(0)))
+
+def test_history_answers_when_a_check_started_failing(mock_load_health_check_json_schema,mock_tcp):
+    started=time.time()
+    for _ in range(3):
+        assert client.get("/healthcheck/webservices",headers=admin_headers).status_code==200
+    response=client.get("/healthcheck/history",params={"synonym":"Core API","start":started},headers=admin_headers)
+    assert response.status_code==200
+    series=response.json()
+    assert [(item["check_type"],item["synonym"]) for item in series]==[("webservice","Core API")]
+    assert [point["status"] for point in series[0]["points"]]==["Success","Failure","Success"]
+    downsampled=client.get("/healthcheck/history",params={"max_points":1},headers=admin_headers).json()
+    assert [(point["status"],point["samples"]) for point in downsampled[0]["points"]]==[("Failure",3)]
+
+def test_history_requires_admin():
+    assert client.get("/healthcheck/history",headers={"Authorization": "Bearer wrong"}).status_code==403
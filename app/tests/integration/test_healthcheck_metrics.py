@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.controller.healthcheck_metrics import HealthcheckMetrics
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+            {
+                "check_type": "webservice",
+                "details": {
+                    "synonym": "First API",
+                    "hostname": "localhost",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_probe_tcp_connection(monkeypatch):
+    calls=[]
+    def probe_tcp_connection(hostname,port,time_out=1,abortive_close=None):
+        calls.append((hostname,port))
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        probe_tcp_connection)
+    return calls
+
+def test_metrics_report_checks_without_running_them(mock_load_health_check_json_schema,mock_probe_tcp_connection):
+    HealthcheckMetrics.clear()
+    # Run the checks once through the health check endpoint
+    assert client.get("/healthcheck").status_code==200
+    assert len(mock_probe_tcp_connection)==1
+    # Scrape the metrics
+    response=client.get("/metrics")
+    assert response.status_code==200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'healthcheck_check_results_total{synonym="First API",check_type="webservice",status="Success"} 1' in response.text
+    assert "healthcheck_open_probe_sockets" in response.text
+    # Rendering the metrics must not run any check
+    assert len(mock_probe_tcp_connection)==1
@@ -0,0 +1,53 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "example API",
+                    "hostname": "example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def count_tcp_probes(monkeypatch):
+    probes=[]
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        probes.append((hostname,port))
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+    return probes
+
+def test_healthcheck_is_served_from_background_snapshot(monkeypatch,mock_load_health_check_json_schema,count_tcp_probes):
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_ENABLED","true")
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_INTERVAL","60")
+    # Using the client as a context manager runs the application lifespan which starts the scheduler
+    with TestClient(app) as client:
+        # Wait for the first background sweep
+        deadline=time.monotonic()+5
+        while not count_tcp_probes and time.monotonic()<deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        probes_after_first_sweep=len(count_tcp_probes)
+        for _ in range(5):
+            response=client.get("/healthcheck")
+            assert response.status_code==200
+            assert response.json()["webservices"][0]["status"]=="Success"
+            assert "X-Healthcheck-Checked-At" in response.headers
+            assert float(response.headers["X-Healthcheck-Age"])>=0
+        # Requests are answered from the snapshot without probing again
+        assert len(count_tcp_probes)==probes_after_first_sweep==1
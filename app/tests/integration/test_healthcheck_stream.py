@@ -0,0 +1,77 @@
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "Slow API",
+                    "hostname": "slow.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                },
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "Fast API",
+                    "hostname": "fast.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_slow_tcp(monkeypatch):
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        if hostname.startswith("slow"):
+            time.sleep(0.3)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+
+def test_healthcheck_stream_ndjson(mock_load_health_check_json_schema,mock_slow_tcp):
+    with client.stream("GET","/healthcheck/stream") as response:
+        assert response.status_code==200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        messages=[json.loads(line) for line in response.iter_lines() if line]
+    # The fast check is streamed before the slow one
+    assert [message["result"]["synonym"] for message in messages]==["Fast API","Slow API"]
+    assert all(message["category"]=="webservices" for message in messages)
+    assert all(message["result"]["status"]=="Success" for message in messages)
+
+def test_healthcheck_stream_sse(mock_load_health_check_json_schema,mock_slow_tcp):
+    response=client.get("/healthcheck/stream",params={"format":"sse","scope":"webservices"},headers={"Authorization": "Bearer rd-healthcheck"})
+    assert response.status_code==200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events=[event for event in response.text.split("\n\n") if event]
+    assert [event.splitlines()[0] for event in events]==["event: result","event: result","event: end"]
+    assert json.loads(events[0].splitlines()[1].removeprefix("data: "))["result"]["synonym"]=="Fast API"
+
+def test_healthcheck_stream_with_deadline_reports_unknown(mock_load_health_check_json_schema,mock_slow_tcp):
+    response=client.get("/healthcheck/stream",params={"deadline_ms":100})
+    statuses={message["result"]["synonym"]:message["result"]["status"] for message in map(json.loads,response.text.splitlines())}
+    assert statuses=={"Fast API":"Success","Slow API":"Unknown"}
+
+@pytest.mark.parametrize("headers",[({}),({"Authorization": "Bearer wrong-key"})])
+def test_healthcheck_stream_of_a_category_requires_admin(mock_load_health_check_json_schema,mock_slow_tcp,headers):
+    response=client.get("/healthcheck/stream",params={"scope":"webservices"},headers=headers)
+    # Same as the category endpoints, only the full scope is public
+    assert response.status_code==403
+
+def test_healthcheck_stream_rejects_unknown_scope():
+    response=client.get("/healthcheck/stream",params={"scope":"printers"})
+    assert response.status_code==422
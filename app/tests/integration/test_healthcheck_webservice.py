@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.schema.tcp_probe_result import TcpProbeResult
 
 client=TestClient(app)
 
@@ -59,7 +60,8 @@ def test_successful_webservice_healthcheck(mock_load_health_check_json_schema):
     # As healthcheck config contains 4 webservices the response should include 4 statuses
     assert len(webservices_status)==4
     # Make sure that all responses are webservice healthcheck status schema
-    webservice_healthcheck_status_keys={'synonym', 'status', 'hostname', 'port', 'protocol', 'can_tcp'}
+    webservice_healthcheck_status_keys={'synonym', 'status', 'hostname', 'port', 'protocol', 'can_tcp', 'is_short_circuited', 'status_code', 'is_body_matched',
+                                       'failed_stage', 'dns_lookup_seconds', 'connect_seconds'}
     assert all(set(item.keys())== (webservice_healthcheck_status_keys) for item in webservices_status)
 
 def test_failed_public_access_to_webservice_healthcheck(mock_load_health_check_json_schema):
@@ -80,4 +82,34 @@ def test_failed_wrong_admin_password_to_webservice_healthcheck(mock_load_health_
     # Call /healthcheck/webservices with wrong admin password
     response=client.get("/healthcheck/webservices",headers={"Authorization": f"Bearer {admin_password}"})
     # Make sure that the response is 403 Unauthorized
-    assert response.status_code==403
\ No newline at end of file
+    assert response.status_code==403
+
+def test_open_circuit_breaker_short_circuits_dead_webservices(mock_load_health_check_json_schema,monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_ENABLED","true")
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_THRESHOLD","2")
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_RESET_SECONDS","60")
+    probes=[]
+    def dead_tcp(hostname,port,timeout=0):
+        probes.append(hostname)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=False)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",dead_tcp)
+    responses=[client.get("/healthcheck/webservices",headers={"Authorization": "Bearer rd-healthcheck"}).json() for _ in range(3)]
+    # Two fresh probes per target open the circuits, the third call does not probe
+    assert len(probes)==8
+    assert all(item["is_short_circuited"] is False and item["status"]=="Failure" for item in responses[1])
+    assert all(item["is_short_circuited"] is True and item["status"]=="Failure" for item in responses[2])
+
+def test_http_webservice_healthcheck_checks_status_code_and_body(http_server,monkeypatch):
+    port=http_server.server_address[1]
+    def get_config_dict(config_file_location):
+        return [{"check_type": "webservice", "details": {"synonym": "Healthy API", "hostname": "127.0.0.1", "port": port,
+                                                         "protocol": "http", "path": "/health", "expected_body": "ok"}},
+                {"check_type": "webservice", "details": {"synonym": "Broken API", "hostname": "127.0.0.1", "port": port,
+                                                         "protocol": "http", "path": "/broken"}}]
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",get_config_dict)
+    response=client.get("/healthcheck/webservices",headers={"Authorization": "Bearer rd-healthcheck"})
+    statuses={item["synonym"]:item for item in response.json()}
+    assert (statuses["Healthy API"]["status"],statuses["Healthy API"]["status_code"],statuses["Healthy API"]["is_body_matched"])==("Success",200,True)
+    assert (statuses["Broken API"]["status"],statuses["Broken API"]["status_code"],statuses["Broken API"]["is_body_matched"])==("Failure",503,None)
+    # Checks run concurrently so the requests may arrive in any order
+    assert sorted(http_server.paths)==["/broken","/health"]
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from app.main import app
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.controller.healthcheck_push_channel import HealthcheckPushChannel
+from app.schema.healthcheck_status import WebServiceHealthcheckStatus
+from app.schema.tcp_probe_result import TcpProbeResult
+
+client=TestClient(app)
+
+@pytest.fixture
+def mock_load_health_check_json_schema(monkeypatch):
+    def get_config_dict(config_file_location):
+        return [
+                {
+                    "check_type": "webservice",
+                    "details": {
+                    "synonym": "First API",
+                    "hostname": "first.example.com",
+                    "port": 443,
+                    "protocol": "https"
+                    }
+                }
+                ]
+
+    monkeypatch.setattr("app.controller.external_file_processing.ExternalFileProcessing.load_health_check_json_schema",
+                        get_config_dict)
+
+@pytest.fixture
+def mock_tcp(monkeypatch):
+    calls=[]
+    def can_establish_tcp_mock(hostname,port,timeout=0):
+        calls.append(hostname)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",
+                        can_establish_tcp_mock)
+    return calls
+
+def test_websocket_pushes_current_results_then_changes(mock_load_health_check_json_schema,mock_tcp):
+    with (client.websocket_connect("/healthcheck/ws",headers={"Authorization": "Bearer rd-healthcheck"}) as first_dashboard,
+          client.websocket_connect("/healthcheck/ws?token=rd-healthcheck") as second_dashboard):
+        # Both dashboards receive the current results
+        for dashboard in (first_dashboard,second_dashboard):
+            message=dashboard.receive_json()
+            assert [(change["category"],change["synonym"],change["result"]["status"]) for change in message["changes"]]==[
+                ("webservices","First API","Success")]
+        # Nothing was checked yet so the first connection ran the checks once, the second one reused the results
+        assert mock_tcp==["first.example.com"]
+        assert HealthcheckPushChannel.get_connections()==2
+        # A published change is pushed to every dashboard without running any check
+        HealthcheckResultStore.publish("webservices",[WebServiceHealthcheckStatus(synonym="First API", hostname="first.example.com",
+                                                                                   port=443, protocol="https", can_tcp=False)])
+        for dashboard in (first_dashboard,second_dashboard):
+            message=dashboard.receive_json()
+            assert [(change["synonym"],change["change"],change["result"]["status"]) for change in message["changes"]]==[
+                ("First API","changed","Failure")]
+            assert message["version"]==HealthcheckResultStore.get_version()
+        assert mock_tcp==["first.example.com"]
+    # Disconnected dashboards are unsubscribed
+    assert HealthcheckPushChannel.get_connections()==0
+    assert HealthcheckResultStore._subscribers==[]
+
+@pytest.mark.parametrize("path,headers",[("/healthcheck/ws",{}),("/healthcheck/ws?token=wrong-key",{}),
+                                         ("/healthcheck/ws",{"Authorization": "Bearer wrong-key"})])
+def test_websocket_requires_admin(mock_load_health_check_json_schema,mock_tcp,path,headers):
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with client.websocket_connect(path,headers=headers):
+            pass
+    assert disconnect.value.code==1008
+    # Rejected clients never trigger a check
+    assert mock_tcp==[]
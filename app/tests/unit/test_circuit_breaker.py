@@ -0,0 +1,48 @@
+import pytest
+from app.controller.circuit_breaker import CircuitBreaker
+
+TARGET=("blackholed.example",443)
+
+@pytest.fixture(autouse=True)
+def circuit_breaker_settings(monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_THRESHOLD","3")
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_RESET_SECONDS","5")
+    monkeypatch.setenv("HEALTH_CHECK_CIRCUIT_BREAKER_MAX_RESET_SECONDS","15")
+
+def _fail(times,now=0):
+    for _ in range(times):
+        assert CircuitBreaker.allow(TARGET,now)
+        CircuitBreaker.record(TARGET,False,now)
+
+def test_circuit_opens_after_consecutive_failures():
+    _fail(2)
+    assert CircuitBreaker.get_state(TARGET,0)==CircuitBreaker.CLOSED
+    _fail(1)
+    assert CircuitBreaker.get_state(TARGET,0)==CircuitBreaker.OPEN
+    assert CircuitBreaker.allow(TARGET,4) is False
+
+def test_success_resets_the_failure_count():
+    _fail(2)
+    CircuitBreaker.record(TARGET,True,0)
+    _fail(2)
+    assert CircuitBreaker.get_state(TARGET,0)==CircuitBreaker.CLOSED
+
+def test_single_trial_probe_when_half_open():
+    _fail(3)
+    assert CircuitBreaker.get_state(TARGET,5)==CircuitBreaker.HALF_OPEN
+    assert CircuitBreaker.allow(TARGET,5) is True
+    # Other callers keep receiving the failure while the trial probe runs
+    assert CircuitBreaker.allow(TARGET,5) is False
+    CircuitBreaker.record(TARGET,True,5)
+    assert CircuitBreaker.get_state(TARGET,5)==CircuitBreaker.CLOSED
+    assert CircuitBreaker.allow(TARGET,5) is True
+
+def test_failed_trial_probes_back_off_up_to_the_maximum():
+    _fail(3)
+    # Each failed trial doubles the reset time, capped at the maximum
+    for reset_seconds in (10,15,15):
+        now=CircuitBreaker._states[TARGET].opened_until
+        assert CircuitBreaker.allow(TARGET,now)
+        CircuitBreaker.record(TARGET,False,now)
+        assert CircuitBreaker._states[TARGET].opened_until==now+reset_seconds
+        assert CircuitBreaker.allow(TARGET,now+reset_seconds-1) is False
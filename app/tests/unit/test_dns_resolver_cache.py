@@ -0,0 +1,92 @@
+import socket
+import time
+import pytest
+from app.controller.dns_resolver_cache import DnsResolverCache
+from app.controller.healthcheck_processing import HealthCheckProcessing
+from app.controller.tcp_based_connection import TcpBasedConnection
+from app.schema.healthcheck_config import AllHealthcheckConfig
+
+@pytest.fixture(autouse=True)
+def clear_dns_cache():
+    DnsResolverCache.clear()
+    yield
+    DnsResolverCache.clear()
+
+@pytest.fixture
+def fake_resolver(monkeypatch):
+    lookups=[]
+    answers={"db.internal":"10.0.0.5"}
+    def getaddrinfo(hostname,port,type=0):
+        lookups.append(hostname)
+        if hostname not in answers:
+            raise socket.gaierror("Name or service not known")
+        return [(socket.AF_INET,socket.SOCK_STREAM,6,"",(answers[hostname],port))]
+    monkeypatch.setattr(socket,"getaddrinfo",getaddrinfo)
+    return lookups,answers
+
+def test_resolution_is_cached_within_ttl(fake_resolver):
+    lookups,_=fake_resolver
+    assert DnsResolverCache.resolve("db.internal",5432)==[("10.0.0.5",5432)]
+    assert DnsResolverCache.resolve("db.internal",5432)==[("10.0.0.5",5432)]
+    assert lookups==["db.internal"]
+
+def test_failed_resolution_is_negatively_cached(fake_resolver):
+    lookups,_=fake_resolver
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            DnsResolverCache.resolve("missing.internal",5432)
+    assert lookups==["missing.internal"]
+
+def test_expired_entry_is_served_stale_and_refreshed_in_background(fake_resolver,monkeypatch):
+    lookups,answers=fake_resolver
+    monkeypatch.setenv("HEALTH_CHECK_DNS_TTL","0")
+    DnsResolverCache.resolve("db.internal",5432)
+    answers["db.internal"]="10.0.0.6"
+    # The stale address is returned right away while the refresh runs
+    assert DnsResolverCache.resolve("db.internal",5432)==[("10.0.0.5",5432)]
+    deadline=time.monotonic()+2
+    while len(lookups)<2 and time.monotonic()<deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert DnsResolverCache._entries[("db.internal",5432)].addresses==[("10.0.0.6",5432)]
+
+def test_failed_background_refresh_keeps_the_stale_addresses(fake_resolver,monkeypatch):
+    _,answers=fake_resolver
+    monkeypatch.setenv("HEALTH_CHECK_DNS_TTL","0")
+    monkeypatch.setenv("HEALTH_CHECK_DNS_NEGATIVE_TTL","30")
+    DnsResolverCache.resolve("db.internal",5432)
+    del answers["db.internal"]
+    # Refresh in the calling thread to simulate a transient resolver error
+    DnsResolverCache._refresh("db.internal",5432)
+    entry=DnsResolverCache._entries[("db.internal",5432)]
+    assert (entry.addresses,entry.error)==([("10.0.0.5",5432)],None)
+    # The stale addresses keep being served and the refresh is retried after the negative TTL
+    assert DnsResolverCache.resolve("db.internal",5432)==[("10.0.0.5",5432)]
+    assert entry.expires_at>time.monotonic()+20
+
+def test_ip_addresses_bypass_the_resolver(fake_resolver):
+    lookups,_=fake_resolver
+    assert DnsResolverCache.resolve("127.0.0.1",80)==[("127.0.0.1",80)]
+    assert DnsResolverCache.get_cached("::1",80)==[("::1",80)]
+    assert lookups==[]
+
+def test_probe_reports_dns_failure_separately(fake_resolver):
+    result=TcpBasedConnection.probe_tcp_connection("missing.internal",5432)
+    assert result.is_connected is False
+    assert result.failed_stage=="dns"
+    assert result.connect_seconds==0.0
+
+def test_database_check_reports_dns_failure(fake_resolver):
+    healthcheck_config=AllHealthcheckConfig([{"check_type":"database","details":{"synonym":"DB","hostname":"missing.internal","port":5432,"database_type":"postgresql"}}])
+    status=HealthCheckProcessing.databases_health_check(healthcheck_config)[0]
+    # A hostname that cannot be resolved is told apart from a database that does not accept connections
+    assert status.status=="Failure" and status.failed_stage=="dns"
+    assert status.connect_seconds==0.0
+
+def test_cache_drops_the_least_recently_resolved_entries(fake_resolver,monkeypatch):
+    _,answers=fake_resolver
+    monkeypatch.setenv("HEALTH_CHECK_DNS_CACHE_SIZE","2")
+    answers.update({"first.internal":"10.0.0.1","second.internal":"10.0.0.2"})
+    for hostname in ["first.internal","second.internal","db.internal"]:
+        DnsResolverCache.resolve(hostname,5432)
+    assert list(DnsResolverCache._entries)==[("second.internal",5432),("db.internal",5432)]
@@ -0,0 +1,96 @@
+import dataclasses
+import time
+import pytest
+from app.schema.healthcheck_config import WebserviceHealthcheckConfig,DatabaseHealthcheckConfig,MountPointHealthcheckConfig,AllHealthcheckConfig
+
+def test_repeated_strings_are_interned():
+    # Build the strings at runtime so they are distinct objects like values decoded from the configuration file
+    first=WebserviceHealthcheckConfig(synonym="First", hostname="".join(["api.", "example.com"]), port=443, protocol="".join(["ht", "tps"]))
+    second=WebserviceHealthcheckConfig(synonym="Second", hostname="".join(["api.", "example.com"]), port=443, protocol="".join(["ht", "tps"]))
+    assert first.hostname is second.hostname
+    assert first.protocol is second.protocol
+
+def test_configs_are_slotted_and_frozen():
+    database=DatabaseHealthcheckConfig(synonym="DB", hostname="localhost", port=5432, database_type="postgresql")
+    assert not hasattr(database,"__dict__")
+    assert "psycopg2" in database.database_drivers
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        database.port=5433
+
+@pytest.mark.parametrize(
+    "mount_point,is_valid",
+    [
+        ("/",True),
+        ("/home",True),
+        ("/mnt/data",True),
+        ("/mnt/data/",True),
+        ("/mnt/my-disk_1.d",True),
+        ("mnt/data",False),
+        ("",False),
+        ("//",False),
+        ("/mnt//data",False),
+        ("/mnt/da ta",False),
+        ("/mnt/data\n",False)
+    ]
+)
+def test_mount_point_validation(mount_point,is_valid):
+    assert MountPointHealthcheckConfig._is_valid_mount_point(mount_point)==is_valid
+
+@pytest.mark.parametrize(
+    "mount_point",
+    [
+        ("/"+"a"*10000+"!"),
+        ("/"+"a/"*10000+"!")
+    ]
+)
+def test_adversarial_mount_point_is_rejected_in_linear_time(mount_point):
+    started=time.perf_counter()
+    assert not MountPointHealthcheckConfig._is_valid_mount_point(mount_point)
+    assert time.perf_counter()-started<0.1
+
+@pytest.mark.parametrize(
+    "hostname,is_valid",
+    [
+        ("localhost",True),
+        ("api-1.example.com",True),
+        ("a"*63+".com",True),
+        ("a"*64+".com",False),
+        ("-api.example.com",False),
+        ("api-.example.com",False),
+        ("api..example.com",False),
+        ("api_1.example.com",False),
+        ("example.com\n",False)
+    ]
+)
+def test_hostname_validation(hostname,is_valid):
+    webservice=WebserviceHealthcheckConfig(synonym="API", hostname="localhost", port=443, protocol="https")
+    assert webservice._is_valid_hostname(hostname)==is_valid
+
+def test_entry_with_non_string_value_is_skipped():
+    all_config=AllHealthcheckConfig([
+        {"check_type": "webservice", "details": {"synonym": "Bad", "hostname": "localhost", "port": 443, "protocol": 1}},
+        {"check_type": "database", "details": {"synonym": "Bad", "hostname": "localhost", "port": 5432, "database_type": None}},
+        {"check_type": "webservice", "details": {"synonym": "Good", "hostname": "localhost", "port": 443, "protocol": "https"}}
+    ])
+    assert [item.synonym for item in all_config.webservices]==["Good"]
+    assert all_config.databases==[]
+
+@pytest.mark.parametrize(
+    "path,is_valid",
+    [
+        (None,True),
+        ("/",True),
+        ("/health?verbose=1",True),
+        ("health",False),
+        ("",False),
+        ("/health check",False),
+        ("/health\r\nHost: evil",False)
+    ]
+)
+def test_webservice_path_validation(path,is_valid):
+    if is_valid:
+        webservice=WebserviceHealthcheckConfig(synonym="API", hostname="localhost", port=443, protocol="https", path=path)
+        assert webservice.is_http_check()==(path is not None)
+    else:
+        with pytest.raises(ValueError):
+            WebserviceHealthcheckConfig(synonym="API", hostname="localhost", port=443, protocol="https", path=path)
@@ -0,0 +1,63 @@
+import json
+import os
+import pytest
+from app.controller.healthcheck_config_cache import HealthcheckConfigCache
+from app.controller.healthcheck_processing import HealthCheckProcessing
+
+def webservice(synonym,port=8080):
+    return {"check_type": "webservice", "details": {"synonym": synonym, "hostname": "localhost", "port": port, "protocol": "http"}}
+
+@pytest.fixture
+def config_file(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text(json.dumps([webservice("First API")]))
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_FILE",str(config_file))
+    return config_file
+
+def rewrite(config_file,content):
+    config_file.write_text(content)
+    # Make sure the modification time changes even on file systems with coarse timestamps
+    stat=os.stat(config_file)
+    os.utime(config_file,ns=(stat.st_atime_ns,stat.st_mtime_ns+1_000_000_000))
+
+def test_config_is_parsed_once_while_file_is_unchanged(config_file,monkeypatch):
+    reads=[]
+    read_config=HealthCheckProcessing._read_healthcheck_config
+    monkeypatch.setattr(HealthCheckProcessing,"_read_healthcheck_config",lambda: reads.append(1) or read_config())
+    first=HealthCheckProcessing._get_healthcheck_config()
+    second=HealthCheckProcessing._get_healthcheck_config()
+    assert first is second
+    assert len(reads)==1
+    assert [item.synonym for item in first.webservices]==["First API"]
+
+def test_config_is_reloaded_when_file_changes(config_file):
+    HealthCheckProcessing._get_healthcheck_config()
+    rewrite(config_file,json.dumps([webservice("First API"),webservice("Second API")]))
+    healthcheck_config=HealthCheckProcessing._get_healthcheck_config()
+    assert [item.synonym for item in healthcheck_config.webservices]==["First API","Second API"]
+
+@pytest.mark.parametrize("bad_content",[("[{\"check_type\": "),("{\"not\": \"a list\"}"),("[{\"check_type\": \"unknown\", \"details\": {}}]")])
+def test_bad_edit_keeps_last_good_config(config_file,bad_content):
+    last_good=HealthCheckProcessing._get_healthcheck_config()
+    rewrite(config_file,bad_content)
+    assert HealthCheckProcessing._get_healthcheck_config() is last_good
+
+def test_edit_without_any_valid_entry_keeps_last_good_config(config_file):
+    last_good=HealthCheckProcessing._get_healthcheck_config()
+    rewrite(config_file,json.dumps([webservice("Bad port",port=-1),webservice("Other bad port",port=70000)]))
+    assert HealthCheckProcessing._get_healthcheck_config() is last_good
+    report=HealthcheckConfigCache.get_report()
+    assert report.compiled_entries==1 and report.invalid_entries==[]
+
+def test_missing_file_returns_empty_config(tmp_path,monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_FILE",str(tmp_path/"missing.json"))
+    healthcheck_config=HealthCheckProcessing._get_healthcheck_config()
+    assert healthcheck_config.webservices==[] and healthcheck_config.mount_points==[]
+
+def test_skipped_entries_are_reported(config_file):
+    rewrite(config_file,json.dumps([webservice("First API"),webservice("First API"),webservice("Bad port",port=-1)]))
+    healthcheck_config=HealthCheckProcessing._get_healthcheck_config()
+    assert [item.synonym for item in healthcheck_config.webservices]==["First API"]
+    report=HealthcheckConfigCache.get_report()
+    assert [issue.index for issue in report.duplicate_entries]==[1]
+    assert [issue.index for issue in report.invalid_entries]==[2]
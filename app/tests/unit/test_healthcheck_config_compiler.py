@@ -0,0 +1,108 @@
+import json
+import pytest
+from app.controller.healthcheck_config_compiler import HealthcheckConfigCompiler
+
+def webservice(synonym,port=8080):
+    return {"check_type": "webservice", "details": {"synonym": synonym, "hostname": "localhost", "port": port, "protocol": "http"}}
+
+def mount_point(synonym,path="/"):
+    return {"check_type": "mount_point", "details": {"synonym": synonym, "mount_point": path, "threshold_percentage": 80}}
+
+def test_compile_builds_all_categories():
+    healthcheck_config,report=HealthcheckConfigCompiler.compile([webservice("API"),mount_point("Root")])
+    assert [item.synonym for item in healthcheck_config.webservices]==["API"]
+    assert [item.synonym for item in healthcheck_config.mount_points]==["Root"]
+    assert report.total_entries==2 and report.compiled_entries==2
+    assert report.issues==[] and not report.is_rejected
+
+def test_compile_keeps_first_of_duplicate_checks():
+    healthcheck_config,report=HealthcheckConfigCompiler.compile([webservice("API",80),webservice("API",81),mount_point("API")])
+    assert [item.port for item in healthcheck_config.webservices]==[80]
+    assert [item.synonym for item in healthcheck_config.mount_points]==["API"]
+    assert [(issue.index,issue.check_type,issue.synonym) for issue in report.duplicate_entries]==[(1,"webservice","API")]
+    assert not report.is_rejected
+
+def test_compile_reports_invalid_entries_instead_of_printing(capsys):
+    healthcheck_config,report=HealthcheckConfigCompiler.compile([webservice("API"),webservice("Bad port",port=70000),mount_point("Relative","mnt")])
+    assert [item.synonym for item in healthcheck_config.webservices]==["API"]
+    assert [(issue.index,issue.synonym) for issue in report.invalid_entries]==[(1,"Bad port"),(2,"Relative")]
+    assert all(issue.reason for issue in report.invalid_entries)
+    assert report.compiled_entries==1 and not report.is_rejected
+    assert capsys.readouterr().out==""
+
+@pytest.mark.parametrize("malformed",[["not an object"],[{"check_type": "webservice"}],[{"check_type": "unknown", "details": {}}],
+                                      [{"check_type": "webservice", "details": {"synonym": "API"}}]])
+def test_malformed_entry_rejects_the_configuration(malformed):
+    healthcheck_config,report=HealthcheckConfigCompiler.compile([webservice("API")]+malformed)
+    assert report.is_rejected
+    assert [issue.index for issue in report.malformed_entries]==[1]
+    assert healthcheck_config.webservices==[]
+
+def test_empty_configuration_is_rejected():
+    healthcheck_config,report=HealthcheckConfigCompiler.compile([])
+    assert report.is_rejected and healthcheck_config.webservices==[]
+
+def test_configuration_without_valid_entries_is_rejected():
+    _,report=HealthcheckConfigCompiler.compile([webservice("Bad port",port=70000)])
+    assert report.total_entries==1 and report.compiled_entries==0
+    assert report.is_rejected
+
+def test_compiled_config_cache_skips_reading_and_validation(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text(json.dumps([webservice("API"),webservice("API")]))
+    cache_file=tmp_path/"compiled.json"
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_COMPILED_CACHE",str(cache_file))
+    reads=[]
+    def read_config():
+        reads.append(1)
+        return json.loads(config_file.read_text())
+    first,first_report=HealthcheckConfigCompiler.compile_file(str(config_file),read_config)
+    assert cache_file.exists() and not first_report.from_cache
+    second,second_report=HealthcheckConfigCompiler.compile_file(str(config_file),read_config)
+    assert len(reads)==1
+    assert second==first and second_report.from_cache
+    assert [(issue.index,issue.synonym) for issue in second_report.duplicate_entries]==[(1,"API")]
+    # A different file content misses the cache and is compiled again
+    config_file.write_text(json.dumps([webservice("Other API")]))
+    third,_=HealthcheckConfigCompiler.compile_file(str(config_file),read_config)
+    assert len(reads)==2
+    assert [item.synonym for item in third.webservices]==["Other API"]
+
+def test_corrupt_compiled_config_cache_is_ignored(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text(json.dumps([webservice("API")]))
+    cache_file=tmp_path/"compiled.json"
+    cache_file.write_bytes(b"not json")
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_COMPILED_CACHE",str(cache_file))
+    healthcheck_config,report=HealthcheckConfigCompiler.compile_file(str(config_file),lambda: json.loads(config_file.read_text()))
+    assert [item.synonym for item in healthcheck_config.webservices]==["API"] and not report.from_cache
+
+def test_compiled_config_cache_entries_are_validated_again(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text(json.dumps([webservice("API")]))
+    cache_file=tmp_path/"compiled.json"
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_COMPILED_CACHE",str(cache_file))
+    read_config=lambda: json.loads(config_file.read_text())
+    HealthcheckConfigCompiler.compile_file(str(config_file),read_config)
+    cached=json.loads(cache_file.read_text())
+    assert cached["checks"][0]["details"]["synonym"]=="API"
+    # A cache file holding a check that does not pass validation is ignored
+    cached["checks"][0]["details"]["port"]=70000
+    cache_file.write_text(json.dumps(cached))
+    healthcheck_config,report=HealthcheckConfigCompiler.compile_file(str(config_file),read_config)
+    assert [item.port for item in healthcheck_config.webservices]==[8080] and not report.from_cache
+
+def test_compiled_config_cache_digest_covers_the_format_version(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text(json.dumps([webservice("API")]))
+    digest=HealthcheckConfigCompiler._get_file_digest(str(config_file))
+    monkeypatch.setattr(HealthcheckConfigCompiler,"CACHE_FORMAT_VERSION",HealthcheckConfigCompiler.CACHE_FORMAT_VERSION+1)
+    assert HealthcheckConfigCompiler._get_file_digest(str(config_file))!=digest
+
+def test_rejected_configuration_is_not_cached(tmp_path,monkeypatch):
+    config_file=tmp_path/"health_check_config.json"
+    config_file.write_text("[]")
+    cache_file=tmp_path/"compiled.json"
+    monkeypatch.setenv("HEALTH_CHECK_CONFIG_COMPILED_CACHE",str(cache_file))
+    HealthcheckConfigCompiler.compile_file(str(config_file),lambda: [])
+    assert not cache_file.exists()
@@ -0,0 +1,57 @@
+import pytest
+from app.controller.healthcheck_history import HealthcheckHistory,HealthcheckHistoryBuffer
+
+def record_results(statuses,synonym="Core Database",start=1000.0):
+    for offset,status in enumerate(statuses):
+        HealthcheckHistory.record("database",synonym,status,0.001*(offset+1),timestamp=start+offset)
+
+def test_results_are_returned_oldest_first():
+    record_results(["Success","Failure","Success"])
+    series=HealthcheckHistory.get_history(synonym="Core Database")
+    assert [(point.timestamp,point.status,point.latency_ms) for point in series[0].points]==[(1000.0,"Success",1.0),(1001.0,"Failure",2.0),(1002.0,"Success",3.0)]
+    assert series[0].points[0].usage_percentage is None
+
+def test_ring_buffer_keeps_the_latest_results(monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_SIZE","4")
+    record_results(["Success"]*5+["Failure"]*2)
+    points=HealthcheckHistory.get_history()[0].points
+    assert [point.timestamp for point in points]==[1003.0,1004.0,1005.0,1006.0]
+    # The time range is searched across the wrap around of the ring buffer
+    points=HealthcheckHistory.get_history(start=1004.5,end=1006.0)[0].points
+    assert [(point.timestamp,point.status) for point in points]==[(1005.0,"Failure"),(1006.0,"Failure")]
+
+def test_downsampling_keeps_the_worst_status():
+    record_results(["Success"]*9+["Failure"]+["Success"]*10)
+    points=HealthcheckHistory.get_history(max_points=4)[0].points
+    assert len(points)==4
+    assert [point.samples for point in points]==[5,5,5,5]
+    assert [point.status for point in points]==["Success","Failure","Success","Success"]
+    assert points[1].max_latency_ms==pytest.approx(10.0)
+
+def test_memory_is_bounded_by_the_number_of_checks(monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_SIZE","8")
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_MAX_CHECKS","2")
+    for synonym in ["First","Second","Third"]:
+        record_results(["Success"],synonym=synonym)
+    assert [series.synonym for series in HealthcheckHistory.get_history()]==["Second","Third"]
+    assert HealthcheckHistory.get_memory_bound_bytes()==2*8*HealthcheckHistoryBuffer.BYTES_PER_RESULT
+
+def test_usage_and_unknown_statuses_are_kept():
+    HealthcheckHistory.record("mount_point","Root","Warning",0.002,usage_percentage=77,timestamp=1000.0)
+    HealthcheckHistory.record("mount_point","Root","not a status",0.002,timestamp=1001.0)
+    points=HealthcheckHistory.get_history(check_type="mount_point")[0].points
+    assert [(point.status,point.usage_percentage) for point in points]==[("Warning",77),("Unknown",None)]
+
+def test_history_is_downsampled_without_holding_the_lock(monkeypatch):
+    record_results(["Success","Failure","Success"])
+    downsample=HealthcheckHistory._downsample
+    lock_states=[]
+    def checking_downsample(buffer,indices,max_points=None):
+        lock_states.append(HealthcheckHistory._lock.locked())
+        # Results recorded meanwhile do not change the copy being downsampled
+        HealthcheckHistory.record("database","Core Database","Error",0.5,timestamp=2000.0)
+        return downsample(buffer,indices,max_points)
+    monkeypatch.setattr(HealthcheckHistory,"_downsample",checking_downsample)
+    points=HealthcheckHistory.get_history(synonym="Core Database")[0].points
+    assert lock_states==[False]
+    assert [point.status for point in points]==["Success","Failure","Success"]
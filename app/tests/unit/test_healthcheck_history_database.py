@@ -0,0 +1,69 @@
+import sqlite3
+import pytest
+from app.controller.healthcheck_history import HealthcheckHistory
+from app.controller.healthcheck_history_database import HealthcheckHistoryDatabase
+
+@pytest.fixture
+def database_file(tmp_path,monkeypatch):
+    database_file=str(tmp_path/"history.sqlite3")
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_DATABASE",database_file)
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_DATABASE_FLUSH_MS","200")
+    # The results below are recorded in 1970, keep them away from the retention compaction
+    monkeypatch.setenv("HEALTH_CHECK_HISTORY_DATABASE_RETENTION_DAYS","100000")
+    assert HealthcheckHistoryDatabase.start()
+    yield database_file
+    HealthcheckHistoryDatabase.stop()
+
+def record_results(statuses,synonym="Core Database",start=1000.0):
+    for offset,status in enumerate(statuses):
+        HealthcheckHistory.record("database",synonym,status,0.001*(offset+1),timestamp=start+offset)
+
+def test_results_are_written_in_wal_mode_and_survive_a_restart(database_file):
+    record_results(["Success","Failure","Success"])
+    HealthcheckHistoryDatabase.flush()
+    with sqlite3.connect(database_file) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0]=="wal"
+    HealthcheckHistoryDatabase.stop()
+    HealthcheckHistory.clear()
+    assert HealthcheckHistoryDatabase.start()
+    points=HealthcheckHistory.get_history(synonym="Core Database")[0].points
+    assert [(point.timestamp,point.status,point.latency_ms) for point in points]==[(1000.0,"Success",1.0),(1001.0,"Failure",2.0),(1002.0,"Success",3.0)]
+
+def test_burst_of_results_is_committed_in_one_batch(database_file,monkeypatch):
+    batches=[]
+    write_batch=HealthcheckHistoryDatabase._write_batch
+    monkeypatch.setattr(HealthcheckHistoryDatabase,"_write_batch",lambda connection,check_ids,rows: batches.append(len(rows)) or write_batch(connection,check_ids,rows))
+    record_results(["Success"]*100)
+    HealthcheckHistoryDatabase.flush()
+    assert batches==[100]
+
+def test_database_downsampling_matches_the_ring_buffers(database_file):
+    record_results(["Success"]*9+["Failure"]+["Success"]*10)
+    HealthcheckHistory.record("database","Replica","Warning",0.001,timestamp=1000.0)
+    HealthcheckHistory.record("database","Replica","Failure",0.002,timestamp=1000.1)
+    HealthcheckHistory.record("database","Replica","Warning",0.003,timestamp=1010.0)
+    HealthcheckHistoryDatabase.flush()
+    for max_points in [None,4]:
+        from_memory=HealthcheckHistory.get_history(max_points=max_points,source="memory")
+        from_database=HealthcheckHistory.get_history(max_points=max_points,source="database")
+        assert [(series.synonym,[(point.timestamp,point.status,point.samples,point.max_latency_ms) for point in series.points]) for series in from_database]==\
+               [(series.synonym,[(point.timestamp,point.status,point.samples,point.max_latency_ms) for point in series.points]) for series in from_memory]
+    points=HealthcheckHistory.get_history(synonym="Core Database",start=1005,end=1010,source="database")[0].points
+    assert [point.timestamp for point in points]==[1005.0+offset for offset in range(6)]
+
+def test_compaction_deletes_results_older_than_the_retention(database_file):
+    record_results(["Success"]*5,start=1000.0)
+    record_results(["Failure"]*5,start=2000.0)
+    HealthcheckHistoryDatabase.flush()
+    connection=HealthcheckHistoryDatabase._connect(database_file)
+    try:
+        assert HealthcheckHistoryDatabase.compact(connection,before=1500.0)==5
+    finally:
+        connection.close()
+    points=HealthcheckHistory.get_history(source="database")[0].points
+    assert [point.status for point in points]==["Failure"]*5
+
+def test_results_are_not_queued_while_the_database_is_disabled():
+    HealthcheckHistory.record("database","Core Database","Success",0.001)
+    assert not HealthcheckHistoryDatabase.is_running()
+    assert HealthcheckHistoryDatabase._queue is None
@@ -0,0 +1,54 @@
+import pytest
+from app.controller.healthcheck_metrics import HealthcheckMetrics,Histogram,Counter
+from app.schema.healthcheck_config import AllHealthcheckConfig
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    HealthcheckMetrics.clear()
+    yield
+    HealthcheckMetrics.clear()
+
+def test_histogram_buckets_are_cumulative():
+    histogram=Histogram("test_seconds","Test histogram.",('synonym',),buckets=(0.1,1.0))
+    for value in (0.05,0.5,5):
+        histogram.observe(value,"api")
+    lines=histogram.render()
+    assert 'test_seconds_bucket{synonym="api",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{synonym="api",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{synonym="api",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{synonym="api"} 3' in lines
+
+def test_label_values_are_escaped():
+    counter=Counter("test_total","Test counter.",('synonym',))
+    counter.inc('say "hi"\\\n')
+    assert counter.render()[-1]=='test_total{synonym="say \\"hi\\"\\\\\\n"} 1'
+
+def test_render_reports_check_outcomes_and_in_flight():
+    HealthcheckMetrics.check_started()
+    HealthcheckMetrics.check_started()
+    HealthcheckMetrics.check_finished("First API","webservice","Success",0.02)
+    text=HealthcheckMetrics.render({'open_probe_sockets':0,'opened_probe_sockets_total':3,'closed_probe_sockets_total':3})
+    assert 'healthcheck_check_results_total{synonym="First API",check_type="webservice",status="Success"} 1' in text
+    assert 'healthcheck_check_duration_seconds_count{synonym="First API",check_type="webservice"} 1' in text
+    assert 'healthcheck_last_result_age_seconds{synonym="First API",check_type="webservice"}' in text
+    assert 'healthcheck_checks_in_flight 1' in text
+    assert 'healthcheck_probe_sockets_total{event="opened"} 3' in text
+
+def test_histogram_snapshot_is_a_copy():
+    histogram=Histogram("test_seconds","Test histogram.",('synonym',),buckets=(0.1,))
+    histogram.observe(0.05,"api")
+    snapshot=histogram.snapshot()
+    histogram.observe(0.05,"api")
+    assert snapshot=={("api",):([1,0],0.05,1)}
+
+def test_series_of_removed_checks_are_dropped():
+    for synonym,hostname in (("Kept API","kept.example.com"),("Removed API","removed.example.com")):
+        HealthcheckMetrics.check_started()
+        HealthcheckMetrics.check_finished(synonym,"webservice","Success",0.02)
+        HealthcheckMetrics.tcp_probe_finished(hostname,0.001,0.002,is_resolved=True)
+    healthcheck_config=AllHealthcheckConfig([{"check_type":"webservice","details":{"synonym":"Kept API","hostname":"kept.example.com","port":443,"protocol":"https"}}])
+    assert HealthcheckMetrics.retain_configured(healthcheck_config)==5
+    text=HealthcheckMetrics.render()
+    assert "Removed API" not in text and "removed.example.com" not in text
+    assert 'healthcheck_check_results_total{synonym="Kept API",check_type="webservice",status="Success"} 1' in text
+    assert 'healthcheck_tcp_connect_seconds_count{hostname="kept.example.com"} 1' in text
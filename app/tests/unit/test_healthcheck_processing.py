@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.controller.healthcheck_processing import HealthCheckProcessing
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.schema.healthcheck_config import AllHealthcheckConfig
+from app.schema.tcp_probe_result import TcpProbeResult
+
+@pytest.fixture
+def healthcheck_config():
+    return AllHealthcheckConfig([
+        {"check_type": "webservice", "details": {"synonym": f"API {index}", "hostname": "localhost", "port": 8000+index, "protocol": "http"}}
+        for index in range(5)
+    ]+[
+        {"check_type": "database", "details": {"synonym": f"DB {index}", "hostname": "localhost", "port": 5432+index, "database_type": "postgresql"}}
+        for index in range(5)
+    ])
+
+@pytest.fixture
+def mock_slow_tcp(monkeypatch):
+    def slow_tcp(hostname,port,time_out=1):
+        time.sleep(0.2)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=False)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",slow_tcp)
+
+def test_full_health_check_fans_out_all_checks(monkeypatch,healthcheck_config,mock_slow_tcp):
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: healthcheck_config)
+    started=time.perf_counter()
+    all_status=HealthCheckProcessing.full_health_check()
+    elapsed=time.perf_counter()-started
+    # Ten checks of 0.2s each should take about as long as a single one
+    assert elapsed<1
+    assert [item.synonym for item in all_status.webservices]==[f"API {index}" for index in range(5)]
+    assert [item.synonym for item in all_status.databases]==[f"DB {index}" for index in range(5)]
+
+def test_full_health_check_sequential_mode(monkeypatch,healthcheck_config,mock_slow_tcp):
+    monkeypatch.setenv("HEALTH_CHECK_CONCURRENT","false")
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: healthcheck_config)
+    started=time.perf_counter()
+    all_status=HealthCheckProcessing.full_health_check()
+    # Sequential mode runs the checks one after another
+    assert time.perf_counter()-started>=2
+    assert len(all_status.webservices)==5 and len(all_status.databases)==5
+
+def test_category_health_check_keeps_config_order(healthcheck_config,mock_slow_tcp):
+    webservices_status=HealthCheckProcessing.webservices_health_check(healthcheck_config)
+    assert [item.port for item in webservices_status]==[8000+index for index in range(5)]
+
+def test_concurrent_full_health_checks_are_coalesced(monkeypatch,healthcheck_config):
+    probes=[]
+    def slow_tcp(hostname,port,time_out=1):
+        probes.append((hostname,port))
+        time.sleep(0.2)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=False)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",slow_tcp)
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: healthcheck_config)
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        results=list(executor.map(lambda _: HealthCheckProcessing.full_health_check(),range(20)))
+    # Twenty concurrent callers trigger a single probe sweep of the ten targets
+    assert len(probes)==10
+    assert all(result==results[0] for result in results)
+
+def test_full_health_check_returns_partial_results_at_deadline(monkeypatch,healthcheck_config):
+    def tcp_with_one_hung_target(hostname,port,time_out=1):
+        if port==8004:
+            time.sleep(1.5)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",tcp_with_one_hung_target)
+    monkeypatch.setattr("app.controller.installed_package_index.InstalledPackageIndex.is_installed",lambda package: True)
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: healthcheck_config)
+    started=time.perf_counter()
+    all_status=HealthCheckProcessing.full_health_check(deadline_ms=300)
+    assert time.perf_counter()-started<1
+    statuses={item.synonym:item.status for item in all_status.webservices+all_status.databases}
+    # Only the hung target is unknown, finished checks are returned as they are
+    assert statuses.pop("API 4")=="Unknown"
+    assert set(statuses.values())=={"Success"}
+    assert next(item for item in all_status.webservices if item.synonym=="API 4").can_tcp is None
+
+def test_checks_queued_at_the_deadline_are_cancelled(monkeypatch,healthcheck_config):
+    probes=[]
+    def slow_tcp(hostname,port,time_out=1):
+        probes.append(port)
+        time.sleep(0.3)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",slow_tcp)
+    monkeypatch.setattr(HealthCheckProcessing,"_executor",ThreadPoolExecutor(max_workers=1))
+    HealthCheckProcessing.categories_health_check(["webservices"],healthcheck_config,deadline_ms=100)
+    time.sleep(0.5)
+    # Only the check that was running at the deadline finished, the queued ones never started
+    assert probes==[8000]
+
+def test_stream_health_check_yields_results_in_completion_order(monkeypatch,healthcheck_config):
+    def tcp_with_slow_first_target(hostname,port,time_out=1):
+        if port==8000:
+            time.sleep(0.3)
+        return TcpProbeResult(hostname=hostname,port=port,is_connected=True)
+    monkeypatch.setattr("app.controller.tcp_based_connection.TcpBasedConnection.probe_tcp_connection",tcp_with_slow_first_target)
+    monkeypatch.setattr("app.controller.installed_package_index.InstalledPackageIndex.is_installed",lambda package: True)
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: healthcheck_config)
+    streamed=[(category,status.synonym) for category,status in HealthCheckProcessing.stream_health_check()]
+    assert len(streamed)==10
+    # The slow check is configured first but streamed last
+    assert streamed[-1]==("webservices","API 0")
+    # Once streamed the results are stored in configuration order
+    assert [status.synonym for status in HealthcheckResultStore.get('webservices').result]==[f"API {index}" for index in range(5)]
@@ -0,0 +1,72 @@
+from dataclasses import replace
+from pydantic import TypeAdapter
+from app.controller.healthcheck_response_cache import HealthcheckResponseCache
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.schema.healthcheck_status import AllHealthcheckStatus,MountPointHealthcheckStatus,WebServiceHealthcheckStatus
+from app.schema.healthcheck_status import DatabaseHealthcheckStatus,RequirementsFileHealthcheckStatus
+
+def get_all_status()->AllHealthcheckStatus:
+    return AllHealthcheckStatus(
+        mount_points=[MountPointHealthcheckStatus(synonym="Root ünïcode", mount_point="/", is_mounted=True, current_usage=40,
+                                                  threshold_percentage=80, used_bytes=40, total_bytes=100)],
+        webservices=[WebServiceHealthcheckStatus(synonym="API", hostname="localhost", port=443, protocol="https", can_tcp=None)],
+        databases=[DatabaseHealthcheckStatus(synonym="DB", hostname="localhost", port=5432, database_type="postgresql", can_tcp=False)],
+        requirements_files=[RequirementsFileHealthcheckStatus(synonym="Reqs", requirements_file_path="requirements.txt",
+                                                              is_file_exists=True, are_all_packages_installed=True)]
+    )
+
+def test_encoded_body_matches_response_model_serialization():
+    all_status=get_all_status()
+    assert HealthcheckResponseCache.encode(all_status)==TypeAdapter(AllHealthcheckStatus).dump_json(all_status)
+    assert HealthcheckResponseCache.encode(all_status.databases)==TypeAdapter(list[DatabaseHealthcheckStatus]).dump_json(all_status.databases)
+
+def test_body_is_encoded_once_per_version():
+    all_status=get_all_status()
+    snapshot=HealthcheckResultStore.publish("webservices",all_status.webservices)
+    body=HealthcheckResponseCache.get_body("webservices",snapshot)
+    # The same snapshot version is served from the cache
+    assert HealthcheckResponseCache.get_body("webservices",snapshot) is body
+    # A new publish changes the version and the body is encoded again
+    new_snapshot=HealthcheckResultStore.publish("webservices",[replace(all_status.webservices[0],can_tcp=True)])
+    assert new_snapshot.version>snapshot.version
+    assert b'"can_tcp":true' in HealthcheckResponseCache.get_body("webservices",new_snapshot)
+
+def test_unchanged_results_keep_etag_and_last_modified():
+    all_status=get_all_status()
+    first=HealthcheckResponseCache.get_response("databases",HealthcheckResultStore.publish("databases",all_status.databases,checked_at=1000))
+    # Checked again later with the very same results
+    second=HealthcheckResponseCache.get_response("databases",HealthcheckResultStore.publish("databases",all_status.databases,checked_at=2000))
+    assert second.version>first.version
+    assert second.etag==first.etag
+    assert second.last_modified==1000
+    third=HealthcheckResponseCache.get_response("databases",HealthcheckResultStore.publish("databases",[replace(all_status.databases[0],can_tcp=True)],checked_at=3000))
+    assert third.etag!=first.etag
+    assert third.last_modified==3000
+
+def test_equal_results_of_a_new_version_are_not_encoded_again(monkeypatch):
+    all_status=get_all_status()
+    first=HealthcheckResponseCache.get_response("webservices",HealthcheckResultStore.publish("webservices",
+        [replace(all_status.webservices[0],can_tcp=True,connect_seconds=0.010)],checked_at=1000))
+    encode_calls=[]
+    monkeypatch.setattr(HealthcheckResponseCache,"encode",staticmethod(lambda result:encode_calls.append(result)))
+    # Checked again with only a different timing, as every live request does
+    second=HealthcheckResponseCache.get_response("webservices",HealthcheckResultStore.publish("webservices",
+        [replace(all_status.webservices[0],can_tcp=True,connect_seconds=0.020)],checked_at=2000))
+    assert encode_calls==[]
+    assert second.version>first.version
+    assert second.body is first.body
+    assert second.etag==first.etag
+    assert second.last_modified==1000
+
+def test_is_not_modified():
+    encoded_response=HealthcheckResponseCache.get_response("webservices",HealthcheckResultStore.publish("webservices",[],checked_at=1000))
+    assert HealthcheckResponseCache.is_not_modified(encoded_response,if_none_match=encoded_response.etag)
+    assert HealthcheckResponseCache.is_not_modified(encoded_response,if_none_match=f'"other", W/{encoded_response.etag}')
+    assert HealthcheckResponseCache.is_not_modified(encoded_response,if_none_match="*")
+    assert not HealthcheckResponseCache.is_not_modified(encoded_response,if_none_match='"other"')
+    assert HealthcheckResponseCache.is_not_modified(encoded_response,if_modified_since=encoded_response.last_modified_http)
+    assert not HealthcheckResponseCache.is_not_modified(encoded_response,if_modified_since="Thu, 01 Jan 1970 00:00:00 GMT")
+    assert not HealthcheckResponseCache.is_not_modified(encoded_response,if_modified_since="yesterday")
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not HealthcheckResponseCache.is_not_modified(encoded_response,if_none_match='"other"',if_modified_since=encoded_response.last_modified_http)
+    assert not HealthcheckResponseCache.is_not_modified(encoded_response)
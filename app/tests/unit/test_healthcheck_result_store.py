@@ -0,0 +1,43 @@
+import pytest
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.schema.healthcheck_status import WebServiceHealthcheckStatus
+
+def get_webservices(**can_tcp)->list[WebServiceHealthcheckStatus]:
+    return [WebServiceHealthcheckStatus(synonym=synonym, hostname="localhost", port=443, protocol="https", can_tcp=value)
+            for synonym, value in can_tcp.items()]
+
+def test_changes_only_include_flipped_statuses():
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True,second=True,third=True))
+    cursor=HealthcheckResultStore.get_version()
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True,second=False,third=True))
+    changes=HealthcheckResultStore.get_changes(cursor)
+    assert not changes.reset
+    assert changes.version==HealthcheckResultStore.get_version()
+    assert [(change.synonym,change.change,change.result.status) for change in changes.changes]==[("second","changed","Failure")]
+    # Nothing changed after the latest version
+    assert HealthcheckResultStore.get_changes(changes.version).changes==[]
+
+def test_changes_are_merged_per_check_and_report_removals():
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True,second=True))
+    cursor=HealthcheckResultStore.get_version()
+    HealthcheckResultStore.publish("webservices",get_webservices(first=False,second=True))
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True))
+    changes=HealthcheckResultStore.get_changes(cursor).changes
+    assert [(change.synonym,change.change) for change in changes]==[("first","changed"),("second","removed")]
+    assert changes[1].result is None
+
+def test_changes_reset_when_change_log_was_truncated(monkeypatch):
+    monkeypatch.setattr(HealthcheckResultStore,"_change_log",type(HealthcheckResultStore._change_log)(maxlen=2))
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True,second=True))
+    cursor=HealthcheckResultStore.get_version()
+    HealthcheckResultStore.publish("webservices",get_webservices(first=False,second=False))
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True,second=True))
+    # The first flips were dropped from the log, so the whole current state is returned
+    changes=HealthcheckResultStore.get_changes(cursor)
+    assert changes.reset
+    assert {(change.synonym,change.change) for change in changes.changes}=={("first","added"),("second","added")}
+    assert not HealthcheckResultStore.get_changes(cursor+1).reset
+
+def test_unknown_cursor_from_the_future_resets():
+    HealthcheckResultStore.publish("webservices",get_webservices(first=True))
+    assert HealthcheckResultStore.get_changes(HealthcheckResultStore.get_version()+10).reset
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.controller.healthcheck_processing import HealthCheckProcessing
+from app.controller.healthcheck_result_store import HealthcheckResultStore
+from app.controller.healthcheck_scheduler import AdaptiveCheckSchedule, HealthCheckScheduler
+from app.schema.healthcheck_config import AllHealthcheckConfig
+from app.schema.healthcheck_status import HealthcheckStatusEnum, WebServiceHealthcheckStatus
+
+@pytest.fixture
+def mock_categories_health_check(monkeypatch):
+    calls=[]
+    def categories_health_check(categories=None,healthcheck_config=None):
+        calls.append(list(categories))
+        return {category:[] for category in categories}
+    monkeypatch.setattr(HealthCheckProcessing,"categories_health_check",categories_health_check)
+    return calls
+
+def test_get_interval_uses_category_override(monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_INTERVAL","20")
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_MOUNT_POINTS_INTERVAL","5")
+    assert HealthCheckScheduler.get_interval("mount_points")==5
+    assert HealthCheckScheduler.get_interval("databases")==20
+
+def test_run_due_checks_runs_only_due_categories(mock_categories_health_check,monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_INTERVAL","60")
+    next_due={"databases":0.0,"webservices":time.monotonic()+60}
+    next_due=asyncio.run(HealthCheckScheduler.run_due_checks(next_due))
+    assert mock_categories_health_check==[["databases"]]
+    assert next_due["databases"]>time.monotonic()+50
+    assert HealthcheckResultStore.get("databases").result==[]
+    assert HealthcheckResultStore.get("webservices") is None
+
+def test_scheduler_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("HEALTH_CHECK_SCHEDULER_ENABLED",raising=False)
+    asyncio.run(HealthCheckScheduler.start())
+    assert HealthCheckScheduler.is_running() is False
+    assert HealthcheckResultStore.is_background_refreshed() is False
+
+def test_snapshot_is_served_while_scheduler_runs(mock_categories_health_check):
+    HealthcheckResultStore.publish_all({category:[] for category in HealthcheckResultStore.CATEGORIES},checked_at=time.time()-10)
+    HealthcheckResultStore.set_background_refresh(True)
+    snapshot=HealthCheckProcessing.health_check_snapshot("full")
+    # No check runs and the age reflects the stored check time
+    assert mock_categories_health_check==[]
+    assert snapshot.age_seconds>=10
+
+def _webservices_config(*synonyms):
+    return AllHealthcheckConfig([{"check_type":"webservice","details":{"synonym":synonym,"hostname":"localhost","port":80,"protocol":"http"}} for synonym in synonyms])
+
+def _webservice_status(synonym,can_tcp):
+    return WebServiceHealthcheckStatus(synonym=synonym,hostname="localhost",port=80,protocol="http",can_tcp=can_tcp)
+
+def _record(schedule,now,checked_at=None,**outcomes):
+    return schedule.record({"webservices":[_webservice_status(synonym,can_tcp) for synonym, can_tcp in outcomes.items()]},now,checked_at)[0]
+
+@pytest.fixture
+def schedule(monkeypatch):
+    monkeypatch.setenv("HEALTH_CHECK_SCHEDULER_INTERVAL","10")
+    return AdaptiveCheckSchedule(min_interval=5,max_interval=40,backoff=2,jitter=0)
+
+def test_adaptive_schedule_backs_off_stable_checks(schedule):
+    schedule.sync(_webservices_config("api"),0)
+    for _ in range(4):
+        _record(schedule,0,api=True)
+    # 10 doubled on every result, capped at the maximum interval
+    assert schedule.get_schedule("webservices","api").interval==40
+
+def test_adaptive_schedule_tightens_failing_and_flapping_checks(schedule):
+    schedule.sync(_webservices_config("failing","flapping"),0)
+    _record(schedule,0,failing=False,flapping=True)
+    assert schedule.get_schedule("webservices","failing").interval==5
+    assert schedule.get_schedule("webservices","flapping").interval==20
+    _record(schedule,0,flapping=False)
+    # A status change goes straight to the minimum interval
+    assert schedule.get_schedule("webservices","flapping").interval==5
+
+def test_adaptive_schedule_keeps_the_interval_of_stable_warnings(schedule):
+    schedule.sync(_webservices_config("warning"),0)
+    warning=SimpleNamespace(synonym="warning",status=HealthcheckStatusEnum.WARNING)
+    schedule.record({"webservices":[warning]},0)
+    schedule.record({"webservices":[warning]},0)
+    # Only failures and status changes tighten the interval
+    assert schedule.get_schedule("webservices","warning").interval==10
+
+def test_adaptive_schedule_pops_only_due_checks(schedule):
+    schedule.sync(_webservices_config("slow","fast"),0)
+    due_config, due_keys=schedule.pop_due(0)
+    assert [item.synonym for item in due_config.webservices]==["slow","fast"]
+    _record(schedule,0,slow=True,fast=False)
+    assert schedule.get_next_due(0)==5
+    due_config, due_keys=schedule.pop_due(6)
+    assert due_keys==[("webservices","fast")]
+    assert schedule.pop_due(6)[1]==[]
+
+def test_adaptive_schedule_merges_results_in_config_order(schedule):
+    schedule.sync(_webservices_config("first","second"),0)
+    _record(schedule,0,first=True,second=True)
+    merged=_record(schedule,25,second=False)
+    assert [(status.synonym,str(status.status)) for status in merged["webservices"]]==[("first","Success"),("second","Failure")]
+
+def test_adaptive_schedule_follows_config_changes(schedule):
+    schedule.sync(_webservices_config("kept","removed"),0)
+    schedule.pop_due(0)
+    _record(schedule,0,kept=True,removed=True)
+    schedule.sync(_webservices_config("kept","added"),10)
+    assert schedule.get_schedule("webservices","removed") is None
+    # The new check is due at once, the kept one keeps its schedule
+    assert schedule.pop_due(10)[1]==[("webservices","added")]
+    assert [status.synonym for status in _record(schedule,10,added=True)["webservices"]]==["kept","added"]
+
+def test_adaptive_schedule_dates_categories_by_their_oldest_check(schedule):
+    schedule.sync(_webservices_config("first","second"),0)
+    merged,category_checked_at=schedule.record({"webservices":[_webservice_status("first",True),_webservice_status("second",True)]},0,100.0)
+    # The configuration change publishes every category once, categories without checks are current
+    assert set(merged)==set(HealthcheckResultStore.CATEGORIES)
+    assert category_checked_at["webservices"]==100.0 and category_checked_at["databases"]==100.0
+    merged,category_checked_at=schedule.record({"webservices":[_webservice_status("second",True)]},20,120.0)
+    # Only the category of the due check is published, dated by the check that ran longest ago
+    assert list(merged)==["webservices"] and category_checked_at=={"webservices":100.0}
+
+def test_run_adaptive_checks_runs_due_checks_only(monkeypatch):
+    calls=[]
+    def categories_health_check(categories=None,healthcheck_config=None):
+        calls.append([item.synonym for item in healthcheck_config.webservices])
+        return {"webservices":[_webservice_status(item.synonym,True) for item in healthcheck_config.webservices]}
+    config=_webservices_config("api")
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: config)
+    monkeypatch.setattr(HealthCheckProcessing,"categories_health_check",categories_health_check)
+    schedule=AdaptiveCheckSchedule(min_interval=30,max_interval=60,jitter=0)
+    asyncio.run(HealthCheckScheduler.run_adaptive_checks(schedule))
+    next_due=asyncio.run(HealthCheckScheduler.run_adaptive_checks(schedule))
+    assert calls==[["api"]]
+    assert next_due>time.monotonic()+50
+    assert [status.synonym for status in HealthcheckResultStore.get("webservices").result]==["api"]
+
+def test_run_adaptive_checks_publishes_removed_and_empty_categories(monkeypatch):
+    def categories_health_check(categories=None,healthcheck_config=None):
+        return {"webservices":[_webservice_status(item.synonym,True) for item in healthcheck_config.webservices]}
+    config={"value":_webservices_config("W")}
+    monkeypatch.setattr(HealthCheckProcessing,"_get_healthcheck_config",lambda: config["value"])
+    monkeypatch.setattr(HealthCheckProcessing,"categories_health_check",categories_health_check)
+    schedule=AdaptiveCheckSchedule(min_interval=30,max_interval=60,jitter=0)
+    asyncio.run(HealthCheckScheduler.run_adaptive_checks(schedule))
+    # Categories without checks are published too, so the full snapshot is available
+    assert HealthcheckResultStore.get_full() is not None
+    assert HealthcheckResultStore.get("databases").result==[]
+    databases_version=HealthcheckResultStore.get("databases").version
+    asyncio.run(HealthCheckScheduler.run_adaptive_checks(schedule))
+    # Nothing is due and nothing changed, so nothing is published again
+    assert HealthcheckResultStore.get("databases").version==databases_version
+    config["value"]=AllHealthcheckConfig()
+    asyncio.run(HealthCheckScheduler.run_adaptive_checks(schedule))
+    # No check is due, the removed check must still stop being served
+    assert HealthcheckResultStore.get("webservices").result==[]
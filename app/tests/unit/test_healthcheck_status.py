@@ -0,0 +1,30 @@
+import dataclasses
+import json
+import pytest
+from app.schema.healthcheck_status import HealthcheckStatusEnum,WebServiceHealthcheckStatus,MountPointHealthcheckStatus
+from app.schema.healthcheck_status import DatabaseHealthcheckStatus,RequirementsFileHealthcheckStatus
+
+def test_status_is_stored_as_enum_that_behaves_like_its_value():
+    status=WebServiceHealthcheckStatus(synonym="API", hostname="localhost", port=443, protocol="https", can_tcp=True)
+    assert status.status is HealthcheckStatusEnum.SUCCESS
+    assert status.status=="Success"
+    assert {status.status}=={"Success"}
+    assert json.dumps(status.status)=='"Success"'
+
+def test_statuses_are_slotted_and_frozen():
+    status=WebServiceHealthcheckStatus(synonym="API", hostname="localhost", port=443, protocol="https", can_tcp=True)
+    assert not hasattr(status,"__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        status.can_tcp=False
+
+@pytest.mark.parametrize(
+    "status",
+    [
+        (WebServiceHealthcheckStatus(synonym="API", hostname="localhost", port=443, protocol="https", can_tcp=None)),
+        (DatabaseHealthcheckStatus(synonym="DB", hostname="localhost", port=5432, database_type="postgresql", can_tcp=None)),
+        (MountPointHealthcheckStatus(synonym="Root", mount_point="/", is_mounted=None, current_usage=None, threshold_percentage=80)),
+        (RequirementsFileHealthcheckStatus(synonym="Reqs", requirements_file_path="requirements.txt", is_file_exists=None, are_all_packages_installed=None))
+    ]
+)
+def test_status_without_measurements_is_unknown(status):
+    assert status.status is HealthcheckStatusEnum.UNKNOWN
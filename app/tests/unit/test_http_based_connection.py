@@ -0,0 +1,54 @@
+import socket
+import pytest
+from app.controller.http_based_connection import HttpBasedConnection
+
+def _probe(server,path="/health",protocol="http",expected_body=None):
+    return HttpBasedConnection.probe_http_connection("127.0.0.1",server.server_address[1],protocol,path,expected_body)
+
+def test_probe_reports_status_code_and_body_match(http_server):
+    result=_probe(http_server,expected_body="ok")
+    assert result.is_connected is True
+    assert result.status_code==200
+    assert result.is_body_matched is True
+    result=_probe(http_server,path="/broken",expected_body="ok")
+    assert (result.status_code,result.is_body_matched)==(503,False)
+
+def test_repeated_probes_reuse_a_keep_alive_connection(http_server):
+    results=[_probe(http_server) for _ in range(5)]
+    assert http_server.connections==1
+    assert [result.is_connection_reused for result in results]==[False,True,True,True,True]
+
+def _idle_connections(server,protocol="http"):
+    return len(HttpBasedConnection._idle_connections.get((protocol,"127.0.0.1",server.server_address[1]),[]))
+
+@pytest.mark.parametrize("server_fixture,protocol",[("http_server","http"),("https_server","https")])
+def test_pooled_connection_closed_by_the_server_is_replaced(request,server_fixture,protocol):
+    server=request.getfixturevalue(server_fixture)
+    assert _probe(server,path="/close",protocol=protocol).status_code==200
+    # The response did not announce the close, so the connection went to the pool and the server dropped it afterwards
+    assert _idle_connections(server,protocol)==1
+    result=_probe(server,protocol=protocol)
+    # The stale pooled connection was taken first, the request is retried once on a new connection
+    assert result.status_code==200
+    assert result.is_connection_reused is False
+    assert server.connections==2
+    assert server.paths==["/close","/health"]
+    assert _idle_connections(server,protocol)==1
+
+def test_probe_of_closed_port_is_not_connected():
+    probe=socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+    probe.bind(("127.0.0.1",0))
+    port=probe.getsockname()[1]
+    probe.close()
+    result=HttpBasedConnection.probe_http_connection("127.0.0.1",port,"http","/health")
+    assert result.is_connected is False
+    assert result.status_code is None
+    assert result.error is not None
+
+def test_https_probes_resume_the_tls_session(https_server,monkeypatch):
+    # Without pooling every probe needs a new TLS connection
+    monkeypatch.setenv("HEALTH_CHECK_HTTP_POOL_SIZE","0")
+    results=[HttpBasedConnection.probe_http_connection("localhost",https_server.server_address[1],"https","/health") for _ in range(3)]
+    assert all(result.status_code==200 for result in results)
+    assert https_server.connections==3
+    assert [result.is_session_reused for result in results]==[False,True,True]
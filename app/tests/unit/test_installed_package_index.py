@@ -0,0 +1,41 @@
+import pytest
+from app.controller.installed_package_index import InstalledPackageIndex
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    InstalledPackageIndex.clear()
+    yield
+    InstalledPackageIndex.clear()
+
+@pytest.mark.parametrize(
+    "package,normalized",
+    [
+        ("FastAPI","fastapi"),
+        ("mysql_connector.python","mysql-connector-python"),
+        ("Typing__Extensions","typing-extensions"),
+        ("zope.interface","zope-interface")
+    ]
+)
+def test_normalize_package_name_follows_pep_503(package,normalized):
+    assert InstalledPackageIndex.normalize_package_name(package)==normalized
+
+@pytest.mark.parametrize("package",[("pytest"),("PyTest"),("typing_extensions"),("Typing-Extensions")])
+def test_is_installed_finds_installed_packages_in_any_spelling(package):
+    assert InstalledPackageIndex.is_installed(package) is True
+
+def test_is_installed_returns_false_for_missing_package():
+    assert InstalledPackageIndex.is_installed("surely-not-an-installed-package") is False
+    assert InstalledPackageIndex.is_installed("") is False
+
+def test_index_is_rebuilt_only_when_site_packages_change(monkeypatch):
+    builds=[]
+    monkeypatch.setattr(InstalledPackageIndex,"_build_index",lambda: builds.append(1) or frozenset({"pytest"}))
+    fingerprint=[(("/site-packages",1),)]
+    monkeypatch.setattr(InstalledPackageIndex,"_get_fingerprint",lambda: fingerprint[0])
+    InstalledPackageIndex.get_installed_packages()
+    InstalledPackageIndex.get_installed_packages()
+    assert len(builds)==1
+    # A changed modification time triggers a rebuild
+    fingerprint[0]=(("/site-packages",2),)
+    InstalledPackageIndex.get_installed_packages()
+    assert len(builds)==2
@@ -0,0 +1,47 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.controller.single_flight import SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    single_flight=SingleFlight()
+    executions=[]
+    def slow_function():
+        executions.append(1)
+        time.sleep(0.2)
+        return object()
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results=list(executor.map(lambda _: single_flight.do("full",slow_function),range(10)))
+    assert len(executions)==1
+    # Every caller receives the very same result
+    assert all(result is results[0] for result in results)
+    assert single_flight.in_flight()==0
+
+def test_different_keys_run_separately():
+    single_flight=SingleFlight()
+    assert single_flight.do("databases",lambda: "db")=="db"
+    assert single_flight.do("webservices",lambda: "ws")=="ws"
+
+def test_sequential_calls_run_again():
+    single_flight=SingleFlight()
+    counter=[]
+    single_flight.do("full",lambda: counter.append(1))
+    single_flight.do("full",lambda: counter.append(1))
+    assert len(counter)==2
+
+def test_exception_is_shared_with_waiting_callers():
+    single_flight=SingleFlight()
+    started=threading.Event()
+    def failing_function():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("probe failed")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader=executor.submit(single_flight.do,"full",failing_function)
+        started.wait()
+        follower=executor.submit(single_flight.do,"full",failing_function)
+        with pytest.raises(RuntimeError):
+            leader.result()
+        with pytest.raises(RuntimeError):
+            follower.result()
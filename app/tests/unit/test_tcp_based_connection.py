@@ -1,18 +1,119 @@
 # import required modules
+import asyncio
+import socket
+import struct
 import pytest
-from unittest.mock import patch
-from app.controller.tcp_based_connection import TcpBasedConnection
+from unittest.mock import patch, MagicMock
+from app.controller.tcp_based_connection import TcpBasedConnection,AsyncTcpProbeEngine
 
 def test_establish_tcp_connection_success():
 	# Mock socket.create_connection to simulate successful connection
-	with patch('socket.create_connection', return_value=True) as mock_conn:
+	probe_socket=MagicMock()
+	with patch('socket.create_connection', return_value=probe_socket) as mock_conn:
 		result = TcpBasedConnection.establish_tcp_connection('127.0.0.1', 80)
 		assert result is True
 		mock_conn.assert_called_once_with(('127.0.0.1', 80), timeout=1)
+		# The probe socket must be closed right after the connection is established
+		probe_socket.close.assert_called_once()
 
 def test_establish_tcp_connection_failure():
 	# Mock socket.create_connection to raise an exception
 	with patch('socket.create_connection', side_effect=Exception('Connection failed')) as mock_conn:
 		result = TcpBasedConnection.establish_tcp_connection('127.0.0.1', 80)
 		assert result is False
-		mock_conn.assert_called_once_with(('127.0.0.1', 80), timeout=1)
\ No newline at end of file
+		mock_conn.assert_called_once_with(('127.0.0.1', 80), timeout=1)
+
+@pytest.fixture
+def listening_port():
+	# Open a local listener that accepts TCP connections
+	server=socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+	server.bind(('127.0.0.1',0))
+	server.listen(128)
+	yield server.getsockname()[1]
+	server.close()
+
+@pytest.fixture
+def closed_port():
+	# Reserve a port and close it so nothing is listening on it
+	probe=socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+	probe.bind(('127.0.0.1',0))
+	port=probe.getsockname()[1]
+	probe.close()
+	return port
+
+def test_async_probe_engine_reports_open_and_closed_ports(listening_port,closed_port):
+	engine=AsyncTcpProbeEngine(max_concurrency=4)
+	results=engine.run([('127.0.0.1',listening_port),('127.0.0.1',closed_port),('127.0.0.1',listening_port)])
+	assert results==[True,False,True]
+
+def test_async_probe_engine_respects_concurrency_cap(monkeypatch):
+	in_flight=0
+	peak=0
+	async def fake_open_connection(hostname,port):
+		nonlocal in_flight,peak
+		in_flight+=1
+		peak=max(peak,in_flight)
+		await asyncio.sleep(0.01)
+		in_flight-=1
+		raise ConnectionRefusedError()
+	monkeypatch.setattr(asyncio,'open_connection',fake_open_connection)
+	engine=AsyncTcpProbeEngine(max_concurrency=5)
+	results=engine.run([('127.0.0.1',port) for port in range(1000,1050)])
+	assert results==[False]*50
+	assert peak==5
+
+def test_establish_tcp_connection_abortive_close_sets_linger():
+	probe_socket=MagicMock()
+	with patch('socket.create_connection', return_value=probe_socket):
+		assert TcpBasedConnection.establish_tcp_connection('127.0.0.1', 80, abortive_close=True) is True
+	probe_socket.setsockopt.assert_called_once_with(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+	probe_socket.close.assert_called_once()
+
+def test_probe_sockets_do_not_leak(listening_port):
+	before=TcpBasedConnection.get_probe_socket_counters()
+	for _ in range(20):
+		assert TcpBasedConnection.establish_tcp_connection('127.0.0.1', listening_port) is True
+	assert AsyncTcpProbeEngine(abortive_close=True).run([('127.0.0.1', listening_port)]*20)==[True]*20
+	after=TcpBasedConnection.get_probe_socket_counters()
+	assert after['open_probe_sockets']==before['open_probe_sockets']
+	assert after['opened_probe_sockets_total']-before['opened_probe_sockets_total']==40
+	assert after['closed_probe_sockets_total']-before['closed_probe_sockets_total']==40
+
+def test_probe_socket_is_counted_while_connecting():
+	during_connect=[]
+	def hanging_connect(address,timeout):
+		during_connect.append(TcpBasedConnection.get_probe_socket_counters()['open_probe_sockets'])
+		raise TimeoutError('timed out')
+	before=TcpBasedConnection.get_probe_socket_counters()
+	with patch('socket.create_connection', side_effect=hanging_connect):
+		assert TcpBasedConnection.establish_tcp_connection('127.0.0.1', 80) is False
+	# The connect in flight is an open probe socket, and the failed connect closes it
+	assert during_connect==[before['open_probe_sockets']+1]
+	assert TcpBasedConnection.get_probe_socket_counters()['open_probe_sockets']==before['open_probe_sockets']
+
+def test_async_probe_engine_tries_every_resolved_address(monkeypatch,listening_port):
+	# The first address refuses the connection, the second one accepts it
+	monkeypatch.setattr('app.controller.dns_resolver_cache.DnsResolverCache.get_cached',
+						lambda hostname,port: [('127.0.0.2',port),('127.0.0.1',port)])
+	real_open_connection=asyncio.open_connection
+	async def open_connection(hostname,port):
+		if hostname=='127.0.0.2':
+			raise ConnectionRefusedError()
+		return await real_open_connection(hostname,port)
+	monkeypatch.setattr(asyncio,'open_connection',open_connection)
+	assert AsyncTcpProbeEngine().run([('multi-address.example',listening_port)])==[True]
+
+def test_cancelled_async_probe_releases_its_probe_socket(monkeypatch):
+	async def hanging_open_connection(hostname,port):
+		await asyncio.sleep(60)
+	monkeypatch.setattr(asyncio,'open_connection',hanging_open_connection)
+	before=TcpBasedConnection.get_probe_socket_counters()['open_probe_sockets']
+	async def cancel_while_connecting():
+		probe=asyncio.create_task(AsyncTcpProbeEngine(time_out=30).establish_tcp_connection('127.0.0.1',80))
+		await asyncio.sleep(0.05)
+		assert TcpBasedConnection.get_probe_socket_counters()['open_probe_sockets']==before+1
+		probe.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await probe
+	asyncio.run(cancel_while_connecting())
+	assert TcpBasedConnection.get_probe_socket_counters()['open_probe_sockets']==before
@@ -0,0 +1,41 @@
+import os
+import pytest
+from app.controller.terminal_processing import TerminalProcessing
+from app.schema.mount_point_usage import MountPointUsage
+
+class FakeStatvfs:
+    f_frsize=4096
+    f_blocks=1000
+    f_bfree=300
+    f_bavail=250
+
+def test_get_mount_point_usage_details_is_byte_accurate(monkeypatch):
+    monkeypatch.setattr(os,"statvfs",lambda mount_point: FakeStatvfs())
+    usage=TerminalProcessing.get_mount_point_usage_details("/data")
+    assert usage.total_bytes==1000*4096
+    assert usage.used_bytes==700*4096
+    assert usage.available_bytes==250*4096
+    # Same rounding as df: ceil(700*100/(700+250))
+    assert usage.usage_percentage==74
+    assert TerminalProcessing.get_mount_point_usages("/data")==74
+
+def test_get_mount_point_usage_details_reads_real_file_system(tmp_path):
+    usage=TerminalProcessing.get_mount_point_usage_details(str(tmp_path))
+    assert usage.total_bytes>=usage.used_bytes>=0
+    assert 0<=usage.usage_percentage<=100
+
+def test_collect_mount_points_usages_reads_each_mount_point_once(monkeypatch):
+    calls=[]
+    def fake_statvfs(mount_point):
+        calls.append(mount_point)
+        if mount_point=="/missing":
+            raise FileNotFoundError(mount_point)
+        return FakeStatvfs()
+    monkeypatch.setattr(os,"statvfs",fake_statvfs)
+    usages=TerminalProcessing.collect_mount_points_usages(["/","/missing","/"])
+    assert calls==["/","/missing"]
+    assert isinstance(usages["/"],MountPointUsage)
+    assert usages["/missing"] is None
+
+def test_usage_percentage_of_empty_file_system_is_zero():
+    assert MountPointUsage("/empty",0,0,0).usage_percentage==0
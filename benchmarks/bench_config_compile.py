@@ -0,0 +1,109 @@
+"""Benchmark compiling large health check configuration files.
+
+A configuration file with the requested number of entries is generated, with a share of duplicate entries.
+Three ways to load it are timed:
+    legacy    the former path, validating every entry structure in one pass then building AllHealthcheckConfig in another
+    compile   HealthcheckConfigCompiler.compile_file without the compiled config cache
+    cached    HealthcheckConfigCompiler.compile_file answered from the compiled config cache file
+
+Usage:
+    python -m benchmarks.bench_config_compile --sizes 10000,100000 --duplicate-ratio 0.1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from app.controller.external_file_processing import ExternalFileProcessing
+from app.controller.healthcheck_config_compiler import HealthcheckConfigCompiler
+from app.controller.healthcheck_foundation import HealthCheckFoundation
+from app.schema.healthcheck_config import AllHealthcheckConfig
+
+def build_entries(size:int,duplicate_ratio:float)->list[dict]:
+    """ Build the configuration entries, alternating webservices and databases over a few shared hosts.
+
+    Args:
+        size (int): The number of entries.
+        duplicate_ratio (float): The share of entries repeating the check type and synonym of an earlier entry.
+
+    Returns:
+        list[dict]: The configuration entries.
+    """
+    unique=max(1,int(size*(1-duplicate_ratio)))
+    entries=[]
+    for index in range(size):
+        number=index%unique
+        hostname=f"host-{number%50}.example.com"
+        if number%2:
+            entries.append({"check_type": "webservice", "details": {"synonym": f"API {number}", "hostname": hostname, "port": 443, "protocol": "https"}})
+        else:
+            entries.append({"check_type": "database", "details": {"synonym": f"DB {number}", "hostname": hostname, "port": 5432, "database_type": "postgresql"}})
+    return entries
+
+def legacy_load(config_file:str)->AllHealthcheckConfig:
+    """ Load the configuration file the way it was loaded before the compiler.
+
+    Args:
+        config_file (str): The path to the configuration file.
+
+    Returns:
+        AllHealthcheckConfig: The configuration, duplicates included.
+    """
+    entries=ExternalFileProcessing.load_health_check_json_schema(config_file)
+    if not all(HealthCheckFoundation.is_valid_health_check_type_element(entry) for entry in entries):
+        return AllHealthcheckConfig()
+    return AllHealthcheckConfig(entries)
+
+def measure(function)->float:
+    """ Measure how long a function takes.
+
+    Args:
+        function (callable): The function to call.
+
+    Returns:
+        float: Elapsed milliseconds.
+    """
+    started=time.perf_counter()
+    function()
+    return (time.perf_counter()-started)*1000
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark compiling large health check configuration files.")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma separated numbers of configuration entries.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="Share of duplicate entries.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed loads per mode and size, the fastest one is reported.")
+    arguments=parser.parse_args()
+    header=f"{'entries':>8} {'mode':<8} {'checks':>8} {'ms':>10}"
+    print(header)
+    print("-"*len(header))
+    with tempfile.TemporaryDirectory() as directory:
+        config_file=os.path.join(directory, "health_check_config.json")
+        cache_file=os.path.join(directory, "compiled.json")
+        read_config=lambda: ExternalFileProcessing.load_health_check_json_schema(config_file)
+        for size in [int(size) for size in arguments.sizes.split(",")]:
+            with open(config_file, "w") as file:
+                json.dump(build_entries(size, arguments.duplicate_ratio), file)
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            modes={
+                'legacy': (None, lambda: legacy_load(config_file)),
+                'compile': (None, lambda: HealthcheckConfigCompiler.compile_file(config_file, read_config)[0]),
+                'cached': (cache_file, lambda: HealthcheckConfigCompiler.compile_file(config_file, read_config)[0])
+            }
+            for mode, (mode_cache_file, load) in modes.items():
+                if mode_cache_file:
+                    os.environ['HEALTH_CHECK_CONFIG_COMPILED_CACHE']=mode_cache_file
+                    # Fill the cache before timing
+                    load()
+                else:
+                    os.environ.pop('HEALTH_CHECK_CONFIG_COMPILED_CACHE', None)
+                healthcheck_config=load()
+                checks=len(healthcheck_config.webservices)+len(healthcheck_config.databases)
+                row={'entries': size, 'mode': mode, 'checks': checks,
+                     'ms': round(min(measure(load) for _ in range(arguments.repeat)), 1)}
+                print(json.dumps(row), file=sys.stderr)
+                print(f"{row['entries']:>8} {row['mode']:<8} {row['checks']:>8} {row['ms']:>10}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the health check config validators on adversarial inputs.
+
+Each input is crafted to make a backtracking regular expression explore as many paths as possible before failing.
+The validators as shipped are compared with the nested quantifier pattern mount points used to be matched with.
+
+Usage:
+    python -m benchmarks.bench_config_validation --lengths 16,20,24,10000 --legacy-max-length 24
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from app.schema.healthcheck_config import MountPointHealthcheckConfig,WebserviceHealthcheckConfig
+
+# Former mount point pattern, its nested quantifier backtracks exponentially on a path that fails at its end
+LEGACY_MOUNT_POINT_PATTERN=re.compile(r'^/([\w.-]+/?)*$')
+
+def adversarial_inputs(length:int)->dict[str,str]:
+    """ Build the adversarial inputs of a length.
+
+    Args:
+        length (int): The number of characters before the failing end of each input.
+
+    Returns:
+        dict[str,str]: Input name mapped to the input.
+    """
+    return {
+        'mount_point_single_segment': "/"+"a"*length+"!",
+        'mount_point_many_segments': "/"+"a/"*(length//2)+"!",
+        'hostname_many_labels': "a."*(length//2)+"-",
+        'hostname_long_label': "a"*length+"-"
+    }
+
+def measure(function,value:str)->float:
+    """ Measure how long a validator takes on a value.
+
+    Args:
+        function (callable): The validator.
+        value (str): The value to validate.
+
+    Returns:
+        float: Elapsed milliseconds.
+    """
+    started=time.perf_counter()
+    function(value)
+    return (time.perf_counter()-started)*1000
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark the health check config validators on adversarial inputs.")
+    parser.add_argument("--lengths", default="16,20,24,1000,100000", help="Comma separated adversarial input lengths.")
+    parser.add_argument("--legacy-max-length", type=int, default=24,
+                        help="Longest input given to the legacy mount point pattern, its time doubles with every character.")
+    arguments=parser.parse_args()
+    webservice=WebserviceHealthcheckConfig(synonym="Benchmark", hostname="localhost", port=443, protocol="https")
+    validators={
+        'mount_point': MountPointHealthcheckConfig._is_valid_mount_point,
+        'hostname': webservice._is_valid_hostname,
+        'legacy_mount_point': LEGACY_MOUNT_POINT_PATTERN.match
+    }
+    header=f"{'length':>7} {'input':<28} {'validator':<20} {'ms':>12}"
+    print(header)
+    print("-"*len(header))
+    for length in [int(length) for length in arguments.lengths.split(",")]:
+        for input_name, value in adversarial_inputs(length).items():
+            for validator_name, validator in validators.items():
+                if not input_name.startswith(validator_name.removeprefix("legacy_")):
+                    continue
+                if validator_name.startswith("legacy_") and length>arguments.legacy_max_length:
+                    continue
+                row={'length': length, 'input': input_name, 'validator': validator_name, 'ms': round(measure(validator, value), 3)}
+                print(json.dumps(row), file=sys.stderr)
+                print(f"{row['length']:>7} {row['input']:<28} {row['validator']:<20} {row['ms']:>12}")
+
+if __name__=="__main__":
+    main()
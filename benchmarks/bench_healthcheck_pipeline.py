@@ -0,0 +1,179 @@
+"""Benchmark the health check pipeline end to end against local stand-in targets.
+
+Usage:
+    python -m benchmarks.bench_healthcheck_pipeline --sizes 10,100,1000,10000 --iterations 20
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks.standin_targets import StandInTargets
+
+def percentile(samples:list[float],percent:int)->float:
+    """ Get a percentile of the samples.
+
+    Args:
+        samples (list[float]): The measured samples.
+        percent (int): The percentile between 1 and 99.
+
+    Returns:
+        float: The percentile value, the only sample when there is a single one.
+    """
+    if len(samples)==1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent-1]
+
+def peak_rss_mb()->float:
+    """ Get the peak resident set size of the benchmark process.
+
+    Returns:
+        float: Peak RSS in megabytes.
+    """
+    peak=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak/1024/1024 if sys.platform=='darwin' else peak/1024
+
+def generate_config(size:int,ports:dict[str,list[int]],mix:dict[str,float])->list[dict]:
+    """ Generate a health check configuration pointing at the stand-in targets.
+
+    Args:
+        size (int): The number of checks to generate.
+        ports (dict[str,list[int]]): Ports of the accepting, blackholed and slow listeners.
+        mix (dict[str,float]): Share of the checks pointing at each kind of listener.
+
+    Returns:
+        list[dict]: The health check configuration.
+    """
+    config=[]
+    total_share=sum(mix.values())
+    assigned={kind:0 for kind in mix}
+    for index in range(size):
+        # Smooth weighted round robin so every size gets the requested mix interleaved
+        kind=max(mix, key=lambda kind: mix[kind]/total_share*(index+1)-assigned[kind])
+        assigned[kind]+=1
+        port=ports[kind][index%len(ports[kind])]
+        # Alternate check types within each kind so both probe categories see every kind. Slow targets only delay
+        # their HTTP answer, so they are always checked as webservices sending an HTTP request
+        if kind=="slow" or assigned[kind]%2==1:
+            config.append({"check_type": "webservice",
+                           "details": {"synonym": f"{kind} webservice {index}", "hostname": "127.0.0.1", "port": port, "protocol": "http",
+                                       "path": "/"}})
+        else:
+            config.append({"check_type": "database",
+                           "details": {"synonym": f"{kind} database {index}", "hostname": "127.0.0.1", "port": port, "database_type": "postgresql"}})
+    # Keep a share of cheap local checks so every category is exercised
+    config.append({"check_type": "mount_point", "details": {"synonym": "Root partition", "mount_point": "/", "threshold_percentage": 95}})
+    config.append({"check_type": "requirements", "details": {"synonym": "Requirements Files", "requirements_file_path": "requirements.txt"}})
+    return config
+
+def measure(function,iterations:int)->dict:
+    """ Call the function repeatedly and summarize its latency.
+
+    Args:
+        function (callable): The function to measure.
+        iterations (int): How many times to call the function.
+
+    Returns:
+        dict: p50, p95 and p99 latency in milliseconds and calls per second.
+    """
+    samples=[]
+    started=time.perf_counter()
+    for _ in range(iterations):
+        call_started=time.perf_counter()
+        function()
+        samples.append((time.perf_counter()-call_started)*1000)
+    elapsed=time.perf_counter()-started
+    return {
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "calls_per_second": round(iterations/elapsed, 2)
+    }
+
+def run_benchmark(sizes:list[int],iterations:int,mix:dict[str,float],slow_delay:float)->list[dict]:
+    """ Run the benchmark for every configuration size.
+
+    Args:
+        sizes (list[int]): The numbers of checks to benchmark.
+        iterations (int): Calls per measured target and size.
+        mix (dict[str,float]): Share of the checks pointing at each kind of listener.
+        slow_delay (float): Seconds slow listeners wait before answering.
+
+    Returns:
+        list[dict]: One result row per size and measured target.
+    """
+    # Imported here so HEALTH_CHECK_* variables set on the command line apply
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.controller.healthcheck_processing import HealthCheckProcessing
+    admin_headers={"Authorization": f"Bearer {os.getenv('ADMIN_KEY', 'rd-healthcheck')}"}
+    # Each measured target with the check types it runs
+    targets={
+        "full_health_check": (lambda client: HealthCheckProcessing.full_health_check(), None),
+        "GET /healthcheck": (lambda client: client.get("/healthcheck"), None),
+        "GET /healthcheck/databases": (lambda client: client.get("/healthcheck/databases", headers=admin_headers), "database"),
+        "GET /healthcheck/webservices": (lambda client: client.get("/healthcheck/webservices", headers=admin_headers), "webservice"),
+        "GET /healthcheck/mountpoints": (lambda client: client.get("/healthcheck/mountpoints", headers=admin_headers), "mount_point"),
+        "GET /healthcheck/requirements": (lambda client: client.get("/healthcheck/requirements", headers=admin_headers), "requirements"),
+    }
+    rows=[]
+    with StandInTargets(slow_delay=slow_delay) as stand_ins, tempfile.TemporaryDirectory() as directory:
+        ports={
+            "accepting": [stand_ins.start_accepting() for _ in range(4)],
+            "blackholed": [stand_ins.start_blackholed()],
+            "slow": [stand_ins.start_slow() for _ in range(2)],
+        }
+        config_file=os.path.join(directory, "health_check_config.json")
+        os.environ["HEALTH_CHECK_CONFIG_FILE"]=config_file
+        client=TestClient(app)
+        for size in sizes:
+            config=generate_config(size, ports, mix)
+            with open(config_file, "w") as file:
+                json.dump(config, file)
+            for name, (target, check_type) in targets.items():
+                checks_per_call=sum(1 for item in config if check_type is None or item["check_type"]==check_type)
+                result=measure(lambda: target(client), iterations)
+                rows.append({"checks": size, "target": name, **result,
+                             "checks_per_second": round(result["calls_per_second"]*checks_per_call, 2),
+                             "peak_rss_mb": round(peak_rss_mb(), 1)})
+                print(json.dumps(rows[-1]), file=sys.stderr)
+    return rows
+
+def parse_mix(mix:str)->dict[str,float]:
+    """ Parse the target mix argument.
+
+    Args:
+        mix (str): Comma separated kind=share pairs such as 'accepting=0.9,blackholed=0.05,slow=0.05'.
+
+    Returns:
+        dict[str,float]: Share of each kind of listener.
+    """
+    shares={kind:float(share) for kind, share in (pair.split("=") for pair in mix.split(","))}
+    unknown_kinds=set(shares)-{"accepting", "blackholed", "slow"}
+    if unknown_kinds:
+        raise argparse.ArgumentTypeError(f"Unknown target kinds {unknown_kinds}")
+    return {kind:share for kind, share in shares.items() if share>0}
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark the health check pipeline against local stand-in targets.")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma separated numbers of checks, up to 10000.")
+    parser.add_argument("--iterations", type=int, default=10, help="Calls per measured target and size.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("accepting=1"),
+                        help="Share of checks per target kind, e.g. accepting=0.9,blackholed=0.05,slow=0.05.")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Seconds slow targets wait before answering.")
+    arguments=parser.parse_args()
+    rows=run_benchmark([int(size) for size in arguments.sizes.split(",")], arguments.iterations, arguments.mix, arguments.slow_delay)
+    # Print a table that is easy to compare between runs
+    header=f"{'checks':>7} {'target':<30} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'calls/s':>9} {'checks/s':>10} {'peak RSS MB':>12}"
+    print(header)
+    print("-"*len(header))
+    for row in rows:
+        print(f"{row['checks']:>7} {row['target']:<30} {row['p50_ms']:>10} {row['p95_ms']:>10} {row['p99_ms']:>10} "
+              f"{row['calls_per_second']:>9} {row['checks_per_second']:>10} {row['peak_rss_mb']:>12}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark the SQLite history database at millions of rows.
+
+Results of the requested number of checks are recorded through HealthcheckHistory.record, one result per check every
+30 seconds of simulated time, the way the probe loop records them. The record call is timed with and without the
+history database, then the time the writer thread needs to commit everything, then history queries over the filled database.
+
+Usage:
+    python -m benchmarks.bench_history_database --checks 1000 --results-per-check 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from app.controller.healthcheck_history import HealthcheckHistory
+from app.controller.healthcheck_history_database import HealthcheckHistoryDatabase
+
+def record_all(checks:int,results_per_check:int,first_timestamp:float)->float:
+    """ Record the results of every check, as the probe loop would.
+
+    Args:
+        checks (int): The number of checks.
+        results_per_check (int): The number of results of each check.
+        first_timestamp (float): Unix timestamp of the first results.
+
+    Returns:
+        float: Average microseconds per record call.
+    """
+    synonyms=[f"Check {number}" for number in range(checks)]
+    started=time.perf_counter()
+    for round_number in range(results_per_check):
+        timestamp=first_timestamp+round_number*30
+        for number, synonym in enumerate(synonyms):
+            status='Failure' if (round_number+number)%97==0 else 'Success'
+            HealthcheckHistory.record('webservice', synonym, status, 0.01+number%10/1000, timestamp=timestamp+number/checks)
+    return (time.perf_counter()-started)/(checks*results_per_check)*1e6
+
+def measure(function)->float:
+    """ Measure how long a function takes.
+
+    Args:
+        function (callable): The function to call.
+
+    Returns:
+        float: Elapsed milliseconds.
+    """
+    started=time.perf_counter()
+    function()
+    return (time.perf_counter()-started)*1000
+
+def report(name:str,value:float,unit:str):
+    """ Print a result as a table row and as JSON on standard error.
+
+    Args:
+        name (str): The name of the measurement.
+        value (float): The measured value.
+        unit (str): The unit of the value.
+    """
+    print(json.dumps({'measurement': name, 'value': round(value, 3), 'unit': unit}), file=sys.stderr)
+    print(f"{name:<44} {value:>12.3f} {unit}")
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark the SQLite history database at millions of rows.")
+    parser.add_argument("--checks", type=int, default=1000, help="Number of checks.")
+    parser.add_argument("--results-per-check", type=int, default=2000, help="Number of results recorded per check.")
+    arguments=parser.parse_args()
+    rows=arguments.checks*arguments.results_per_check
+    # Keep the simulated results within the retention
+    first_timestamp=time.time()-arguments.results_per_check*30
+    os.environ['HEALTH_CHECK_HISTORY_MAX_CHECKS']=str(arguments.checks)
+    os.environ['HEALTH_CHECK_HISTORY_DATABASE_QUEUE_SIZE']=str(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        report("record without database", record_all(arguments.checks, arguments.results_per_check, first_timestamp), "us/result")
+        HealthcheckHistory.clear()
+        HealthcheckHistoryDatabase.start(os.path.join(directory, "history.sqlite3"))
+        started=time.perf_counter()
+        report("record with database", record_all(arguments.checks, arguments.results_per_check, first_timestamp), "us/result")
+        HealthcheckHistoryDatabase.flush()
+        report("committed rows per second", rows/(time.perf_counter()-started), "rows/s")
+        report("dropped rows", HealthcheckHistoryDatabase.get_dropped_rows(), "rows")
+        report("database size", os.path.getsize(os.path.join(directory, "history.sqlite3"))/1e6, "MB")
+        last_hour=first_timestamp+arguments.results_per_check*30-3600
+        queries={
+            'one check, last hour': lambda: HealthcheckHistory.get_history(synonym="Check 7", start=last_hour, source='database'),
+            'one check, all results, 500 points': lambda: HealthcheckHistory.get_history(synonym="Check 7", max_points=500, source='database'),
+            'all checks, last hour, 10 points': lambda: HealthcheckHistory.get_history(start=last_hour, max_points=10, source='database')
+        }
+        for name, query in queries.items():
+            report(f"query {name}", min(measure(query) for _ in range(3)), "ms")
+        HealthcheckHistoryDatabase.stop()
+
+if __name__=="__main__":
+    main()
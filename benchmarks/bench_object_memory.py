@@ -0,0 +1,181 @@
+"""Benchmark the memory and construction time of health check config and status objects.
+
+The slotted, frozen and interned schema classes are compared with a dict backed layout that keeps a copy of every
+repeated string and a string status, which is how the schema classes used to be laid out.
+
+Usage:
+    python -m benchmarks.bench_object_memory --sizes 1000,10000,50000 --repeat 3
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+from app.schema.healthcheck_config import WebserviceHealthcheckConfig,DatabaseHealthcheckConfig
+from app.schema.healthcheck_status import WebServiceHealthcheckStatus,DatabaseHealthcheckStatus
+
+@dataclass
+class DictWebserviceConfig:
+    """ Webservice configuration with the dict backed layout, validated like WebserviceHealthcheckConfig.
+    """
+    synonym: str
+    hostname: str
+    port: int
+    protocol: str
+
+    def __post_init__(self):
+        if self.protocol.lower() not in ['http', 'https']:
+            raise ValueError(f"Invalid protocol: {self.protocol}")
+        if not WebserviceHealthcheckConfig._is_valid_hostname(self, self.hostname):
+            raise ValueError(f"Invalid hostname: {self.hostname}")
+        if not WebserviceHealthcheckConfig._is_valid_port(self, self.port):
+            raise ValueError(f"Invalid port number: {self.port}")
+
+@dataclass
+class DictDatabaseConfig:
+    """ Database configuration with the dict backed layout, validated like DatabaseHealthcheckConfig.
+    """
+    synonym: str
+    hostname: str
+    port: int
+    database_type: str
+
+    def __post_init__(self):
+        if not WebserviceHealthcheckConfig._is_valid_hostname(self, self.hostname):
+            raise ValueError(f"Invalid hostname: {self.hostname}")
+        if not WebserviceHealthcheckConfig._is_valid_port(self, self.port):
+            raise ValueError(f"Invalid port number: {self.port}")
+        if self.database_type.lower() not in DatabaseHealthcheckConfig._DB_DRIVER_MAP:
+            raise ValueError(f"Invalid database type: {self.database_type}")
+
+@dataclass
+class DictWebserviceStatus:
+    """ Webservice status with the dict backed layout and a string status.
+    """
+    synonym: str
+    status: Optional[str]=field(init=False, default=None)
+    hostname: str=""
+    port: int=0
+    protocol: str=""
+    can_tcp: Optional[bool]=None
+
+    def __post_init__(self):
+        self.status="Success" if self.can_tcp else "Failure"
+
+@dataclass
+class DictDatabaseStatus:
+    """ Database status with the dict backed layout and a string status.
+    """
+    synonym: str
+    status: Optional[str]=field(init=False, default=None)
+    hostname: str=""
+    port: int=0
+    database_type: str=""
+    can_tcp: Optional[bool]=None
+    db_driver_installed: Optional[bool]=None
+
+    def __post_init__(self):
+        self.status="Success" if self.can_tcp and self.db_driver_installed is not False else "Failure"
+
+LAYOUTS={
+    'dict': (DictWebserviceConfig, DictDatabaseConfig, DictWebserviceStatus, DictDatabaseStatus),
+    'slotted': (WebserviceHealthcheckConfig, DatabaseHealthcheckConfig, WebServiceHealthcheckStatus, DatabaseHealthcheckStatus)
+}
+
+def generate_details(size:int)->list[dict]:
+    """ Generate check details the way they come out of the configuration file.
+
+    Args:
+        size (int): The number of checks, alternating webservices and databases.
+
+    Returns:
+        list[dict]: The details of each check.
+    """
+    details=[]
+    for index in range(size):
+        # A few shared hosts and types repeated across many checks, like a real fleet configuration
+        if index%2==0:
+            details.append({"synonym": f"API {index}", "hostname": f"api-{index%20}.internal.example.com", "port": 443, "protocol": "https"})
+        else:
+            details.append({"synonym": f"DB {index}", "hostname": f"db-{index%20}.internal.example.com", "port": 5432, "database_type": "postgresql"})
+    # Decoding gives every value its own string object as when the file is loaded
+    return json.loads(json.dumps(details))
+
+def build_objects(layout:str,details:list[dict])->list:
+    """ Build the config and status object of every check.
+
+    Args:
+        layout (str): 'dict' or 'slotted'.
+        details (list[dict]): The details of each check.
+
+    Returns:
+        list: The built config and status objects.
+    """
+    webservice_config, database_config, webservice_status, database_status=LAYOUTS[layout]
+    objects=[]
+    for detail in details:
+        if "protocol" in detail:
+            config=webservice_config(**detail)
+            status=webservice_status(synonym=config.synonym, hostname=config.hostname, port=config.port, protocol=config.protocol, can_tcp=True)
+        else:
+            config=database_config(**detail)
+            status=database_status(synonym=config.synonym, hostname=config.hostname, port=config.port,
+                                   database_type=config.database_type, can_tcp=True, db_driver_installed=True)
+        objects.append((config, status))
+    return objects
+
+def measure(layout:str,size:int,repeat:int)->dict:
+    """ Measure the retained memory and the construction time of a layout.
+
+    Args:
+        layout (str): 'dict' or 'slotted'.
+        size (int): The number of checks.
+        repeat (int): Number of timed constructions, the fastest one is reported.
+
+    Returns:
+        dict: The measured row.
+    """
+    construction_seconds=[]
+    for _ in range(repeat):
+        details=generate_details(size)
+        gc.collect()
+        started=time.perf_counter()
+        build_objects(layout, details)
+        construction_seconds.append(time.perf_counter()-started)
+    details=generate_details(size)
+    gc.collect()
+    tracemalloc.start()
+    objects=build_objects(layout, details)
+    # The source details are dropped like the loaded file content is after parsing
+    del details
+    gc.collect()
+    retained_bytes, _=tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return {
+        'layout': layout,
+        'checks': size,
+        'retained_mb': round(retained_bytes/1024/1024, 2),
+        'bytes_per_check': round(retained_bytes/size),
+        'construction_ms': round(min(construction_seconds)*1000, 1)
+    }
+
+def main():
+    parser=argparse.ArgumentParser(description="Benchmark the memory and construction time of health check objects.")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma separated numbers of checks.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed constructions per layout and size, the fastest one is reported.")
+    arguments=parser.parse_args()
+    header=f"{'checks':>7} {'layout':<8} {'retained MB':>12} {'bytes/check':>12} {'construction ms':>16}"
+    print(header)
+    print("-"*len(header))
+    for size in [int(size) for size in arguments.sizes.split(",")]:
+        for layout in LAYOUTS:
+            row=measure(layout, size, arguments.repeat)
+            print(json.dumps(row), file=sys.stderr)
+            print(f"{row['checks']:>7} {row['layout']:<8} {row['retained_mb']:>12} {row['bytes_per_check']:>12} {row['construction_ms']:>16}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,140 @@
+import socket
+import threading
+import time
+from app.logging.logging import return_logging_instance
+
+logger=return_logging_instance("Benchmark Stand-in Targets")
+class StandInTargets:
+    """ A class to run local TCP listeners that stand in for the probed services during benchmarks.
+
+    - accepting listeners complete the TCP handshake and answer HTTP requests right away.
+    - blackholed listeners keep a full accept queue so new connection attempts hang until the probe timeout.
+    - slow listeners complete the TCP handshake but wait before answering HTTP requests, only HTTP checks see the delay.
+    """
+
+    def __init__(self,slow_delay:float=0.5):
+        """ Initialize the stand-in targets.
+
+        Args:
+            slow_delay (float, optional): Seconds slow listeners wait before answering. The default value is 0.5.
+        """
+        self.slow_delay=slow_delay
+        self._sockets:list[socket.socket]=[]
+        self._threads:list[threading.Thread]=[]
+        self._stopped=threading.Event()
+
+    def _listen(self,backlog:int)->socket.socket:
+        """ Open a listening socket on a random local port.
+
+        Args:
+            backlog (int): The accept queue length of the listener.
+
+        Returns:
+            socket.socket: The listening socket.
+        """
+        server=socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(('127.0.0.1', 0))
+        server.listen(backlog)
+        self._sockets.append(server)
+        return server
+
+    def _serve(self,server:socket.socket,delay:float):
+        """ Accept connections and answer each one with a minimal HTTP response after the delay.
+
+        Args:
+            server (socket.socket): The listening socket.
+            delay (float): Seconds to wait before answering.
+        """
+        server.settimeout(0.2)
+        while not self._stopped.is_set():
+            try:
+                connection, _=server.accept()
+            except (TimeoutError, socket.timeout):
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._answer, args=(connection, delay), daemon=True).start()
+
+    def _answer(self,connection:socket.socket,delay:float):
+        """ Answer HTTP requests on a connection until the client closes it.
+
+        Args:
+            connection (socket.socket): The accepted connection.
+            delay (float): Seconds to wait before each answer.
+        """
+        body=b"OK"
+        with connection:
+            connection.settimeout(5)
+            try:
+                while not self._stopped.is_set():
+                    request=connection.recv(65536)
+                    if not request:
+                        return
+                    if delay:
+                        time.sleep(delay)
+                    connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: "
+                                       + str(len(body)).encode() + b"\r\nConnection: keep-alive\r\n\r\n" + body)
+            except OSError:
+                return
+
+    def start_accepting(self)->int:
+        """ Start a listener that accepts connections and answers right away.
+
+        Returns:
+            int: The port of the listener.
+        """
+        server=self._listen(1024)
+        thread=threading.Thread(target=self._serve, args=(server, 0), daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return server.getsockname()[1]
+
+    def start_slow(self)->int:
+        """ Start a listener that accepts connections but answers after the slow delay.
+
+        Returns:
+            int: The port of the listener.
+        """
+        server=self._listen(1024)
+        thread=threading.Thread(target=self._serve, args=(server, self.slow_delay), daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return server.getsockname()[1]
+
+    def start_blackholed(self)->int:
+        """ Start a listener that never accepts and whose accept queue is full, so connection attempts time out.
+
+        Returns:
+            int: The port of the listener.
+        """
+        server=self._listen(0)
+        port=server.getsockname()[1]
+        # Fill the accept queue so the kernel drops further handshakes
+        for _ in range(4):
+            filler=socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            filler.setblocking(False)
+            try:
+                filler.connect(('127.0.0.1', port))
+            except BlockingIOError:
+                pass
+            self._sockets.append(filler)
+        time.sleep(0.05)
+        return port
+
+    def stop(self):
+        """ Close every listener and stop serving.
+        """
+        self._stopped.set()
+        for opened_socket in self._sockets:
+            opened_socket.close()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._sockets=[]
+        self._threads=[]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc_info):
+        self.stop()